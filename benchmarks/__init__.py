@@ -0,0 +1 @@
+"""Benchmarks for OREI HDMI Matrix integration."""
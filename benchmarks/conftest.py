@@ -0,0 +1,53 @@
+"""Fixtures for OREI HDMI Matrix benchmarks.
+
+Benchmarks run synchronously under pytest-benchmark, so each one drives its
+own event loop with the fake matrix and API client running on it.
+"""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.orei_hdmi_matrix.api import OreiHdmiMatrixApi
+from custom_components.orei_hdmi_matrix.const import TRANSPORT_HTTP, TRANSPORT_TCP
+from custom_components.orei_hdmi_matrix.transport import TcpTransport
+from tests.fake_matrix import FakeOreiMatrix
+
+# Round-trip time of a typical matrix's CGI handler, in seconds
+DEVICE_LATENCY = 0.005
+
+
+@pytest.fixture
+def loop():
+    """Return a fresh event loop for the benchmark."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.run_until_complete(loop.shutdown_asyncgens())
+    loop.close()
+
+
+@pytest.fixture
+def matrix(loop):
+    """Return a running fake matrix with realistic latency."""
+    matrix = FakeOreiMatrix(latency=DEVICE_LATENCY, seed=1)
+    loop.run_until_complete(matrix.start())
+    yield matrix
+    loop.run_until_complete(matrix.stop())
+
+
+@pytest.fixture(params=[TRANSPORT_HTTP, TRANSPORT_TCP])
+def api(request, loop, matrix):
+    """Return an authenticated API client connected to the fake matrix.
+
+    Parametrized over the transports, so each benchmark runs once for each.
+    """
+    if request.param == TRANSPORT_TCP:
+        transport = TcpTransport("127.0.0.1", matrix.control_port)
+        api = OreiHdmiMatrixApi("127.0.0.1", "Admin", "admin", transport=transport)
+    else:
+        api = OreiHdmiMatrixApi(matrix.host, "Admin", "admin")
+    loop.run_until_complete(api.__aenter__())
+    loop.run_until_complete(api.authenticate())
+    yield api
+    loop.run_until_complete(api.__aexit__(None, None, None))
@@ -0,0 +1,30 @@
+"""Benchmark the API client against the fake matrix.
+
+    pytest benchmarks/test_api_benchmarks.py
+"""
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+
+def test_poll_latency(benchmark, loop, api):
+    """Benchmark one status poll."""
+    benchmark(lambda: loop.run_until_complete(api.get_status()))
+
+
+def test_switch_throughput(benchmark, loop, api):
+    """Benchmark eight sequential switch commands."""
+
+    async def switch_all():
+        for output in range(1, 9):
+            await api.set_output_input(output, 2)
+
+    benchmark(lambda: loop.run_until_complete(switch_all()))
+
+
+def test_bulk_routing(benchmark, loop, api):
+    """Benchmark routing all eight outputs in one set_routes call."""
+    routes = {output: 3 for output in range(1, 9)}
+    benchmark(lambda: loop.run_until_complete(api.set_routes(routes)))
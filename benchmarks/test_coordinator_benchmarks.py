@@ -0,0 +1,50 @@
+"""Benchmark coordinator work per poll against the fake matrix.
+
+CPU time is measured with time.process_time and includes the simulator, which
+runs in the same process, so compare runs rather than absolute numbers.
+
+    pytest benchmarks/test_coordinator_benchmarks.py
+"""
+from __future__ import annotations
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.orei_hdmi_matrix.config_flow import create_default_config
+from custom_components.orei_hdmi_matrix.coordinator import OreiHdmiMatrixCoordinator
+
+
+@pytest.fixture
+def coordinator(loop, matrix):
+    """Return a coordinator polling the fake matrix."""
+
+    async def create():
+        hass = HomeAssistant("/tmp")
+        entry = MagicMock()
+        entry.data = {
+            "host": matrix.host,
+            "username": "Admin",
+            "password": "admin",
+            **create_default_config(),
+        }
+        coordinator = OreiHdmiMatrixCoordinator(hass, entry)
+        for output in range(1, 9):
+            coordinator.async_add_listener(lambda: None, output)
+        await coordinator.async_refresh()
+        return coordinator
+
+    coordinator = loop.run_until_complete(create())
+    yield coordinator
+    loop.run_until_complete(coordinator.async_shutdown())
+
+
+@pytest.mark.benchmark(timer=time.process_time)
+def test_coordinator_cpu_per_poll(benchmark, loop, coordinator):
+    """Benchmark CPU time of one coordinator refresh."""
+    benchmark(lambda: loop.run_until_complete(coordinator.async_refresh()))
@@ -0,0 +1,86 @@
+"""Benchmark decoding a status reply into the status the coordinator keeps.
+
+The payloads in ``payloads/`` are status replies in the device's format.
+The legacy function reproduces the parsing before replies were read as
+bytes, so both can be compared in one run:
+
+    pytest benchmarks/test_parse_benchmarks.py
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from custom_components.orei_hdmi_matrix.models import MatrixState, RouteTable
+from custom_components.orei_hdmi_matrix.transport import json_loads
+
+PAYLOADS = Path(__file__).parent / "payloads"
+SIZES = [8, 16]
+
+
+def load_payload(size: int) -> bytes:
+    """Return the recorded status reply of a matrix size."""
+    return (PAYLOADS / f"get_video_status_{size}x{size}.json").read_bytes()
+
+
+def legacy_parse(body: bytes, num_outputs: int) -> dict:
+    """Parse a reply as before: text, standard library JSON, dict rebuild."""
+    result = json.loads(body.decode("utf-8"))
+    return {
+        "power": result.get("power", 0),
+        "source_mapping": RouteTable.from_sources(
+            result.get("allsource", [])[:num_outputs], num_outputs
+        ),
+        "input_names": list(result.get("allinputname", [])),
+        "output_names": list(result.get("alloutputname", [])),
+        "preset_names": list(result.get("allname", [])),
+    }
+
+
+def parse(
+    body: bytes,
+    num_outputs: int,
+    previous: MatrixState | None = None,
+    names: bool = True,
+) -> MatrixState:
+    """Parse a reply as the HTTP transport and API client do."""
+    return MatrixState.from_reply(json_loads(body), num_outputs, previous, names)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_parse_status(benchmark, size):
+    """Benchmark decoding a status reply."""
+    body = load_payload(size)
+    status = benchmark(parse, body, size)
+    assert len(status.routes) == size
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_parse_unchanged_status(benchmark, size):
+    """Benchmark decoding a reply that matches the previous state."""
+    body = load_payload(size)
+    previous = parse(body, size)
+    state = benchmark(parse, body, size, previous)
+    assert state.input_names is previous.input_names
+    assert state.routes is previous.routes
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_parse_routes_only(benchmark, size):
+    """Benchmark a fast-tier poll that keeps the cached names."""
+    body = load_payload(size)
+    previous = parse(body, size)
+    state = benchmark(parse, body, size, previous, False)
+    assert state.output_names is previous.output_names
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_parse_status_legacy(benchmark, size):
+    """Benchmark the previous decoding of a status reply."""
+    body = load_payload(size)
+    status = benchmark(legacy_parse, body, size)
+    assert status["source_mapping"] == parse(body, size).routes
@@ -0,0 +1,88 @@
+"""Benchmark switch latency while background polls keep the matrix busy.
+
+Several pollers keep the command queue full while switches arrive; the p95
+switch latency with the prioritized queue is compared with a plain FIFO
+queue and stored in the benchmark's extra info. Only transports that send
+one command at a time are measured:
+
+    pytest benchmarks/test_priority_benchmarks.py
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from custom_components.orei_hdmi_matrix.api import (
+    CommandPriority,
+    CommandQueue,
+    OreiHdmiMatrixCommandSkippedError,
+)
+
+POLLERS = 4
+SWITCHES = 40
+
+
+class FifoCommandQueue(CommandQueue):
+    """The queue as it behaved before priorities: first come, first served."""
+
+    def slot(self, priority: CommandPriority, timeout: float | None = None):
+        """Wait for a slot in arrival order, whatever the priority."""
+        return super().slot(CommandPriority.REFRESH, timeout)
+
+
+def p95(latencies: list[float]) -> float:
+    """Return the 95th percentile of the latencies."""
+    ordered = sorted(latencies)
+    return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+async def switch_latencies(api) -> list[float]:
+    """Time switches sent while background polls queue up behind each other."""
+    done = asyncio.Event()
+    rng = random.Random(1)
+
+    async def poll() -> None:
+        while not done.is_set():
+            try:
+                await api.get_status(priority=CommandPriority.BACKGROUND)
+            except OreiHdmiMatrixCommandSkippedError:
+                await asyncio.sleep(0)
+
+    pollers = [asyncio.create_task(poll()) for _ in range(POLLERS)]
+    latencies = []
+    for index in range(SWITCHES):
+        await asyncio.sleep(rng.uniform(0, 0.01))
+        started = time.perf_counter()
+        await api.set_output_input(index % 8 + 1, rng.randint(1, 8))
+        latencies.append(time.perf_counter() - started)
+    done.set()
+    await asyncio.gather(*pollers)
+    return latencies
+
+
+def test_switch_latency_under_polling(benchmark, loop, api):
+    """Benchmark switches competing with polls, with and without priorities."""
+    slots = api.commands.slots
+    if slots > 1:
+        # Pipelined commands queue on the device, where priorities cannot reach
+        pytest.skip("transport keeps several commands in flight")
+    results = {}
+
+    def run() -> None:
+        for name, queue in (
+            ("fifo", FifoCommandQueue(slots)),
+            ("priority", CommandQueue(slots)),
+        ):
+            api.commands = queue
+            results[name] = p95(loop.run_until_complete(switch_latencies(api)))
+
+    benchmark.pedantic(run, rounds=1, iterations=1)
+
+    benchmark.extra_info["p95_fifo_ms"] = round(results["fifo"] * 1000, 2)
+    benchmark.extra_info["p95_priority_ms"] = round(results["priority"] * 1000, 2)
+    assert results["priority"] < results["fifo"]
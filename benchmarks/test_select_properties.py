@@ -0,0 +1,150 @@
+"""Benchmark select entity property access.
+
+The legacy functions reproduce the property implementations before the
+routing index and logging overhaul, so both can be compared in one run:
+
+    pytest benchmarks/test_select_properties.py
+"""
+from __future__ import annotations
+
+import io
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from custom_components.orei_hdmi_matrix.config_flow import create_default_config
+from custom_components.orei_hdmi_matrix.models import (
+    MatrixState,
+    RouteTable,
+    RoutingIndex,
+)
+from custom_components.orei_hdmi_matrix.select import OreiHdmiMatrixOutputSelect
+
+_LOGGER = logging.getLogger("custom_components.orei_hdmi_matrix.select")
+
+STATE = MatrixState(
+    power=1,
+    routes=RouteTable([7, 6, 2, 4, 2, 2, 2, 2]),
+    input_names=tuple(f"Input{i}" for i in range(1, 9)),
+    output_names=tuple(f"Output{i}" for i in range(1, 9)),
+    preset_names=tuple(f"Preset{i}" for i in range(1, 9)),
+)
+LEGACY_STATUS = {
+    "power": 1,
+    "source_mapping": [7, 6, 2, 4, 2, 2, 2, 2],
+    "input_names": [f"Input{i}" for i in range(1, 9)],
+    "output_names": [f"Output{i}" for i in range(1, 9)],
+    "preset_names": [f"Preset{i}" for i in range(1, 9)],
+}
+
+
+@pytest.fixture(autouse=True)
+def log_to_memory():
+    """Send integration logs at INFO to an in-memory handler, like HA's log file."""
+    logger = logging.getLogger("custom_components.orei_hdmi_matrix")
+    handler = logging.StreamHandler(io.StringIO())
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    yield
+    logger.removeHandler(handler)
+    logger.setLevel(logging.NOTSET)
+
+
+@pytest.fixture
+def entry_data():
+    """Return default entry data."""
+    return {"host": "192.168.1.100", **create_default_config()}
+
+
+def legacy_options(entry_data, output_num):
+    """Return select options the way the entity used to compute them."""
+    inputs = entry_data.get("inputs", {})
+    outputs = entry_data.get("outputs", {})
+    output_config = outputs.get(str(output_num), {})
+    available_inputs = output_config.get("available_inputs", list(range(1, 9)))
+    _LOGGER.info("Output %d - inputs config: %s", output_num, inputs)
+    _LOGGER.info("Output %d - available_inputs: %s", output_num, available_inputs)
+    options = []
+    for input_num in available_inputs:
+        input_config = inputs.get(str(input_num), {})
+        _LOGGER.info("Input %d config: %s", input_num, input_config)
+        if input_config.get("input_enabled", True):
+            input_name = input_config.get("name", f"Input {input_num}")
+            options.append(input_name)
+            _LOGGER.info("Added input %d: %s", input_num, input_name)
+    _LOGGER.info("Final options for output %d: %s", output_num, options)
+    return options
+
+
+def legacy_current_option(entry_data, data, output_num):
+    """Return the current option the way the entity used to compute it."""
+    source_mapping = data.get("source_mapping", [])
+    _LOGGER.info("Output %d - source_mapping: %s", output_num, source_mapping)
+    _LOGGER.info("Output %d - coordinator data: %s", output_num, data)
+    if len(source_mapping) >= output_num:
+        current_input = source_mapping[output_num - 1]
+        _LOGGER.info("Output %d - current_input: %d", output_num, current_input)
+        if 1 <= current_input <= 8:
+            input_config = entry_data.get("inputs", {}).get(str(current_input), {})
+            input_name = input_config.get("name", f"Input {current_input}")
+            _LOGGER.info("Output %d - current_option: %s", output_num, input_name)
+            return input_name
+    return None
+
+
+def test_legacy_property_access(benchmark, entry_data):
+    """Benchmark options and current_option before the overhaul."""
+
+    def access():
+        for output_num in range(1, 9):
+            legacy_options(entry_data, output_num)
+            legacy_current_option(entry_data, LEGACY_STATUS, output_num)
+
+    benchmark(access)
+
+
+def test_property_access(benchmark, entry_data):
+    """Benchmark options and current_option on the select entities."""
+    coordinator = SimpleNamespace(
+        data=STATE, routing_index=RoutingIndex.from_entry_data(entry_data)
+    )
+    entry = SimpleNamespace(entry_id="entry", data=entry_data)
+    entities = [
+        OreiHdmiMatrixOutputSelect(coordinator, entry, output_num)
+        for output_num in range(1, 9)
+    ]
+
+    def access():
+        for entity in entities:
+            entity.options
+            entity.current_option
+
+    benchmark(access)
+
+
+@pytest.mark.parametrize("size", [4, 8, 16, 32])
+def test_property_access_per_size(benchmark, size):
+    """Benchmark one pass over every select entity of an NxN matrix.
+
+    Divide by the port count to compare the per-entity cost across sizes.
+    """
+    entry_data = create_default_config(size, size)
+    status = MatrixState(routes=RouteTable(i % size + 1 for i in range(size)))
+    coordinator = SimpleNamespace(
+        data=status, routing_index=RoutingIndex.from_entry_data(entry_data)
+    )
+    entry = SimpleNamespace(entry_id="entry", data=entry_data)
+    entities = [
+        OreiHdmiMatrixOutputSelect(coordinator, entry, output_num)
+        for output_num in range(1, size + 1)
+    ]
+
+    def access():
+        for entity in entities:
+            entity.options
+            entity.current_option
+
+    benchmark(access)
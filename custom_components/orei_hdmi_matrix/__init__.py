@@ -1,53 +1,206 @@
 """OREI HDMI Matrix integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import ATTR_DEVICE_ID, ATTR_ENTITY_ID, Platform
+from homeassistant.core import HomeAssistant, ServiceCall, callback
 from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers import device_registry as dr
-
-from .const import DOMAIN
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
+
+from .const import (
+    ATTR_NAME,
+    ATTR_PRESET,
+    ATTR_ROUTES,
+    ATTR_TIMEOUT,
+    DOMAIN,
+    MAX_PORTS,
+    NUM_PRESETS,
+    SERVICE_RECALL_PRESET,
+    SERVICE_ROUTE_MANY,
+    SERVICE_SAVE_PRESET,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
 from .coordinator import OreiHdmiMatrixCoordinator
 from .frontend import async_setup_frontend
+from .presets import OreiHdmiMatrixPresetStore
+from .scheduler import async_get_scheduler
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.SELECT]
+PLATFORMS: list[Platform] = [Platform.SELECT, Platform.SENSOR, Platform.SWITCH]
+
+# Overall time in seconds a service call may take on each matrix
+TIMEOUT_SCHEMA = vol.All(vol.Coerce(float), vol.Range(min=0.5, max=60))
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+# Matrices a service call is aimed at, by any of their devices or entities
+TARGET_FIELDS = {
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+}
+
+REFRESH_SCHEMA = vol.Schema(TARGET_FIELDS)
+
+ROUTE_MANY_SCHEMA = vol.Schema(
+    {
+        # Routes are checked against each matrix's own size when applied
+        vol.Required(ATTR_ROUTES): {
+            vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_PORTS)): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=MAX_PORTS)
+            )
+        },
+        vol.Optional(ATTR_TIMEOUT): TIMEOUT_SCHEMA,
+        **TARGET_FIELDS,
+    }
+)
+
+# A preset is either one of the matrix's slots or a local preset by name
+PRESET_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Exclusive(ATTR_PRESET, "preset"): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=NUM_PRESETS)
+            ),
+            vol.Exclusive(ATTR_NAME, "preset"): cv.string,
+            vol.Optional(ATTR_TIMEOUT): TIMEOUT_SCHEMA,
+            **TARGET_FIELDS,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_PRESET, ATTR_NAME),
+)
+
+
+@callback
+def _async_coordinators_for_call(
+    hass: HomeAssistant, service_call: ServiceCall
+) -> list[OreiHdmiMatrixCoordinator]:
+    """Return the coordinators targeted by a service call, or all of them."""
+    scheduler = async_get_scheduler(hass)
+    target_ids = [
+        *service_call.data.get(ATTR_DEVICE_ID, ()),
+        *service_call.data.get(ATTR_ENTITY_ID, ()),
+    ]
+    if not target_ids:
+        return scheduler.coordinators
+    return scheduler.async_coordinators_for(target_ids)
+
+
+@callback
+def _async_register_services(hass: HomeAssistant) -> None:
+    """Register the services shared by every matrix.
+
+    Each call is sent to all of its matrices at the same time.
+    """
+
+    async def async_refresh_service(service_call: ServiceCall) -> None:
+        """Handle refresh service call."""
+        await async_get_scheduler(hass).async_refresh(
+            _async_coordinators_for_call(hass, service_call)
+        )
+
+    async def async_route_many_service(service_call: ServiceCall) -> None:
+        """Handle route_many service call."""
+        routes: dict[int, int] = service_call.data[ATTR_ROUTES]
+        timeout = service_call.data.get(ATTR_TIMEOUT)
+        coordinators = _async_coordinators_for_call(hass, service_call)
+        results = await asyncio.gather(
+            *(coord.async_set_routes(routes, timeout) for coord in coordinators)
+        )
+        for coord, success in zip(coordinators, results):
+            if not success:
+                _LOGGER.error("Failed to apply routes %s on %s", routes, coord.entry.title)
+
+    async def async_save_preset_service(service_call: ServiceCall) -> None:
+        """Handle save_preset service call."""
+        timeout = service_call.data.get(ATTR_TIMEOUT)
+
+        async def _async_save(coord: OreiHdmiMatrixCoordinator) -> None:
+            if ATTR_PRESET in service_call.data:
+                success = await coord.async_save_preset(
+                    service_call.data[ATTR_PRESET], timeout
+                )
+            else:
+                success = await coord.async_save_local_preset(service_call.data[ATTR_NAME])
+            if not success:
+                _LOGGER.error("Failed to save preset on %s", coord.entry.title)
+
+        await asyncio.gather(
+            *map(_async_save, _async_coordinators_for_call(hass, service_call))
+        )
+
+    async def async_recall_preset_service(service_call: ServiceCall) -> None:
+        """Handle recall_preset service call."""
+        timeout = service_call.data.get(ATTR_TIMEOUT)
+
+        async def _async_recall(coord: OreiHdmiMatrixCoordinator) -> None:
+            if ATTR_PRESET in service_call.data:
+                success = await coord.async_recall_preset(
+                    service_call.data[ATTR_PRESET], timeout
+                )
+            else:
+                success = await coord.async_recall_local_preset(
+                    service_call.data[ATTR_NAME], timeout
+                )
+            if not success:
+                _LOGGER.error("Failed to recall preset on %s", coord.entry.title)
+
+        await asyncio.gather(
+            *map(_async_recall, _async_coordinators_for_call(hass, service_call))
+        )
+
+    hass.services.async_register(
+        DOMAIN, "refresh", async_refresh_service, schema=REFRESH_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_ROUTE_MANY, async_route_many_service, schema=ROUTE_MANY_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SAVE_PRESET, async_save_preset_service, schema=PRESET_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_RECALL_PRESET, async_recall_preset_service, schema=PRESET_SCHEMA
+    )
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the OREI HDMI Matrix services, once for all config entries."""
+    _async_register_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up OREI HDMI Matrix from a config entry."""
+    scheduler = async_get_scheduler(hass)
     coordinator = OreiHdmiMatrixCoordinator(hass, entry)
-    
-    try:
-        await coordinator.async_config_entry_first_refresh()
-    except Exception as ex:
-        raise ConfigEntryNotReady(f"Error connecting to OREI HDMI Matrix: {ex}") from ex
 
+    # With a saved status the entities start from it and the matrix is polled
+    # in the background, so a slow or sleeping matrix does not delay startup
+    restored = await coordinator.async_restore_snapshot()
+    if not restored:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception as ex:
+            raise ConfigEntryNotReady(f"Error connecting to OREI HDMI Matrix: {ex}") from ex
+
+    await coordinator.presets.async_load()
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    entry.async_on_unload(scheduler.async_register(coordinator))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-
-    # Register services
-    async def async_refresh_service(service_call):
-        """Handle refresh service call."""
-        device_id = service_call.data.get("device_id")
-        if device_id:
-            # Find the coordinator for this device
-            for entry_id, coord in hass.data[DOMAIN].items():
-                if coord.entry.entry_id == entry_id:
-                    await coord.async_refresh_now()
-                    break
-        else:
-            # Refresh all coordinators
-            for coord in hass.data[DOMAIN].values():
-                await coord.async_refresh_now()
-
-    hass.services.async_register(DOMAIN, "refresh", async_refresh_service)
+    entry.async_on_unload(entry.add_update_listener(async_update_listener))
+    if restored:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.entry_id}"
+        )
 
     # Set up custom more-info dialog
     await async_setup_frontend(hass)
@@ -55,9 +208,24 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Handle config entry updates from the options flow."""
+    coordinator: OreiHdmiMatrixCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.async_update_config()
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the saved status and local presets of a removed config entry."""
+    await Store(
+        hass, STORAGE_VERSION, STORAGE_KEY.format(entry_id=entry.entry_id)
+    ).async_remove()
+    await OreiHdmiMatrixPresetStore(hass, entry.entry_id).async_remove()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Unload a config entry."""
+    """Unload a config entry, closing its connections to the matrix."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator: OreiHdmiMatrixCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
 
     return unload_ok
@@ -3,26 +3,141 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+from types import SimpleNamespace
 from typing import Any
 
 import aiohttp
 from aiohttp import ClientTimeout
 
+from .breaker import CircuitBreaker
+from .command_queue import CommandPriority, CommandQueue
 from .const import (
     API_ENDPOINT,
     CMD_GET_STATUS,
     CMD_LOGIN,
+    CMD_PRESET_RECALL,
+    CMD_PRESET_SAVE,
+    CMD_SET_POWER,
     CMD_VIDEO_SWITCH,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_LOGIN_TIMEOUT,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_POLL_TIMEOUT,
+    DEFAULT_SWITCH_TIMEOUT,
     DEFAULT_TIMEOUT,
     NUM_INPUTS,
     NUM_OUTPUTS,
+    NUM_PRESETS,
 )
+from .exceptions import (
+    OreiHdmiMatrixApiError,
+    OreiHdmiMatrixAuthError,
+    OreiHdmiMatrixCommandSkippedError,
+    OreiHdmiMatrixTimeoutError,
+    OreiHdmiMatrixUnavailableError,
+)
+from .log import RateLimitedLogger, redact
+from .metrics import OreiHdmiMatrixMetrics
+from .models import MatrixState
+from .transport import HttpTransport, OreiHdmiMatrixTransport, Reply
 
 _LOGGER = logging.getLogger(__name__)
 
+# Timeout of each command in seconds; switch, preset and power commands use
+# the client's configurable switch timeout
+COMMAND_TIMEOUTS = {
+    CMD_LOGIN: DEFAULT_LOGIN_TIMEOUT,
+    CMD_GET_STATUS: DEFAULT_POLL_TIMEOUT,
+}
+
+
+class OreiHdmiMatrixConnectionStats:
+    """Connection reuse and latency counters for the API client."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.total_latency = 0.0
+        self.last_latency: float | None = None
+        self.reauths = 0
+        self.total_reauth_latency = 0.0
+        self.last_reauth_latency: float | None = None
+
+    @property
+    def reuse_rate(self) -> float | None:
+        """Return the fraction of requests served over a pooled connection."""
+        connections = self.connections_created + self.connections_reused
+        if not connections:
+            return None
+        return self.connections_reused / connections
+
+    @property
+    def average_latency(self) -> float | None:
+        """Return the mean request latency in seconds."""
+        if not self.requests:
+            return None
+        return self.total_latency / self.requests
 
-class OreiHdmiMatrixApiError(Exception):
-    """Exception raised for API errors."""
+    def record_latency(self, latency: float) -> None:
+        """Record the latency of a completed request."""
+        self.requests += 1
+        self.total_latency += latency
+        self.last_latency = latency
+
+    def record_reauth(self, latency: float) -> None:
+        """Record a re-login after the device dropped the session."""
+        self.reauths += 1
+        self.total_reauth_latency += latency
+        self.last_reauth_latency = latency
+
+    @staticmethod
+    def trace_config() -> aiohttp.TraceConfig:
+        """Return a trace config that feeds connection events into stats.
+
+        The stats are taken from each request's ``trace_request_ctx``, so one
+        session can be shared by clients that keep their own counters.
+        """
+
+        async def on_connection_create_end(
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceConnectionCreateEndParams,
+        ) -> None:
+            if isinstance(context.trace_request_ctx, OreiHdmiMatrixConnectionStats):
+                context.trace_request_ctx.connections_created += 1
+
+        async def on_connection_reuseconn(
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceConnectionReuseconnParams,
+        ) -> None:
+            if isinstance(context.trace_request_ctx, OreiHdmiMatrixConnectionStats):
+                context.trace_request_ctx.connections_reused += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters as a dictionary."""
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_rate": self.reuse_rate,
+            "average_latency": self.average_latency,
+            "last_latency": self.last_latency,
+            "reauths": self.reauths,
+            "average_reauth_latency": (
+                self.total_reauth_latency / self.reauths if self.reauths else None
+            ),
+            "last_reauth_latency": self.last_reauth_latency,
+        }
 
 
 class OreiHdmiMatrixApi:
@@ -34,68 +149,217 @@ class OreiHdmiMatrixApi:
         username: str,
         password: str,
         timeout: int = DEFAULT_TIMEOUT,
+        session: aiohttp.ClientSession | None = None,
+        stats: OreiHdmiMatrixConnectionStats | None = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        breaker: CircuitBreaker | None = None,
+        num_inputs: int = NUM_INPUTS,
+        num_outputs: int = NUM_OUTPUTS,
+        transport: OreiHdmiMatrixTransport | None = None,
+        metrics: OreiHdmiMatrixMetrics | None = None,
+        switch_timeout: float = DEFAULT_SWITCH_TIMEOUT,
     ) -> None:
-        """Initialize the API client."""
+        """Initialize the API client.
+
+        When a session is passed in (e.g. one sharing Home Assistant's connection
+        pool) it is used as-is and left open on exit. Connection reuse is only
+        counted if that session was created with the stats trace config.
+        ``num_inputs`` and ``num_outputs`` are the matrix size used to validate
+        routes and size the route table. Commands go to the web interface
+        over HTTP unless another ``transport`` is given, which is closed on
+        exit and reopened on the next command. Per-command counters,
+        latencies and parse times are recorded into ``metrics`` if given.
+
+        ``timeout`` caps every request. Within it logins and polls have short
+        fixed budgets and switches and preset commands ``switch_timeout``;
+        the command methods also take a ``deadline`` (a ``time.monotonic()``
+        value) that the command, any login and any replay must all meet.
+        """
         self.host = host
         self.username = username
         self.password = password
-        self.timeout = ClientTimeout(total=timeout)
-        self._session: aiohttp.ClientSession | None = None
+        self.timeout = ClientTimeout(total=timeout, sock_connect=DEFAULT_CONNECT_TIMEOUT)
+        self.switch_timeout = switch_timeout
+        self.stats = stats or OreiHdmiMatrixConnectionStats()
+        self.breaker = breaker or CircuitBreaker()
+        self.num_inputs = num_inputs
+        self.num_outputs = num_outputs
+        self._metrics = metrics
+        self._url = (
+            f"http://{host}{API_ENDPOINT}"
+            if transport is None
+            else f"{transport.name}://{host}"
+        )
+        self._max_connections = max_connections
+        self._transport = transport
+        self._owns_transport = transport is None
+        # Commands wait here in priority order for the transport's slots
+        self.commands = CommandQueue(
+            (transport or HttpTransport).max_in_flight
+        )
+        self._session: aiohttp.ClientSession | None = session
+        self._owns_session = session is None
         self._authenticated = False
+        # Logins are single-flight; the generation tells waiters one happened
+        self._auth_lock = asyncio.Lock()
+        self._auth_generation = 0
+        self._traffic_log = RateLimitedLogger()
+
+    @property
+    def transport(self) -> OreiHdmiMatrixTransport | None:
+        """Return the transport commands are sent over."""
+        return self._transport
+
+    @property
+    def metrics(self) -> OreiHdmiMatrixMetrics | None:
+        """Return the metrics being collected, or None if disabled."""
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics: OreiHdmiMatrixMetrics | None) -> None:
+        """Start or stop collecting metrics."""
+        self._metrics = metrics
+        if self._transport is not None:
+            self._transport.metrics = metrics
 
     async def __aenter__(self) -> OreiHdmiMatrixApi:
         """Async context manager entry."""
-        self._session = aiohttp.ClientSession(timeout=self.timeout)
+        if self._transport is None:
+            if self._owns_session:
+                connector = aiohttp.TCPConnector(
+                    limit=self._max_connections,
+                    limit_per_host=self._max_connections,
+                    keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT,
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=self.timeout,
+                    trace_configs=[self.stats.trace_config()],
+                )
+            assert self._session is not None
+            self._transport = HttpTransport(
+                self.host,
+                self._session,
+                self.timeout,
+                stats=self.stats,
+            )
+        self._transport.metrics = self._metrics
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
         """Async context manager exit."""
-        if self._session:
+        if self._transport is not None:
+            await self._transport.close()
+        if self._owns_transport:
+            self._transport = None
+        if self._session and self._owns_session:
             await self._session.close()
+            self._session = None
 
-    async def _request(self, data: dict[str, Any]) -> dict[str, Any]:
-        """Make a request to the API."""
-        if not self._session:
+    async def _request(
+        self,
+        data: dict[str, Any],
+        priority: CommandPriority = CommandPriority.REFRESH,
+        deadline: float | None = None,
+    ) -> dict[str, Any]:
+        """Send a command over the transport once the queue admits it.
+
+        The time spent waiting in the queue counts towards the command's
+        timeout, which is cut short to meet ``deadline``.
+        """
+        transport = self._transport
+        if transport is None:
             raise OreiHdmiMatrixApiError("Session not initialized")
 
-        url = f"http://{self.host}{API_ENDPOINT}"
-        _LOGGER.debug("Making API request to %s with data: %s", url, data)
+        command = data.get("comhead", "unknown")
+        timeout = COMMAND_TIMEOUTS.get(command, self.switch_timeout)
+        # A timeout forced by the caller's deadline says nothing about the device
+        by_deadline = False
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise OreiHdmiMatrixTimeoutError(f"No time left to send {command}")
+            if remaining < timeout:
+                timeout, by_deadline = remaining, True
+
+        url = self._url
+        if not self.breaker.allow_request():
+            raise OreiHdmiMatrixUnavailableError(
+                f"{self.host} is not responding; next attempt in "
+                f"{self.breaker.retry_in:.0f} seconds"
+            )
+
+        if self._traffic_log.enabled:
+            self._traffic_log.debug(
+                f"request {command}",
+                "Request to %s: %s",
+                url,
+                redact(data),
+            )
         
+        # Whether the device answered; None if the request never got that far
+        reachable: bool | None = None
+        sent = False
+        queued = time.monotonic()
         try:
-            async with self._session.post(url, json=data) as response:
-                _LOGGER.debug("API response status: %s", response.status)
-                _LOGGER.debug("API response content-type: %s", response.headers.get('content-type', 'unknown'))
-                
-                if response.status != 200:
-                    response_text = await response.text()
-                    _LOGGER.error("HTTP error %s: %s, response: %s", response.status, response.reason, response_text)
-                    raise OreiHdmiMatrixApiError(
-                        f"HTTP error {response.status}: {response.reason}"
-                    )
-                
-                # Get the response text first to see what we're dealing with
-                response_text = await response.text()
-                _LOGGER.debug("API response text: %s", response_text)
-                
-                # Try to parse as JSON
+            async with self.commands.slot(priority, timeout):
+                started = time.monotonic()
+                sent = True
+                failure: Exception | None = None
                 try:
-                    import json
-                    result = json.loads(response_text)
-                    _LOGGER.debug("API response JSON: %s", result)
-                    return result
-                except json.JSONDecodeError as json_err:
-                    _LOGGER.error("Failed to parse JSON response: %s, response text: %s", json_err, response_text)
-                    # If it's not JSON, it might be plain text - let's try to handle it
-                    raise OreiHdmiMatrixApiError(f"Invalid JSON response: {response_text}")
-                
-        except aiohttp.ClientError as err:
+                    result = await transport.send(data, timeout - (started - queued))
+                except Exception as err:
+                    failure = err
+                    raise
+                finally:
+                    latency = time.monotonic() - started
+                    self.stats.record_latency(latency)
+                    if self._metrics is not None:
+                        self._metrics.record_command(
+                            command,
+                            latency,
+                            error=failure is not None,
+                            timeout=isinstance(failure, asyncio.TimeoutError),
+                        )
+            reachable = True
+            return result
+        except OreiHdmiMatrixCommandSkippedError:
+            raise
+        except OreiHdmiMatrixApiError:
+            reachable = True
+            raise
+        except asyncio.TimeoutError as err:
+            # Checked before OSError, which TimeoutError derives from
+            if sent and not by_deadline:
+                reachable = False
+            _LOGGER.error(
+                "%s to %s timed out after %.1f seconds%s",
+                command,
+                url,
+                timeout,
+                "" if sent else " waiting for the matrix",
+            )
+            raise OreiHdmiMatrixTimeoutError(f"Request timed out: {command}") from err
+        except (aiohttp.ClientError, OSError) as err:
+            reachable = False
             _LOGGER.error("Request failed to %s: %s", url, err)
             raise OreiHdmiMatrixApiError(f"Request failed: {err}") from err
         except Exception as err:
             _LOGGER.error("Unexpected error during API request to %s: %s", url, err)
             raise OreiHdmiMatrixApiError(f"Unexpected error: {err}") from err
+        finally:
+            if reachable is True:
+                self.breaker.record_success()
+            elif reachable is False:
+                self.breaker.record_failure()
+            else:
+                self.breaker.release()
 
-    async def authenticate(self) -> bool:
+    async def authenticate(
+        self,
+        priority: CommandPriority = CommandPriority.REFRESH,
+        deadline: float | None = None,
+    ) -> bool:
         """Authenticate with the matrix."""
         data = {
             "comhead": CMD_LOGIN,
@@ -104,75 +368,249 @@ class OreiHdmiMatrixApi:
         }
         
         try:
-            _LOGGER.info("Authenticating with OREI HDMI Matrix at %s", self.host)
-            result = await self._request(data)
+            _LOGGER.debug("Authenticating with OREI HDMI Matrix at %s", self.host)
+            result = await self._request(data, priority, deadline)
             _LOGGER.debug("Authentication response: %s", result)
             
             success = result.get("result") == 1
             self._authenticated = success
             
             if success:
-                _LOGGER.info("Successfully authenticated with OREI HDMI Matrix")
+                self._auth_generation += 1
+                _LOGGER.debug("Successfully authenticated with OREI HDMI Matrix")
             else:
                 _LOGGER.error("Authentication failed - result: %s", result.get("result"))
                 
             return success
             
+        except (OreiHdmiMatrixUnavailableError, OreiHdmiMatrixTimeoutError):
+            self._authenticated = False
+            raise
+        except OreiHdmiMatrixCommandSkippedError:
+            raise
         except OreiHdmiMatrixApiError as err:
             _LOGGER.error("Authentication error: %s", err)
             self._authenticated = False
             return False
 
-    async def get_status(self) -> dict[str, Any]:
-        """Get the current status of the matrix."""
-        if not self._authenticated:
-            await self.authenticate()
-            
+    async def _ensure_authenticated(
+        self,
+        priority: CommandPriority = CommandPriority.REFRESH,
+        deadline: float | None = None,
+    ) -> None:
+        """Log in unless a session is active, sharing one login between callers.
+
+        Raises ``OreiHdmiMatrixAuthError`` if the matrix refuses the login, so
+        no command is sent without a session.
+        """
+        if self._authenticated:
+            return
+        async with self._auth_lock:
+            if not self._authenticated and not await self.authenticate(
+                priority, deadline
+            ):
+                raise OreiHdmiMatrixAuthError(f"Login to {self.host} failed")
+
+    async def _reauthenticate(
+        self,
+        generation: int,
+        priority: CommandPriority = CommandPriority.REFRESH,
+        deadline: float | None = None,
+    ) -> None:
+        """Log in again after the device dropped the session.
+
+        Callers pass the login generation their failed command was sent under;
+        if another caller already logged in since then, that login is reused.
+        """
+        async with self._auth_lock:
+            if self._auth_generation != generation:
+                return
+            _LOGGER.debug("Session with %s expired, logging in again", self.host)
+            self._authenticated = False
+            started = time.monotonic()
+            success = await self.authenticate(priority, deadline)
+            self.stats.record_reauth(time.monotonic() - started)
+            if not success:
+                raise OreiHdmiMatrixAuthError(
+                    f"Session with {self.host} expired and login failed"
+                )
+
+    @staticmethod
+    def _is_session_expired(data: dict[str, Any], result: dict[str, Any]) -> bool:
+        """Return True if the device answered a command with its login prompt."""
+        return result.get("comhead") == CMD_LOGIN and data.get("comhead") != CMD_LOGIN
+
+    async def _command(
+        self,
+        data: dict[str, Any],
+        priority: CommandPriority = CommandPriority.REFRESH,
+        deadline: float | None = None,
+    ) -> dict[str, Any]:
+        """Send a command, logging in again and replaying it once if needed.
+
+        A command is only sent once logged in, and only replayed after a
+        session that had been accepted expired. The login is sent at the
+        priority of the command that needs it, and the login and replay share
+        the command's ``deadline``.
+        """
+        await self._ensure_authenticated(priority, deadline)
+        generation = self._auth_generation
+        try:
+            result = await self._request(data, priority, deadline)
+            if not self._is_session_expired(data, result):
+                return result
+        except OreiHdmiMatrixAuthError:
+            pass
+
+        await self._reauthenticate(generation, priority, deadline)
+        result = await self._request(data, priority, deadline)
+        if self._is_session_expired(data, result):
+            self._authenticated = False
+            raise OreiHdmiMatrixAuthError("Session expired and login failed")
+        return result
+
+    async def get_status(
+        self,
+        previous: MatrixState | None = None,
+        names: bool = True,
+        priority: CommandPriority = CommandPriority.REFRESH,
+        deadline: float | None = None,
+    ) -> MatrixState:
+        """Get the current state of the matrix.
+
+        Tables that are unchanged from ``previous`` are shared with it. With
+        ``names`` False only routes and power are read and the names of
+        ``previous`` are kept. Scheduled polls pass a background ``priority``
+        so that user commands go first; such a poll may then be skipped with
+        ``OreiHdmiMatrixCommandSkippedError``.
+        """
         data = {
             "comhead": CMD_GET_STATUS,
             "language": 0,
         }
         
-        result = await self._request(data)
+        result = await self._command(data, priority, deadline)
         
-        # Parse the allsource array to create a mapping
-        all_source = result.get("allsource", [])
-        if len(all_source) >= NUM_OUTPUTS:
-            # Remove the trailing 0 if present
-            source_mapping = all_source[:NUM_OUTPUTS]
-        else:
-            source_mapping = all_source
-            
-        return {
-            "power": result.get("power", 0),
-            "source_mapping": source_mapping,
-            "input_names": result.get("allinputname", []),
-            "output_names": result.get("alloutputname", []),
-            "preset_names": result.get("allname", []),
-        }
+        if self._metrics is None:
+            return MatrixState.from_reply(result, self.num_outputs, previous, names)
+
+        # One sample per reply: decoding it and building the status from it
+        started = time.perf_counter()
+        status = MatrixState.from_reply(result, self.num_outputs, previous, names)
+        parse_time = time.perf_counter() - started
+        if isinstance(result, Reply):
+            parse_time += result.decode_time
+        self._metrics.record_parse(parse_time)
+        return status
 
-    async def set_output_input(self, output: int, input_: int) -> bool:
+    def _validate_route(self, output: int, input_: int) -> None:
+        """Raise ValueError if the output or input is out of range."""
+        if not (1 <= output <= self.num_outputs):
+            raise ValueError(f"Output must be between 1 and {self.num_outputs}")
+        if not (1 <= input_ <= self.num_inputs):
+            raise ValueError(f"Input must be between 1 and {self.num_inputs}")
+
+    async def set_output_input(
+        self, output: int, input_: int, deadline: float | None = None
+    ) -> bool:
         """Set which input is connected to an output."""
-        if not self._authenticated:
-            await self.authenticate()
-            
-        if not (1 <= output <= NUM_OUTPUTS):
-            raise ValueError(f"Output must be between 1 and {NUM_OUTPUTS}")
-        if not (1 <= input_ <= NUM_INPUTS):
-            raise ValueError(f"Input must be between 1 and {NUM_INPUTS}")
-            
+        self._validate_route(output, input_)
+
         data = {
             "comhead": CMD_VIDEO_SWITCH,
             "language": 0,
             "source": [output, input_],
         }
         
-        result = await self._request(data)
+        result = await self._command(data, CommandPriority.INTERACTIVE, deadline)
         success = result.get("result") == 1
         
         if success:
-            _LOGGER.info("Successfully set output %d to input %d", output, input_)
+            _LOGGER.debug("Successfully set output %d to input %d", output, input_)
         else:
             _LOGGER.error("Failed to set output %d to input %d", output, input_)
             
         return success
+
+    @staticmethod
+    def _validate_preset(preset: int) -> None:
+        """Raise ValueError if the preset slot is out of range."""
+        if not (1 <= preset <= NUM_PRESETS):
+            raise ValueError(f"Preset must be between 1 and {NUM_PRESETS}")
+
+    async def save_preset(self, preset: int, deadline: float | None = None) -> bool:
+        """Store the current routes in one of the matrix's preset slots."""
+        self._validate_preset(preset)
+
+        data = {
+            "comhead": CMD_PRESET_SAVE,
+            "language": 0,
+            "index": preset,
+        }
+
+        result = await self._command(data, CommandPriority.INTERACTIVE, deadline)
+        success = result.get("result") == 1
+        if not success:
+            _LOGGER.error("Failed to save preset %d", preset)
+        return success
+
+    async def recall_preset(self, preset: int, deadline: float | None = None) -> bool:
+        """Apply the routes stored in a preset slot with a single command."""
+        self._validate_preset(preset)
+
+        data = {
+            "comhead": CMD_PRESET_RECALL,
+            "language": 0,
+            "index": preset,
+        }
+
+        result = await self._command(data, CommandPriority.INTERACTIVE, deadline)
+        success = result.get("result") == 1
+        if success:
+            _LOGGER.debug("Recalled preset %d", preset)
+        else:
+            _LOGGER.error("Failed to recall preset %d", preset)
+        return success
+
+    async def set_power(self, power: bool, deadline: float | None = None) -> bool:
+        """Turn the matrix on, or put it in standby."""
+        data = {
+            "comhead": CMD_SET_POWER,
+            "language": 0,
+            "power": int(power),
+        }
+
+        result = await self._command(data, CommandPriority.INTERACTIVE, deadline)
+        success = result.get("result") == 1
+        if success:
+            _LOGGER.debug("Turned the matrix %s", "on" if power else "off")
+        else:
+            _LOGGER.error("Failed to turn the matrix %s", "on" if power else "off")
+        return success
+
+    async def set_routes(
+        self, routes: dict[int, int], deadline: float | None = None
+    ) -> dict[int, bool]:
+        """Set several outputs at once, keyed by output with the input as value.
+
+        Switches are queued together as interactive commands; how many are in
+        flight at a time is bounded by the transport. Returns the success of each
+        output; a failed switch does not abort the others. Switches still
+        queued at the ``deadline`` fail without being sent.
+        """
+        for output, input_ in routes.items():
+            self._validate_route(output, input_)
+
+        await self._ensure_authenticated(CommandPriority.INTERACTIVE, deadline)
+
+        async def _switch(output: int, input_: int) -> bool:
+            try:
+                return await self.set_output_input(output, input_, deadline)
+            except OreiHdmiMatrixApiError as err:
+                _LOGGER.error("Error setting output %d to input %d: %s", output, input_, err)
+                return False
+
+        results = await asyncio.gather(
+            *(_switch(output, input_) for output, input_ in routes.items())
+        )
+        return dict(zip(routes, results))
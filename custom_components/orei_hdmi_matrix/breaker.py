@@ -0,0 +1,113 @@
+"""Circuit breaker for OREI HDMI Matrix requests."""
+from __future__ import annotations
+
+import time
+from collections import deque
+from collections.abc import Callable
+from enum import Enum
+from typing import Any
+
+from .const import DEFAULT_BREAKER_FAILURE_THRESHOLD, DEFAULT_BREAKER_RESET_TIMEOUT
+
+# Number of recent state transitions kept for diagnostics
+TRANSITION_HISTORY = 10
+
+
+class CircuitState(str, Enum):
+    """State of the circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stop sending requests to a device that is not answering.
+
+    After ``failure_threshold`` consecutive transport failures the breaker
+    opens and requests are refused without touching the network. Once
+    ``reset_timeout`` seconds have passed a single probe request is let
+    through (half-open); its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_BREAKER_RESET_TIMEOUT,
+        on_transition: Callable[[CircuitState, CircuitState], None] | None = None,
+    ) -> None:
+        """Initialize the breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_transition = on_transition
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.transition_count = 0
+        self.transitions: deque[tuple[float, CircuitState, CircuitState]] = deque(
+            maxlen=TRANSITION_HISTORY
+        )
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def retry_in(self) -> float:
+        """Return seconds until the next probe is allowed."""
+        if self.state is not CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now."""
+        if self.state is CircuitState.CLOSED:
+            return True
+        if self.state is CircuitState.OPEN:
+            if self.retry_in > 0:
+                return False
+            self._transition(CircuitState.HALF_OPEN)
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        """Record that the device answered."""
+        self.failures = 0
+        self._probe_in_flight = False
+        if self.state is not CircuitState.CLOSED:
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        """Record that the device could not be reached."""
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state is CircuitState.HALF_OPEN or (
+            self.state is CircuitState.CLOSED
+            and self.failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._transition(CircuitState.OPEN)
+
+    def release(self) -> None:
+        """Forget an allowed request that ended without an outcome."""
+        self._probe_in_flight = False
+
+    def _transition(self, state: CircuitState) -> None:
+        """Move to a new state and notify the listener."""
+        previous, self.state = self.state, state
+        self.transition_count += 1
+        self.transitions.append((time.time(), previous, state))
+        if self.on_transition:
+            self.on_transition(previous, state)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the breaker state for diagnostics."""
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.failures,
+            "retry_in": self.retry_in,
+            "transition_count": self.transition_count,
+            "transitions": [
+                {"time": at, "from": previous.value, "to": state.value}
+                for at, previous, state in self.transitions
+            ],
+        }
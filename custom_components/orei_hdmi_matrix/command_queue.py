@@ -0,0 +1,117 @@
+"""Priority admission of commands to an OREI HDMI Matrix."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from itertools import count
+from typing import Any
+
+from .exceptions import OreiHdmiMatrixCommandSkippedError
+
+
+class CommandPriority(IntEnum):
+    """Priority of a command; lower values are sent first."""
+
+    INTERACTIVE = 0  # switches and presets chosen by a user
+    REFRESH = 1  # polls requested after a change or by a service
+    BACKGROUND = 2  # scheduled polls
+
+
+class CommandQueue:
+    """Admit commands to the device in priority order.
+
+    At most ``slots`` commands are in flight. Waiting commands are admitted
+    most urgent first, in arrival order within a priority. When an
+    interactive command arrives, waiting background commands are skipped:
+    they fail with ``OreiHdmiMatrixCommandSkippedError`` rather than delay it.
+    A command already sent to the device is never interrupted.
+    """
+
+    def __init__(self, slots: int = 1) -> None:
+        """Initialize the queue."""
+        self.slots = slots
+        self.in_flight = 0
+        self.skipped = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = count()
+
+    @property
+    def depth(self) -> int:
+        """Return the number of commands waiting for a slot."""
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(
+        self, priority: CommandPriority, timeout: float | None = None
+    ) -> AsyncIterator[None]:
+        """Wait for a slot and hold it while the command runs.
+
+        Raises ``TimeoutError`` if no slot is free within ``timeout`` seconds.
+        """
+        async with asyncio.timeout(timeout):
+            await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: CommandPriority) -> None:
+        """Take a slot, queueing behind more urgent or earlier commands."""
+        if priority == CommandPriority.INTERACTIVE:
+            self._skip_background()
+        if self.in_flight < self.slots and not self._waiters:
+            self.in_flight += 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        waiter = (priority, next(self._sequence), future)
+        heapq.heappush(self._waiters, waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    heapq.heapify(self._waiters)
+            elif future.exception() is None:
+                # The slot was handed over just before the cancellation
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        """Free a slot and hand it to the most urgent waiting command."""
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < self.slots:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    def _skip_background(self) -> None:
+        """Fail the waiting background commands."""
+        kept = []
+        for waiter in self._waiters:
+            if waiter[0] == CommandPriority.BACKGROUND and not waiter[2].done():
+                waiter[2].set_exception(
+                    OreiHdmiMatrixCommandSkippedError(
+                        "Skipped for an interactive command"
+                    )
+                )
+                self.skipped += 1
+            else:
+                kept.append(waiter)
+        if len(kept) != len(self._waiters):
+            heapq.heapify(kept)
+            self._waiters = kept
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the queue state for diagnostics."""
+        return {
+            "slots": self.slots,
+            "in_flight": self.in_flight,
+            "waiting": self.depth,
+            "skipped_background": self.skipped,
+        }
@@ -19,13 +19,36 @@ from .const import (
     CONF_NAME,
     CONF_ENABLED,
     CONF_AVAILABLE_INPUTS,
+    CONF_COLLECT_METRICS,
     CONF_INPUT_ENABLED,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_NUM_INPUTS,
+    CONF_NUM_OUTPUTS,
+    CONF_PORT,
+    CONF_SWITCH_DEBOUNCE,
+    CONF_SWITCH_TIMEOUT,
+    CONF_TRANSPORT,
+    CONF_UPDATE_INTERVAL,
+    CONF_UPDATE_INTERVAL_DECAY,
+    DEFAULT_COLLECT_METRICS,
+    DEFAULT_MAX_UPDATE_INTERVAL,
     DEFAULT_PASSWORD,
+    DEFAULT_SWITCH_DEBOUNCE,
+    DEFAULT_SWITCH_TIMEOUT,
+    DEFAULT_TCP_PORT,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_UPDATE_INTERVAL_DECAY,
     DEFAULT_USERNAME,
     DOMAIN,
+    MAX_PORTS,
     NUM_INPUTS,
     NUM_OUTPUTS,
+    TRANSPORT_HTTP,
+    TRANSPORT_TCP,
+    TRANSPORTS,
 )
+from .models import detect_dimensions
+from .transport import TcpTransport
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,31 +57,50 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
         vol.Required(CONF_HOST): str,
         vol.Required(CONF_USERNAME, default=DEFAULT_USERNAME): str,
         vol.Required(CONF_PASSWORD, default=DEFAULT_PASSWORD): str,
+        # The web interface (HTTP) or the ASCII control port (TCP)
+        vol.Required(CONF_TRANSPORT, default=TRANSPORT_HTTP): vol.In(TRANSPORTS),
+        vol.Required(CONF_PORT, default=DEFAULT_TCP_PORT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=65535)
+        ),
+        # Leave empty to use the size reported by the matrix
+        vol.Optional(CONF_NUM_INPUTS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PORTS)
+        ),
+        vol.Optional(CONF_NUM_OUTPUTS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PORTS)
+        ),
     }
 )
 
 
-def create_default_config() -> dict[str, Any]:
+def create_default_config(
+    num_inputs: int = NUM_INPUTS, num_outputs: int = NUM_OUTPUTS
+) -> dict[str, Any]:
     """Create default configuration for inputs and outputs."""
     inputs = {}
     outputs = {}
     
     # Create default input configuration
-    for i in range(1, NUM_INPUTS + 1):
+    for i in range(1, num_inputs + 1):
         inputs[str(i)] = {
             CONF_NAME: f"Input {i}",
             CONF_INPUT_ENABLED: True,
         }
     
     # Create default output configuration
-    for i in range(1, NUM_OUTPUTS + 1):
+    for i in range(1, num_outputs + 1):
         outputs[str(i)] = {
             CONF_NAME: f"Output {i}",
             CONF_ENABLED: True,
-            CONF_AVAILABLE_INPUTS: list(range(1, NUM_INPUTS + 1)),  # All inputs available by default
+            CONF_AVAILABLE_INPUTS: list(range(1, num_inputs + 1)),  # All inputs available by default
         }
     
-    return {CONF_INPUTS: inputs, CONF_OUTPUTS: outputs}
+    return {
+        CONF_NUM_INPUTS: num_inputs,
+        CONF_NUM_OUTPUTS: num_outputs,
+        CONF_INPUTS: inputs,
+        CONF_OUTPUTS: outputs,
+    }
 
 
 def clean_host(host: str) -> str:
@@ -76,24 +118,41 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     """Validate the user input allows us to connect."""
     # Clean the host input
     clean_host_value = clean_host(data[CONF_HOST])
+
+    # Keep every reported route so the matrix size can be detected. The
+    # control port reports no names and no size, so it must be configured.
+    transport = None
+    num_outputs = MAX_PORTS
+    if data.get(CONF_TRANSPORT, TRANSPORT_HTTP) == TRANSPORT_TCP:
+        if CONF_NUM_INPUTS not in data or CONF_NUM_OUTPUTS not in data:
+            raise SizeRequired
+        num_outputs = data[CONF_NUM_OUTPUTS]
+        transport = TcpTransport(
+            clean_host_value,
+            data.get(CONF_PORT, DEFAULT_TCP_PORT),
+            num_outputs=num_outputs,
+        )
     
     async with OreiHdmiMatrixApi(
         host=clean_host_value,
         username=data[CONF_USERNAME],
         password=data[CONF_PASSWORD],
+        num_inputs=MAX_PORTS,
+        num_outputs=num_outputs,
+        transport=transport,
     ) as api:
-        _LOGGER.info("Attempting to authenticate with OREI HDMI Matrix at %s", clean_host_value)
+        _LOGGER.debug("Attempting to authenticate with OREI HDMI Matrix at %s", clean_host_value)
         
         if not await api.authenticate():
             _LOGGER.error("Authentication failed for OREI HDMI Matrix at %s", clean_host_value)
             raise CannotConnect
 
-        _LOGGER.info("Authentication successful, getting device status")
+        _LOGGER.debug("Authentication successful, getting device status")
         
         try:
             # Get device info to confirm connection
             status = await api.get_status()
-            _LOGGER.info("Successfully retrieved device status: %s", status)
+            _LOGGER.debug("Successfully retrieved device status: %s", status)
             return {"title": f"OREI HDMI Matrix ({clean_host_value})", "status": status}
         except Exception as err:
             _LOGGER.error("Failed to get device status after authentication: %s", err)
@@ -122,6 +181,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors["base"] = "cannot_connect"
         except InvalidAuth:
             errors["base"] = "invalid_auth"
+        except SizeRequired:
+            errors["base"] = "size_required"
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception("Unexpected exception")
             errors["base"] = "unknown"
@@ -130,7 +191,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             config_data = user_input.copy()
             # Clean the host value before saving
             config_data[CONF_HOST] = clean_host(user_input[CONF_HOST])
-            config_data.update(create_default_config())
+            # Configured sizes win over the ones detected from the status
+            num_inputs, num_outputs = detect_dimensions(info["status"])
+            config_data.update(
+                create_default_config(
+                    user_input.get(CONF_NUM_INPUTS, num_inputs),
+                    user_input.get(CONF_NUM_OUTPUTS, num_outputs),
+                )
+            )
             return self.async_create_entry(title=info["title"], data=config_data)
 
         return self.async_show_form(
@@ -152,18 +220,28 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Configure inputs."""
+        num_inputs = self.config_entry.data.get(CONF_NUM_INPUTS, NUM_INPUTS)
         if user_input is not None:
             # Update the configuration
             new_data = self.config_entry.data.copy()
             
             # Process input configurations
             inputs = {}
-            for i in range(1, NUM_INPUTS + 1):
+            for i in range(1, num_inputs + 1):
                 inputs[str(i)] = {
                     CONF_NAME: user_input[f"input_{i}_name"],
                     CONF_INPUT_ENABLED: user_input[f"input_{i}_enabled"],
                 }
             new_data[CONF_INPUTS] = inputs
+            for key in (
+                CONF_SWITCH_DEBOUNCE,
+                CONF_SWITCH_TIMEOUT,
+                CONF_UPDATE_INTERVAL,
+                CONF_MAX_UPDATE_INTERVAL,
+                CONF_UPDATE_INTERVAL_DECAY,
+                CONF_COLLECT_METRICS,
+            ):
+                new_data[key] = user_input[key]
             
             self.hass.config_entries.async_update_entry(
                 self.config_entry, data=new_data
@@ -173,7 +251,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         # Create schema for inputs
         input_fields = {}
         inputs = self.config_entry.data.get(CONF_INPUTS, {})
-        for i in range(1, NUM_INPUTS + 1):
+        for i in range(1, num_inputs + 1):
             # Input name
             name_key = f"input_{i}_name"
             default_name = inputs.get(str(i), {}).get(CONF_NAME, f"Input {i}")
@@ -184,6 +262,55 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             default_enabled = inputs.get(str(i), {}).get(CONF_INPUT_ENABLED, True)
             input_fields[vol.Required(enabled_key, default=default_enabled)] = bool
 
+        # Debounce window for coalescing rapid input changes
+        default_debounce = self.config_entry.data.get(
+            CONF_SWITCH_DEBOUNCE, DEFAULT_SWITCH_DEBOUNCE
+        )
+        input_fields[
+            vol.Required(CONF_SWITCH_DEBOUNCE, default=default_debounce)
+        ] = vol.All(vol.Coerce(float), vol.Range(min=0, max=5))
+
+        # Time allowed for each switch or preset command
+        input_fields[
+            vol.Required(
+                CONF_SWITCH_TIMEOUT,
+                default=self.config_entry.data.get(
+                    CONF_SWITCH_TIMEOUT, DEFAULT_SWITCH_TIMEOUT
+                ),
+            )
+        ] = vol.All(vol.Coerce(float), vol.Range(min=1, max=30))
+
+        # Adaptive polling: fastest interval, idle interval and growth per stable poll
+        data = self.config_entry.data
+        input_fields[
+            vol.Required(
+                CONF_UPDATE_INTERVAL,
+                default=data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
+            )
+        ] = vol.All(vol.Coerce(float), vol.Range(min=1, max=300))
+        input_fields[
+            vol.Required(
+                CONF_MAX_UPDATE_INTERVAL,
+                default=data.get(CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL),
+            )
+        ] = vol.All(vol.Coerce(float), vol.Range(min=1, max=3600))
+        input_fields[
+            vol.Required(
+                CONF_UPDATE_INTERVAL_DECAY,
+                default=data.get(
+                    CONF_UPDATE_INTERVAL_DECAY, DEFAULT_UPDATE_INTERVAL_DECAY
+                ),
+            )
+        ] = vol.All(vol.Coerce(float), vol.Range(min=1, max=10))
+
+        # Request, poll and parsing metrics for diagnostics and the metric sensors
+        input_fields[
+            vol.Required(
+                CONF_COLLECT_METRICS,
+                default=data.get(CONF_COLLECT_METRICS, DEFAULT_COLLECT_METRICS),
+            )
+        ] = bool
+
         schema = vol.Schema(input_fields)
         
         return self.async_show_form(
@@ -198,3 +325,7 @@ class CannotConnect(HomeAssistantError):
 
 class InvalidAuth(HomeAssistantError):
     """Error to indicate there is invalid auth."""
+
+
+class SizeRequired(HomeAssistantError):
+    """Error to indicate the matrix size must be entered for the control port."""
@@ -3,8 +3,13 @@ from datetime import timedelta
 
 DOMAIN = "orei_hdmi_matrix"
 
+# hass.data key of the scheduler shared by all config entries
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+
 # Configuration keys
 CONF_HOST = "host"
+CONF_PORT = "port"
+CONF_TRANSPORT = "transport"
 CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 CONF_INPUTS = "inputs"
@@ -14,12 +19,61 @@ CONF_ENABLED = "enabled"
 CONF_AVAILABLE_INPUTS = "available_inputs"
 CONF_INPUT_ENABLED = "input_enabled"
 CONF_UPDATE_INTERVAL = "update_interval"
+CONF_SWITCH_DEBOUNCE = "switch_debounce"
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+CONF_UPDATE_INTERVAL_DECAY = "update_interval_decay"
+CONF_NUM_INPUTS = "num_inputs"
+CONF_NUM_OUTPUTS = "num_outputs"
+CONF_COLLECT_METRICS = "collect_metrics"
+CONF_SWITCH_TIMEOUT = "switch_timeout"
+
+# Service names and attributes
+SERVICE_ROUTE_MANY = "route_many"
+SERVICE_SAVE_PRESET = "save_preset"
+SERVICE_RECALL_PRESET = "recall_preset"
+ATTR_ROUTES = "routes"
+ATTR_PRESET = "preset"
+ATTR_NAME = "name"
+ATTR_TIMEOUT = "timeout"
+
+# Storage of the last known status, per config entry
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.{{entry_id}}"
+PRESET_STORAGE_KEY = f"{DOMAIN}.{{entry_id}}.presets"
+SNAPSHOT_SAVE_DELAY = 60  # seconds; pending snapshots are also written on shutdown
+
+# Events
+EVENT_ROUTE_ROLLBACK = f"{DOMAIN}_route_rollback"
 
 # Default values
 DEFAULT_USERNAME = "Admin"
 DEFAULT_PASSWORD = "admin"
-DEFAULT_TIMEOUT = 10
-DEFAULT_UPDATE_INTERVAL = 5  # seconds
+DEFAULT_TIMEOUT = 10  # seconds, the most any single request may take
+DEFAULT_CONNECT_TIMEOUT = 3  # seconds to open a connection to the matrix
+DEFAULT_LOGIN_TIMEOUT = 5  # seconds
+DEFAULT_POLL_TIMEOUT = 4  # seconds, below the fastest poll interval
+DEFAULT_SWITCH_TIMEOUT = 5  # seconds per switch or preset command
+DEFAULT_UPDATE_INTERVAL = 5  # seconds, also the fastest adaptive poll interval
+DEFAULT_MAX_UPDATE_INTERVAL = 60  # seconds, idle poll interval once state is stable
+DEFAULT_UPDATE_INTERVAL_DECAY = 1.5  # growth factor per stable poll
+DEFAULT_FAST_POLL_PERIOD = 30  # seconds of fast polling after a change
+DEFAULT_MAX_CONNECTIONS = 2  # The embedded web server only copes with a couple at once
+DEFAULT_KEEPALIVE_TIMEOUT = 30  # seconds
+DEFAULT_BREAKER_FAILURE_THRESHOLD = 3  # consecutive failures before failing fast
+DEFAULT_BREAKER_RESET_TIMEOUT = 30  # seconds before probing an unreachable matrix
+DEFAULT_SWITCH_DEBOUNCE = 0.3  # seconds to wait for further select changes
+DEFAULT_TCP_PORT = 23  # control port of the ASCII protocol
+DEFAULT_PIPELINE_DEPTH = 8  # commands outstanding on the control connection
+DEFAULT_PUSH_POLL_INTERVAL = 300  # seconds between consistency polls while pushed
+DEFAULT_STANDBY_POLL_INTERVAL = 300  # seconds between heartbeat polls in standby
+DEFAULT_PUSH_RETRY_INTERVAL = 5  # seconds before reopening a dropped control connection
+DEFAULT_COLLECT_METRICS = False
+DEFAULT_NAMES_TTL = 3600  # seconds before a poll reads the names again
+
+# Transports
+TRANSPORT_HTTP = "http"
+TRANSPORT_TCP = "tcp"
+TRANSPORTS = [TRANSPORT_HTTP, TRANSPORT_TCP]
 
 # API endpoints
 API_ENDPOINT = "/cgi-bin/instr"
@@ -28,10 +82,30 @@ API_ENDPOINT = "/cgi-bin/instr"
 CMD_LOGIN = "login"
 CMD_GET_STATUS = "get video status"
 CMD_VIDEO_SWITCH = "video switch"
+CMD_PRESET_SAVE = "preset save"
+CMD_PRESET_RECALL = "preset call"
+CMD_SET_POWER = "set poweronoff"
+
+# ASCII commands of the TCP control port
+TCP_CMD_SWITCH = "s in {input} av out {output}!"
+TCP_CMD_GET_ROUTES = "r av out 0!"
+TCP_CMD_GET_POWER = "r power!"
+TCP_CMD_SET_POWER = "s power {power}!"
+TCP_CMD_PRESET_SAVE = "s save preset {preset}!"
+TCP_CMD_PRESET_RECALL = "s recall preset {preset}!"
+
+# Coordinator listener context of entities that follow the circuit breaker
+CONTEXT_CIRCUIT_BREAKER = "circuit_breaker"
+# ... and of entities that show the collected metrics
+CONTEXT_METRICS = "metrics"
+# ... and of entities that show the power state
+CONTEXT_POWER = "power"
 
-# Matrix configuration
+# Matrix configuration; defaults for entries created before sizes were detected
 NUM_INPUTS = 8
 NUM_OUTPUTS = 8
+MAX_PORTS = 64
+NUM_PRESETS = 8  # preset slots stored by the matrix
 
 # Update intervals
 UPDATE_INTERVAL = timedelta(seconds=5)  # Fast polling for responsive interface
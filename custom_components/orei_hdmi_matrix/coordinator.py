@@ -3,79 +3,906 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+from contextvars import ContextVar
 from datetime import timedelta
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .api import OreiHdmiMatrixApi, OreiHdmiMatrixApiError
-from .const import DEFAULT_UPDATE_INTERVAL
+from .api import (
+    CommandPriority,
+    OreiHdmiMatrixApi,
+    OreiHdmiMatrixApiError,
+    OreiHdmiMatrixCommandSkippedError,
+)
+from .breaker import CircuitBreaker, CircuitState
+from .const import (
+    CONF_COLLECT_METRICS,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_PORT,
+    CONF_SWITCH_DEBOUNCE,
+    CONF_SWITCH_TIMEOUT,
+    CONF_TRANSPORT,
+    CONF_UPDATE_INTERVAL,
+    CONF_UPDATE_INTERVAL_DECAY,
+    CONTEXT_CIRCUIT_BREAKER,
+    CONTEXT_METRICS,
+    CONTEXT_POWER,
+    DEFAULT_COLLECT_METRICS,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_NAMES_TTL,
+    DEFAULT_PUSH_POLL_INTERVAL,
+    DEFAULT_PUSH_RETRY_INTERVAL,
+    DEFAULT_STANDBY_POLL_INTERVAL,
+    DEFAULT_SWITCH_DEBOUNCE,
+    DEFAULT_SWITCH_TIMEOUT,
+    DEFAULT_TCP_PORT,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_UPDATE_INTERVAL_DECAY,
+    DOMAIN,
+    EVENT_ROUTE_ROLLBACK,
+    NUM_PRESETS,
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+    TRANSPORT_HTTP,
+    TRANSPORT_TCP,
+)
+from .log import RateLimitedLogger
+from .metrics import OreiHdmiMatrixMetrics
+from .models import MatrixDiff, MatrixState, RoutingIndex
+from .polling import AdaptivePollInterval
+from .presets import OreiHdmiMatrixPresetStore
+from .scheduler import async_get_scheduler
+from .transport import TcpTransport
 
 _LOGGER = logging.getLogger(__name__)
 
+# Priority of the poll run by the current task; the poll timer's task sets it
+# to background, so a refresh requested from anywhere else never inherits it
+_POLL_PRIORITY: ContextVar[CommandPriority] = ContextVar(
+    "orei_hdmi_matrix_poll_priority", default=CommandPriority.REFRESH
+)
 
-class OreiHdmiMatrixCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+
+def _deadline(timeout: float | None) -> float | None:
+    """Return the monotonic time a command given ``timeout`` seconds must end by."""
+    return None if timeout is None else time.monotonic() + timeout
+
+
+class OreiHdmiMatrixCoordinator(DataUpdateCoordinator[MatrixState]):
     """Data coordinator for OREI HDMI Matrix."""
 
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
         """Initialize the coordinator."""
-        # Get update interval from config or use default
-        update_interval_seconds = entry.data.get("update_interval", DEFAULT_UPDATE_INTERVAL)
-        update_interval = timedelta(seconds=update_interval_seconds)
+        self._poll_interval = self._create_poll_interval(entry)
         
         super().__init__(
             hass,
             _LOGGER,
             name="OREI HDMI Matrix",
-            update_interval=update_interval,
+            update_interval=timedelta(seconds=self._poll_interval.interval),
+            always_update=False,
         )
         self.entry = entry
         self.api: OreiHdmiMatrixApi | None = None
+        self.routing_index = RoutingIndex.from_entry_data(entry.data)
+        self._traffic_log = RateLimitedLogger()
+        self.metrics: OreiHdmiMatrixMetrics | None = None
+        self._set_metrics_enabled(
+            entry.data.get(CONF_COLLECT_METRICS, DEFAULT_COLLECT_METRICS)
+        )
+
+        # Diff of the latest snapshot against the previous one, keyed by the
+        # snapshot it describes so that it is never applied to other data
+        self._last_diff: tuple[MatrixState, MatrixDiff] | None = None
+        self._notified_success = True
+
+        # Routes the matrix acknowledged, shown before a poll confirmed them:
+        # output -> (requested input, number of the poll they were applied in)
+        self._optimistic_routes: dict[int, tuple[int, int]] = {}
+        self._poll_count = 0
+
+        # Names rarely change, so most polls only read routes and power; this
+        # is when a poll last read them, None to read them on the next poll
+        self._names_refreshed: float | None = None
+
+        # Last confirmed status, persisted so entities can start from it
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY.format(entry_id=entry.entry_id)
+        )
+        self._snapshot: MatrixState | None = None
+        self.presets = OreiHdmiMatrixPresetStore(hass, entry.entry_id)
+
+        # Feedback pushed by the matrix over a persistent control connection
+        self._push_task: asyncio.Task[None] | None = None
+        self._push_connected = False
+        self._push_updates = 0
+
+        # A matrix in standby is only polled as a heartbeat
+        self._standby = False
+
+        # Forced refresh in flight, shared by every caller that asks meanwhile
+        self._refresh_now: asyncio.Task[None] | None = None
+
+        # Fraction of a second the scheduler gave this matrix's scheduled polls
+        self._poll_offset: float | None = None
+        self._shut_down = False
+        self._coalesced_refreshes = 0
+
+        # Write queue: latest requested input per output with the time the
+        # first change still waiting for that output was queued
+        self._pending_routes: dict[int, tuple[int, float]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_future: asyncio.Future[bool] | None = None
+        self._flush_lock = asyncio.Lock()
+        self._coalesced_commands = 0
+        self._applied_commands = 0
+        self._total_apply_latency = 0.0
+        self._last_apply_latency: float | None = None
+
+    @staticmethod
+    def _create_poll_interval(entry: ConfigEntry) -> AdaptivePollInterval:
+        """Create the adaptive poll interval from the entry configuration."""
+        # The configured update interval is the fastest the adaptive poller runs
+        return AdaptivePollInterval(
+            min_interval=entry.data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
+            max_interval=entry.data.get(
+                CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+            ),
+            decay=entry.data.get(
+                CONF_UPDATE_INTERVAL_DECAY, DEFAULT_UPDATE_INTERVAL_DECAY
+            ),
+        )
+
+    @callback
+    def async_update_config(self) -> None:
+        """Apply changed entry configuration without reloading."""
+        self._poll_interval = self._create_poll_interval(self.entry)
+        self._set_poll_interval(self._poll_interval.interval)
+        self.routing_index = RoutingIndex.from_entry_data(self.entry.data)
+        self._set_metrics_enabled(
+            self.entry.data.get(CONF_COLLECT_METRICS, DEFAULT_COLLECT_METRICS)
+        )
+        self._async_update_context_listeners(CONTEXT_METRICS)
+        if self.api is not None:
+            self.api.switch_timeout = self._switch_timeout
+        self._names_refreshed = None
+        if self.data is not None:
+            # Names and options may have changed for every output
+            self._last_diff = None
+            self.async_update_listeners()
 
-    async def _async_update_data(self) -> dict[str, Any]:
-        """Update data via API."""
+    def _set_metrics_enabled(self, enabled: bool) -> None:
+        """Start or stop collecting metrics, keeping those already collected."""
+        if not enabled:
+            self.metrics = None
+        elif self.metrics is None:
+            self.metrics = OreiHdmiMatrixMetrics()
+        if self.api is not None:
+            self.api.metrics = self.metrics
+
+    async def async_request_refresh(self) -> None:
+        """Request a debounced refresh, counting it in the refresh queue."""
+        if self.metrics is not None:
+            self.metrics.record_refresh_request()
+        await super().async_request_refresh()
+
+    async def _async_update_data(self) -> MatrixState:
+        """Update data via API and record how long the poll took."""
+        priority = _POLL_PRIORITY.get()
+        if (metrics := self.metrics) is None:
+            return await self._async_poll(priority)
+
+        metrics.record_poll_start()
+        started = time.monotonic()
+        success = False
+        try:
+            status = await self._async_poll(priority)
+            success = True
+            return status
+        finally:
+            metrics.record_poll(time.monotonic() - started, success)
+            self._async_update_context_listeners(CONTEXT_METRICS)
+
+    async def _handle_refresh_interval(self, _now: Any = None) -> None:
+        """Run a scheduled poll at background priority, in this matrix's slot."""
+        if (offset := self._poll_offset) is not None:
+            await asyncio.sleep((offset - self.hass.loop.time()) % 1)
+            if self._shut_down:
+                return
+        token = _POLL_PRIORITY.set(CommandPriority.BACKGROUND)
+        try:
+            await super()._handle_refresh_interval(_now)
+        finally:
+            _POLL_PRIORITY.reset(token)
+
+    async def _async_poll(
+        self, priority: CommandPriority = CommandPriority.REFRESH
+    ) -> MatrixState:
+        """Poll the matrix status at the given priority.
+
+        Scheduled polls run at background priority and yield to switches and
+        preset recalls; one that is skipped for them keeps the current data,
+        and the command's own refresh reads the new state. The first poll is
+        never run in the background.
+        """
         if not self.api:
-            self.api = OreiHdmiMatrixApi(
-                host=self.entry.data["host"],
-                username=self.entry.data["username"],
-                password=self.entry.data["password"],
-            )
+            self.api = self._create_api()
             await self.api.__aenter__()
+            if isinstance(self.api.transport, TcpTransport):
+                self._push_task = self.hass.async_create_background_task(
+                    self._async_listen_for_feedback(self.api.transport),
+                    f"{DOMAIN} feedback {self.entry.entry_id}",
+                )
 
+        self._poll_count += 1
+        poll = self._poll_count
+        names = self._names_due()
+        if self.data is None:
+            priority = CommandPriority.REFRESH
+        started = time.monotonic()
         try:
-            _LOGGER.debug("Polling OREI HDMI Matrix for status updates")
-            status = await self.api.get_status()
-            _LOGGER.debug("Successfully polled matrix status: %s", status)
-            return status
+            status = await self.api.get_status(
+                self.data, names=names, priority=priority
+            )
+            self._traffic_log.debug("poll", "Polled matrix status: %s", status)
+        except OreiHdmiMatrixCommandSkippedError:
+            _LOGGER.debug("Skipped a scheduled poll for a user command")
+            return self.data
         except OreiHdmiMatrixApiError as err:
-            _LOGGER.error("Failed to poll OREI HDMI Matrix: %s", err)
+            # The base coordinator logs the first failure of a run as an error
+            _LOGGER.debug("Failed to poll OREI HDMI Matrix: %s", err)
+            # Switches the matrix acknowledged stay shown; the next successful
+            # poll confirms or rolls them back
+            self._set_poll_interval(self._poll_interval.poll_failed())
             raise UpdateFailed(f"Error communicating with API: {err}") from err
 
-    async def async_set_output_input(self, output: int, input_: int) -> bool:
-        """Set which input is connected to an output."""
+        if names:
+            self._names_refreshed = started
+        status = self._async_reconcile_optimistic_routes(status, poll)
+        self._track_power(status.power)
+
+        changed = False
+        if self.data is not None:
+            diff = self.data.diff(status)
+            self._last_diff = (status, diff)
+            changed = bool(diff)
+            if changed:
+                _LOGGER.debug("Matrix status changed: %s", diff)
+        self._set_poll_interval(self._poll_interval.poll_succeeded(changed))
+        if changed or self.data is None:
+            self._async_save_snapshot(status)
+        return status
+
+    def _names_due(self) -> bool:
+        """Return True if the next poll should read the names as well."""
+        return (
+            self.data is None
+            or self._names_refreshed is None
+            or time.monotonic() - self._names_refreshed >= DEFAULT_NAMES_TTL
+        )
+
+    async def async_restore_snapshot(self) -> bool:
+        """Start from the status saved by a previous run, if there is one.
+
+        Returns True if a snapshot was restored.
+        """
+        if (snapshot := await self._store.async_load()) is None:
+            return False
+        try:
+            status = MatrixState.from_dict(snapshot, self.routing_index.num_outputs)
+        except (KeyError, TypeError) as err:
+            _LOGGER.warning("Ignoring unreadable status snapshot: %s", err)
+            return False
+        _LOGGER.debug("Restored matrix status from snapshot: %s", status)
+        self._snapshot = status
+        self.data = status
+        return True
+
+    @callback
+    def _async_save_snapshot(self, status: MatrixState) -> None:
+        """Schedule a write of the latest confirmed status.
+
+        Writes are delayed and coalesced; the store writes a pending snapshot
+        when Home Assistant stops.
+        """
+        self._snapshot = status
+        self._store.async_delay_save(self._snapshot_data, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _snapshot_data(self) -> dict[str, Any]:
+        """Return the snapshot in its stored form."""
+        assert self._snapshot is not None
+        return self._snapshot.as_dict()
+
+    @callback
+    def _async_reconcile_optimistic_routes(
+        self, status: MatrixState, poll: int
+    ) -> MatrixState:
+        """Check optimistic routes against a poll and return the status to show.
+
+        Routes applied before the poll started are confirmed or rolled back.
+        Routes applied while it was in flight stay on top of the polled status
+        until a later poll can confirm them. Failed polls leave them alone.
+        """
+        if not self._optimistic_routes:
+            return status
+
+        routes = status.routes
+        unconfirmed = {}
+        for output, (requested, applied_in) in self._optimistic_routes.items():
+            if applied_in >= poll:
+                unconfirmed[output] = (requested, applied_in)
+                continue
+            actual = routes.input_for(output)
+            if actual != requested:
+                self._async_fire_rollback(output, requested, actual, "mismatch")
+
+        self._optimistic_routes = unconfirmed
+        if not unconfirmed:
+            return status
+
+        return status.with_routes(
+            {output: requested for output, (requested, _) in unconfirmed.items()}
+        )
+
+    @callback
+    def _async_apply_optimistic_routes(self, routes: dict[int, int]) -> None:
+        """Show accepted route changes before the next poll confirms them."""
+        if self.data is None:
+            return
+
+        current = self.data.routes
+        applied = {}
+        for output, input_ in routes.items():
+            if not 0 < output <= len(current):
+                continue
+            self._optimistic_routes[output] = (input_, self._poll_count)
+            applied[output] = input_
+
+        self._async_publish(self.data.with_routes(applied))
+
+    async def _async_listen_for_feedback(self, transport: TcpTransport) -> None:
+        """Keep the control connection open to receive state changes.
+
+        While it is open polling slows down to a consistency check; if it
+        drops it is reopened with a growing delay.
+        """
+        transport.on_feedback = self._async_handle_feedback
+        retry = DEFAULT_PUSH_RETRY_INTERVAL
+        while True:
+            try:
+                await transport.connect()
+            except (OSError, asyncio.TimeoutError) as err:
+                _LOGGER.debug("Feedback connection to %s failed: %s", transport.host, err)
+            else:
+                retry = DEFAULT_PUSH_RETRY_INTERVAL
+                self._set_push_connected(True)
+                await transport.wait_closed()
+                _LOGGER.debug("Feedback connection to %s closed", transport.host)
+            self._set_push_connected(False)
+            await asyncio.sleep(retry)
+            retry = min(retry * 2, self._poll_interval.max_interval)
+
+    def _set_push_connected(self, connected: bool) -> None:
+        """Track the feedback connection and adjust polling to it."""
+        if connected != self._push_connected:
+            self._push_connected = connected
+            self._set_poll_interval(self._poll_interval.interval)
+
+    @callback
+    def _async_handle_feedback(self, routes: dict[int, int], power: int | None) -> None:
+        """Apply state changes reported by the matrix without a poll."""
+        if self.data is None:
+            return
+
+        # The matrix reported the actual route, so nothing is left to confirm
+        for output in routes:
+            self._optimistic_routes.pop(output, None)
+
+        current = self.data.routes
+        changed = {
+            output: input_
+            for output, input_ in routes.items()
+            if current.input_for(output) != input_
+        }
+        status = self.data.with_routes(changed)
+        if power is not None:
+            status = status.with_power(power)
+            self._track_power(power)
+        if status is self.data:
+            return
+
+        self._push_updates += 1
+        _LOGGER.debug("Matrix reported routes %s, power %s", changed, power)
+        self._async_publish(status)
+        self._async_save_snapshot(status)
+
+    @callback
+    def _async_fire_rollback(
+        self, output: int, requested: int, actual: int | None, reason: str
+    ) -> None:
+        """Fire an event for an optimistic route that did not stick."""
+        _LOGGER.warning(
+            "Output %d did not switch to input %d (%s), showing input %s",
+            output,
+            requested,
+            reason,
+            actual,
+        )
+        self.hass.bus.async_fire(
+            EVENT_ROUTE_ROLLBACK,
+            {
+                "entry_id": self.entry.entry_id,
+                "output": output,
+                "requested_input": requested,
+                "actual_input": actual,
+                "reason": reason,
+            },
+        )
+
+    @callback
+    def _async_publish(self, status: MatrixState) -> None:
+        """Replace the data outside a poll and update the affected listeners."""
+        self._last_diff = (status, self.data.diff(status))
+        self.data = status
+        self.async_update_listeners()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners affected by the latest change.
+
+        Entities register with their output number as context, or with the
+        power context, and are only called when that output or the power
+        state changed. Listeners without a context, and all
+        listeners on availability changes or manual updates, are always called.
+        """
+        availability_changed = self.last_update_success != self._notified_success
+        self._notified_success = self.last_update_success
+
+        last_diff, self._last_diff = self._last_diff, None
+        if (
+            availability_changed
+            or last_diff is None
+            or last_diff[0] is not self.data
+        ):
+            super().async_update_listeners()
+            return
+
+        diff = last_diff[1]
+        changed = (diff.outputs | {CONTEXT_POWER}) if diff.power else diff.outputs
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or context in changed:
+                update_callback()
+
+    def _set_poll_interval(self, seconds: float) -> None:
+        """Use a new interval for scheduling the next poll.
+
+        While the matrix pushes its changes polls only check consistency, and
+        while it is in standby they only check that it is still there.
+        """
+        if self._push_connected:
+            seconds = max(seconds, DEFAULT_PUSH_POLL_INTERVAL)
+        if self._standby:
+            seconds = max(seconds, DEFAULT_STANDBY_POLL_INTERVAL)
+        if self.update_interval != (interval := timedelta(seconds=seconds)):
+            _LOGGER.debug("Next OREI HDMI Matrix poll in %.1f seconds", seconds)
+            self.update_interval = interval
+
+    def _mark_activity(self) -> None:
+        """Switch back to fast polling after a local change."""
+        self._poll_interval.mark_activity()
+        self._set_poll_interval(self._poll_interval.interval)
+
+    def _track_power(self, power: int) -> None:
+        """Slow polling down to a heartbeat in standby and back up on wake-up."""
+        if (standby := not power) == self._standby:
+            return
+        self._standby = standby
+        if standby:
+            _LOGGER.debug("Matrix is in standby, polling as a heartbeat only")
+            self._set_poll_interval(self._poll_interval.interval)
+        else:
+            _LOGGER.debug("Matrix woke up, polling at the normal rate")
+            self._mark_activity()
+
+    @property
+    def polling_stats(self) -> dict[str, Any]:
+        """Return the effective poll interval and backoff state."""
+        return {
+            "effective_interval": self._poll_interval.interval,
+            "min_interval": self._poll_interval.min_interval,
+            "max_interval": self._poll_interval.max_interval,
+            "decay": self._poll_interval.decay,
+            "consecutive_failures": self._poll_interval.failures,
+            "push_connected": self._push_connected,
+            "push_updates": self._push_updates,
+            "standby": self._standby,
+            "coalesced_forced_refreshes": self._coalesced_refreshes,
+            "names_age": (
+                time.monotonic() - self._names_refreshed
+                if self._names_refreshed is not None
+                else None
+            ),
+        }
+
+    @callback
+    def async_set_poll_offset(self, offset: float) -> None:
+        """Set the fraction of a second that scheduled polls start at.
+
+        The scheduler spreads the matrices over the second this way. Each
+        scheduled poll waits for the slot after the timer fires, so polls may
+        start up to a second later than the update interval.
+        """
+        self._poll_offset = offset
+
+    def _create_api(self) -> OreiHdmiMatrixApi:
+        """Create an API client on the configured transport.
+
+        HTTP clients use the connection pool shared by all matrices.
+        """
+        transport = None
+        if self.entry.data.get(CONF_TRANSPORT, TRANSPORT_HTTP) == TRANSPORT_TCP:
+            transport = TcpTransport(
+                self.entry.data["host"],
+                self.entry.data.get(CONF_PORT, DEFAULT_TCP_PORT),
+                num_outputs=self.routing_index.num_outputs,
+            )
+        return OreiHdmiMatrixApi(
+            host=self.entry.data["host"],
+            username=self.entry.data["username"],
+            password=self.entry.data["password"],
+            session=async_get_scheduler(self.hass).session,
+            transport=transport,
+            breaker=CircuitBreaker(on_transition=self._async_breaker_transition),
+            num_inputs=self.routing_index.num_inputs,
+            num_outputs=self.routing_index.num_outputs,
+            metrics=self.metrics,
+            switch_timeout=self._switch_timeout,
+        )
+
+    @property
+    def _switch_timeout(self) -> float:
+        """Return the configured timeout of switch and preset commands."""
+        return self.entry.data.get(CONF_SWITCH_TIMEOUT, DEFAULT_SWITCH_TIMEOUT)
+
+    async def _async_request_refresh_by(self, deadline: float | None) -> None:
+        """Request a refresh, waiting for it no longer than ``deadline``.
+
+        A refresh still running at the deadline finishes in the background.
+        """
+        if deadline is None:
+            await self.async_request_refresh()
+            return
+        refresh = self.hass.async_create_task(self.async_request_refresh())
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(refresh), deadline - time.monotonic()
+            )
+        except asyncio.TimeoutError:
+            _LOGGER.debug("Refresh did not finish by the deadline, not waiting for it")
+
+    @callback
+    def _async_breaker_transition(
+        self, previous: CircuitState, state: CircuitState
+    ) -> None:
+        """Update the circuit breaker sensor when the breaker changes state."""
+        _LOGGER.debug("Circuit breaker for %s: %s -> %s", self.name, previous, state)
+        self._async_update_context_listeners(CONTEXT_CIRCUIT_BREAKER)
+
+    @callback
+    def _async_update_context_listeners(self, listener_context: str) -> None:
+        """Update the listeners registered with the given context only."""
+        for update_callback, context in list(self._listeners.values()):
+            if context == listener_context:
+                update_callback()
+
+    @property
+    def breaker_stats(self) -> dict[str, Any]:
+        """Return the circuit breaker state and recent transitions."""
+        if not self.api:
+            return {}
+        return self.api.breaker.as_dict()
+
+    @property
+    def connection_stats(self) -> dict[str, Any]:
+        """Return connection reuse and latency statistics."""
+        if not self.api:
+            return {}
+        return self.api.stats.as_dict()
+
+    @property
+    def command_queue_stats(self) -> dict[str, Any]:
+        """Return the state of the prioritized command queue."""
+        if not self.api:
+            return {}
+        return self.api.commands.as_dict()
+
+    async def async_set_output_input(
+        self, output: int, input_: int, timeout: float | None = None
+    ) -> bool:
+        """Set which input is connected to an output.
+
+        With a ``timeout`` the switch, any login it needs and the refresh
+        that follows share that many seconds.
+        """
         if not self.api:
             return False
             
+        deadline = _deadline(timeout)
         try:
-            success = await self.api.set_output_input(output, input_)
+            success = await self.api.set_output_input(output, input_, deadline)
             if success:
-                # Update our data immediately after a successful change
+                # Show the new route right away; the refresh confirms it
                 _LOGGER.debug("Output %d set to input %d, refreshing data", output, input_)
-                await self.async_request_refresh()
+                self._async_apply_optimistic_routes({output: input_})
+                self._mark_activity()
+                await self._async_request_refresh_by(deadline)
             return success
         except OreiHdmiMatrixApiError as err:
             _LOGGER.error("Error setting output %d to input %d: %s", output, input_, err)
             return False
 
+    async def async_set_routes(
+        self, routes: dict[int, int], timeout: float | None = None
+    ) -> bool:
+        """Set several outputs at once and refresh the status a single time.
+
+        Outputs already showing the requested input are skipped. With a
+        ``timeout`` all switches and the refresh share that many seconds.
+        """
+        if not self.api:
+            return False
+
+        current = self.data.routes if self.data else None
+        pending = {
+            output: input_
+            for output, input_ in routes.items()
+            if current is None or current.input_for(output) != input_
+        }
+        if not pending:
+            _LOGGER.debug("All requested routes are already active")
+            return True
+
+        deadline = _deadline(timeout)
+        try:
+            results = await self.api.set_routes(pending, deadline)
+        except (OreiHdmiMatrixApiError, ValueError) as err:
+            _LOGGER.error("Error setting routes %s: %s", pending, err)
+            return False
+
+        _LOGGER.debug("Routes %s applied, refreshing data", results)
+        self._async_apply_optimistic_routes(
+            {output: pending[output] for output, success in results.items() if success}
+        )
+        self._mark_activity()
+        await self._async_request_refresh_by(deadline)
+        return all(results.values())
+
+    async def async_set_power(self, power: bool, timeout: float | None = None) -> bool:
+        """Turn the matrix on or put it in standby.
+
+        The new power state is shown right away and polling follows it.
+        """
+        if not self.api:
+            return False
+        deadline = _deadline(timeout)
+        try:
+            success = await self.api.set_power(power, deadline)
+        except OreiHdmiMatrixApiError as err:
+            _LOGGER.error("Error turning the matrix %s: %s", "on" if power else "off", err)
+            return False
+        if success:
+            if self.data is not None:
+                self._async_publish(self.data.with_power(int(power)))
+            self._track_power(int(power))
+            await self._async_request_refresh_by(deadline)
+        return success
+
+    @property
+    def device_preset_names(self) -> list[str]:
+        """Return the names of the matrix's preset slots, in slot order."""
+        names = self.data.preset_names if self.data else None
+        if names:
+            return list(names)
+        return [f"Preset {preset}" for preset in range(1, NUM_PRESETS + 1)]
+
+    @property
+    def preset_options(self) -> list[str]:
+        """Return the matrix's presets followed by the locally saved ones."""
+        device_names = self.device_preset_names
+        return device_names + [
+            name for name in self.presets.presets if name not in device_names
+        ]
+
+    @property
+    def active_local_preset(self) -> str | None:
+        """Return the first local preset that matches the current routes."""
+        if not self.data:
+            return None
+        routes = self.data.routes
+        for name, layout in self.presets.presets.items():
+            if all(routes.input_for(output) == input_ for output, input_ in layout.items()):
+                return name
+        return None
+
+    async def async_save_preset(
+        self, preset: int, timeout: float | None = None
+    ) -> bool:
+        """Store the current routes in one of the matrix's preset slots."""
+        if not self.api:
+            return False
+        try:
+            return await self.api.save_preset(preset, _deadline(timeout))
+        except (OreiHdmiMatrixApiError, ValueError) as err:
+            _LOGGER.error("Error saving preset %d: %s", preset, err)
+            return False
+
+    async def async_recall_preset(
+        self, preset: int, timeout: float | None = None
+    ) -> bool:
+        """Recall one of the matrix's preset slots with a single command."""
+        if not self.api:
+            return False
+        deadline = _deadline(timeout)
+        try:
+            success = await self.api.recall_preset(preset, deadline)
+        except (OreiHdmiMatrixApiError, ValueError) as err:
+            _LOGGER.error("Error recalling preset %d: %s", preset, err)
+            return False
+        if success:
+            # Only the matrix knows the preset's routes, so poll them
+            self._mark_activity()
+            await self._async_request_refresh_by(deadline)
+        return success
+
+    async def async_save_local_preset(self, name: str) -> bool:
+        """Save the current routes as a local preset."""
+        if not self.data:
+            return False
+        routes = self.data.routes
+        await self.presets.async_save_preset(
+            name,
+            {
+                output: input_
+                for output, input_ in enumerate(routes, start=1)
+                if input_
+            },
+        )
+        # The preset select gains an option
+        self._last_diff = None
+        self.async_update_listeners()
+        return True
+
+    async def async_recall_local_preset(
+        self, name: str, timeout: float | None = None
+    ) -> bool:
+        """Apply a local preset, switching only the outputs that differ."""
+        if (layout := self.presets.presets.get(name)) is None:
+            _LOGGER.error("No preset named %s", name)
+            return False
+        return await self.async_set_routes(layout, timeout)
+
+    async def async_select_preset(self, option: str) -> bool:
+        """Recall a preset by its option in the preset select."""
+        device_names = self.device_preset_names
+        if option in device_names:
+            return await self.async_recall_preset(device_names.index(option) + 1)
+        return await self.async_recall_local_preset(option)
+
+    async def async_queue_output_input(self, output: int, input_: int) -> bool:
+        """Queue a route change and wait until it has been applied.
+
+        Changes arriving within the debounce window are coalesced so that only
+        the last requested input for each output is sent to the device.
+        """
+        if pending := self._pending_routes.get(output):
+            self._coalesced_commands += 1
+            enqueued = pending[1]
+        else:
+            enqueued = time.monotonic()
+        self._pending_routes[output] = (input_, enqueued)
+
+        if self._flush_future is None:
+            self._flush_future = self.hass.loop.create_future()
+        future = self._flush_future
+
+        if self._flush_handle:
+            self._flush_handle.cancel()
+        debounce = self.entry.data.get(CONF_SWITCH_DEBOUNCE, DEFAULT_SWITCH_DEBOUNCE)
+        self._flush_handle = self.hass.loop.call_later(
+            debounce, self._schedule_flush
+        )
+
+        return await asyncio.shield(future)
+
+    def _schedule_flush(self) -> None:
+        """Start sending the queued route changes."""
+        self._flush_handle = None
+        self.hass.async_create_task(self._async_flush_routes())
+
+    async def _async_flush_routes(self) -> None:
+        """Send the queued route changes as one batch."""
+        pending, self._pending_routes = self._pending_routes, {}
+        future, self._flush_future = self._flush_future, None
+        if not pending or future is None:
+            return
+
+        async with self._flush_lock:
+            try:
+                success = await self.async_set_routes(
+                    {output: input_ for output, (input_, _) in pending.items()}
+                )
+            except ValueError as err:
+                _LOGGER.error("Invalid queued routes %s: %s", pending, err)
+                success = False
+
+        now = time.monotonic()
+        for _, enqueued in pending.values():
+            latency = now - enqueued
+            self._applied_commands += 1
+            self._total_apply_latency += latency
+            self._last_apply_latency = latency
+
+        if not future.done():
+            future.set_result(success)
+
+    @property
+    def write_queue_stats(self) -> dict[str, Any]:
+        """Return write queue depth, coalescing and apply latency statistics."""
+        return {
+            "queue_depth": len(self._pending_routes),
+            "coalesced_commands": self._coalesced_commands,
+            "applied_commands": self._applied_commands,
+            "average_apply_latency": (
+                self._total_apply_latency / self._applied_commands
+                if self._applied_commands
+                else None
+            ),
+            "last_apply_latency": self._last_apply_latency,
+        }
+
     async def async_refresh_now(self) -> None:
-        """Force an immediate refresh of the data."""
-        _LOGGER.debug("Forcing immediate refresh of OREI HDMI Matrix data")
-        await self.async_request_refresh()
+        """Force an immediate refresh of the data, names included.
+
+        The poll bypasses the refresh debouncer, so it runs even right after
+        another one. Callers arriving while a forced refresh is in flight
+        wait for that one instead of starting another.
+        """
+        if self._refresh_now is None:
+            _LOGGER.debug("Forcing immediate refresh of OREI HDMI Matrix data")
+            self._names_refreshed = None
+            if self.metrics is not None:
+                self.metrics.record_refresh_request()
+            self._refresh_now = self.hass.async_create_task(self.async_refresh())
+            self._refresh_now.add_done_callback(self._refresh_now_done)
+        else:
+            self._coalesced_refreshes += 1
+        await asyncio.shield(self._refresh_now)
+
+    def _refresh_now_done(self, _task: asyncio.Task[None]) -> None:
+        """Let the next forced refresh start a new poll."""
+        self._refresh_now = None
 
     async def async_shutdown(self) -> None:
         """Shutdown the coordinator and close API session."""
+        self._shut_down = True
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending_routes = {}
+        if self._flush_future and not self._flush_future.done():
+            self._flush_future.set_result(False)
+        self._flush_future = None
+        if self._push_task:
+            self._push_task.cancel()
+            self._push_task = None
         if self.api:
             await self.api.__aexit__(None, None, None)
             self.api = None
+        await super().async_shutdown()
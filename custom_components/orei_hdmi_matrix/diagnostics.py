@@ -0,0 +1,31 @@
+"""Diagnostics support for OREI HDMI Matrix."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import OreiHdmiMatrixCoordinator
+
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: OreiHdmiMatrixCoordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "data": coordinator.data.as_dict() if coordinator.data else None,
+        "connection": coordinator.connection_stats,
+        "circuit_breaker": coordinator.breaker_stats,
+        "write_queue": coordinator.write_queue_stats,
+        "command_queue": coordinator.command_queue_stats,
+        "polling": coordinator.polling_stats,
+        "metrics": coordinator.metrics.as_dict() if coordinator.metrics else None,
+    }
@@ -0,0 +1,27 @@
+"""Shared entity helpers for OREI HDMI Matrix."""
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.entity import DeviceInfo
+
+from .const import CONF_NUM_INPUTS, CONF_NUM_OUTPUTS, DOMAIN, NUM_INPUTS, NUM_OUTPUTS
+
+
+def matrix_model(entry: ConfigEntry) -> str:
+    """Return the model name, e.g. "8x8 HDMI Matrix", for the entry's matrix size."""
+    num_inputs = entry.data.get(CONF_NUM_INPUTS, NUM_INPUTS)
+    num_outputs = entry.data.get(CONF_NUM_OUTPUTS, NUM_OUTPUTS)
+    return f"{num_inputs}x{num_outputs} HDMI Matrix"
+
+
+def matrix_device_info(entry: ConfigEntry) -> DeviceInfo:
+    """Return device info for the matrix itself.
+
+    Output devices refer to this device through ``via_device``.
+    """
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry.entry_id)},
+        name=entry.title,
+        manufacturer="OREI",
+        model=matrix_model(entry),
+    )
@@ -0,0 +1,21 @@
+"""Exceptions for OREI HDMI Matrix."""
+
+
+class OreiHdmiMatrixApiError(Exception):
+    """Exception raised for API errors."""
+
+
+class OreiHdmiMatrixAuthError(OreiHdmiMatrixApiError):
+    """Exception raised when the device rejects the session."""
+
+
+class OreiHdmiMatrixUnavailableError(OreiHdmiMatrixApiError):
+    """Exception raised without a request while the circuit breaker is open."""
+
+
+class OreiHdmiMatrixTimeoutError(OreiHdmiMatrixApiError):
+    """Exception raised when a command runs out of its timeout or deadline."""
+
+
+class OreiHdmiMatrixCommandSkippedError(OreiHdmiMatrixApiError):
+    """Exception raised for a queued background command an interactive one replaced."""
@@ -0,0 +1,69 @@
+"""Rate-limited diagnostic logging for OREI HDMI Matrix.
+
+Request and response bodies and per-poll details go to a dedicated
+``custom_components.orei_hdmi_matrix.traffic`` logger, so they can be enabled
+separately from the integration's regular debug logging. Each message key is
+emitted at most once per interval; the messages in between are counted and
+reported with the next sample.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Mapping
+from typing import Any
+
+TRAFFIC_LOGGER = logging.getLogger(f"{__package__}.traffic")
+
+# Minimum seconds between two traffic messages with the same key
+DEFAULT_SAMPLE_INTERVAL = 60.0
+
+REDACTED = "**REDACTED**"
+REDACT_KEYS = frozenset({"user", "password"})
+
+
+def redact(data: Mapping[str, Any]) -> dict[str, Any]:
+    """Return a copy of a request payload with credentials masked."""
+    return {key: REDACTED if key in REDACT_KEYS else value for key, value in data.items()}
+
+
+class RateLimitedLogger:
+    """Debug logger that samples one message per key and interval."""
+
+    def __init__(
+        self,
+        logger: logging.Logger = TRAFFIC_LOGGER,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+    ) -> None:
+        """Initialize the logger."""
+        self.logger = logger
+        self.interval = interval
+        self._last_emit: dict[str, float] = {}
+        self._suppressed: dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if debug messages would be emitted at all.
+
+        Check this before building expensive log arguments.
+        """
+        return self.logger.isEnabledFor(logging.DEBUG)
+
+    def debug(self, key: str, msg: str, *args: Any) -> None:
+        """Log a debug message if the key has not been logged recently."""
+        if not self.enabled:
+            return
+
+        now = time.monotonic()
+        last = self._last_emit.get(key)
+        if last is not None and now - last < self.interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return
+
+        self._last_emit[key] = now
+        if suppressed := self._suppressed.pop(key, 0):
+            self.logger.debug(
+                msg + " (%d similar messages suppressed)", *args, suppressed
+            )
+        else:
+            self.logger.debug(msg, *args)
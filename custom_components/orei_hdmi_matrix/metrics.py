@@ -0,0 +1,191 @@
+"""Request, poll and parsing metrics for OREI HDMI Matrix.
+
+Metrics are collected only while enabled in the options; the API client and
+coordinator hold ``None`` otherwise and skip recording altogether.
+"""
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Any
+
+# Upper bounds of the latency buckets: 0.5 ms growing by 20% to about 30 s,
+# so percentiles are accurate to within one bucket (20%) at any scale
+BUCKET_BOUNDS: tuple[float, ...] = tuple(0.0005 * 1.2**i for i in range(61))
+
+
+class LatencyHistogram:
+    """Distribution of durations in fixed, logarithmically spaced buckets.
+
+    Recording is a bisect and an increment, and memory stays bounded however
+    long Home Assistant runs.
+    """
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        # One extra bucket for durations above the last bound
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Record a duration."""
+        self.buckets[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the duration below which ``fraction`` of the samples fall."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank and bucket:
+                if index == len(BUCKET_BOUNDS):
+                    return self.max
+                return min(BUCKET_BOUNDS[index], self.max)
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the count, mean, maximum and percentiles."""
+        return {
+            "count": self.count,
+            "average": self.total / self.count if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class CommandMetrics:
+    """Counters and latency of one command type."""
+
+    __slots__ = ("requests", "errors", "timeouts", "latency")
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.latency = LatencyHistogram()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters as a dictionary."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class OreiHdmiMatrixMetrics:
+    """Metrics of one matrix, shared by its API client and coordinator.
+
+    Commands are keyed by their ``comhead``. Parse time is the event loop
+    time spent on each status reply, decoding it and building the status
+    from it, recorded as one sample per reply. The
+    refresh queue counts refresh requests, how long they waited for a poll
+    and how many were served by a poll another request had already queued.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.commands: dict[str, CommandMetrics] = {}
+        self.polls = LatencyHistogram()
+        self.poll_failures = 0
+        self.parse_time = LatencyHistogram()
+        self.refresh_requests = 0
+        self.coalesced_refreshes = 0
+        self.refresh_wait = LatencyHistogram()
+        self._pending_refreshes = 0
+        self._refresh_requested: float | None = None
+
+    def record_command(
+        self, command: str, latency: float, error: bool = False, timeout: bool = False
+    ) -> None:
+        """Record a command sent to the matrix and how it ended."""
+        if (metrics := self.commands.get(command)) is None:
+            metrics = self.commands[command] = CommandMetrics()
+        metrics.requests += 1
+        metrics.latency.record(latency)
+        if timeout:
+            metrics.timeouts += 1
+        elif error:
+            metrics.errors += 1
+
+    def record_parse(self, seconds: float) -> None:
+        """Record time spent parsing a reply."""
+        self.parse_time.record(seconds)
+
+    def record_refresh_request(self) -> None:
+        """Record a request for a poll."""
+        self.refresh_requests += 1
+        self._pending_refreshes += 1
+        if self._refresh_requested is None:
+            self._refresh_requested = time.monotonic()
+
+    def record_poll_start(self) -> None:
+        """Record that a poll started, serving every queued refresh request."""
+        if self._refresh_requested is not None:
+            self.refresh_wait.record(time.monotonic() - self._refresh_requested)
+            self.coalesced_refreshes += self._pending_refreshes - 1
+        self._pending_refreshes = 0
+        self._refresh_requested = None
+
+    def record_poll(self, duration: float, success: bool) -> None:
+        """Record a finished poll."""
+        self.polls.record(duration)
+        if not success:
+            self.poll_failures += 1
+
+    @property
+    def total_requests(self) -> int:
+        """Return the number of commands sent."""
+        return sum(metrics.requests for metrics in self.commands.values())
+
+    @property
+    def total_errors(self) -> int:
+        """Return the number of commands that failed or timed out."""
+        return sum(
+            metrics.errors + metrics.timeouts for metrics in self.commands.values()
+        )
+
+    def request_latency(self) -> LatencyHistogram:
+        """Return the latency of all commands combined."""
+        combined = LatencyHistogram()
+        for metrics in self.commands.values():
+            latency = metrics.latency
+            combined.buckets = [
+                total + count for total, count in zip(combined.buckets, latency.buckets)
+            ]
+            combined.count += latency.count
+            combined.total += latency.total
+            combined.max = max(combined.max, latency.max)
+        return combined
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return every metric as a dictionary."""
+        return {
+            "commands": {
+                command: metrics.as_dict()
+                for command, metrics in sorted(self.commands.items())
+            },
+            "request_latency": self.request_latency().as_dict(),
+            "polls": {**self.polls.as_dict(), "failures": self.poll_failures},
+            "parse_time": self.parse_time.as_dict(),
+            "refresh_queue": {
+                "requests": self.refresh_requests,
+                "coalesced": self.coalesced_refreshes,
+                "pending": self._pending_refreshes,
+                "wait": self.refresh_wait.as_dict(),
+            },
+        }
@@ -0,0 +1,378 @@
+"""Data models for OREI HDMI Matrix."""
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field, replace
+from itertools import islice, repeat
+from typing import Any
+
+from .const import (
+    CONF_AVAILABLE_INPUTS,
+    CONF_ENABLED,
+    CONF_INPUT_ENABLED,
+    CONF_INPUTS,
+    CONF_NAME,
+    CONF_NUM_INPUTS,
+    CONF_NUM_OUTPUTS,
+    CONF_OUTPUTS,
+    NUM_INPUTS,
+    NUM_OUTPUTS,
+)
+
+
+class RouteTable:
+    """Immutable table of the input shown on each output.
+
+    Routes are kept in a tuple, one slot per output, with 0 for an unknown
+    route. Indexing is 0-based like the device's ``allsource`` list;
+    ``input_for`` takes a 1-based output number. ``with_routes`` returns the
+    table itself when nothing changes, so unchanged routes are shared.
+    """
+
+    __slots__ = ("_routes",)
+
+    def __init__(self, routes: Iterable[int] = ()) -> None:
+        """Initialize the table from inputs in output order."""
+        self._routes: tuple[int, ...] = tuple(routes)
+
+    @classmethod
+    def from_sources(cls, sources: Iterable[Any], num_outputs: int) -> RouteTable:
+        """Build a table from the device's ``allsource`` list.
+
+        Entries past ``num_outputs`` (the device pads the list) are dropped,
+        missing or invalid entries are stored as unknown.
+        """
+        routes = tuple(islice(sources, num_outputs))
+        # Checked with C-level iteration; only bad replies take the slow path
+        if not all(map(isinstance, routes, repeat(int))) or (routes and min(routes) < 0):
+            routes = tuple(
+                value if isinstance(value, int) and value >= 0 else 0
+                for value in routes
+            )
+        if len(routes) < num_outputs:
+            routes += (0,) * (num_outputs - len(routes))
+        table = cls.__new__(cls)
+        table._routes = routes
+        return table
+
+    def input_for(self, output: int) -> int | None:
+        """Return the input routed to a 1-based output, or None if unknown."""
+        if 0 < output <= len(self._routes):
+            return self._routes[output - 1] or None
+        return None
+
+    def with_routes(self, routes: Mapping[int, int]) -> RouteTable:
+        """Return a table with some outputs switched; unknown outputs are ignored."""
+        switched = list(self._routes)
+        changed = False
+        for output, input_ in routes.items():
+            if 0 < output <= len(switched) and switched[output - 1] != input_:
+                switched[output - 1] = input_
+                changed = True
+        if not changed:
+            return self
+        table = RouteTable.__new__(RouteTable)
+        table._routes = tuple(switched)
+        return table
+
+    def __len__(self) -> int:
+        """Return the number of outputs."""
+        return len(self._routes)
+
+    def __getitem__(self, index: int) -> int:
+        """Return the input at a 0-based output index."""
+        return self._routes[index]
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the inputs in output order."""
+        return iter(self._routes)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare against another table or any sequence of inputs."""
+        if isinstance(other, RouteTable):
+            return self is other or self._routes == other._routes
+        if isinstance(other, Sequence):
+            return self._routes == tuple(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        """Return the hash of the routes."""
+        return hash(self._routes)
+
+    def __repr__(self) -> str:
+        """Return the routes as a list."""
+        return f"RouteTable({list(self._routes)})"
+
+
+@dataclass(frozen=True)
+class MatrixDiff:
+    """Differences between two matrix states.
+
+    Outputs are numbered from 1, like the rest of the integration.
+    """
+
+    routes: frozenset[int] = field(default_factory=frozenset)
+    output_names: frozenset[int] = field(default_factory=frozenset)
+    input_names: bool = False
+    preset_names: bool = False
+    power: bool = False
+
+    @property
+    def outputs(self) -> frozenset[int]:
+        """Return the outputs whose route or name changed."""
+        return self.routes | self.output_names
+
+    def __bool__(self) -> bool:
+        """Return True if anything changed."""
+        return bool(
+            self.routes
+            or self.output_names
+            or self.input_names
+            or self.preset_names
+            or self.power
+        )
+
+
+def _changed_indexes(old: Sequence[Any], new: Sequence[Any]) -> frozenset[int]:
+    """Return the 1-based positions that differ between two sequences."""
+    if old is new:
+        return frozenset()
+    changed = {
+        index
+        for index, (old_value, new_value) in enumerate(zip(old, new), start=1)
+        if old_value != new_value
+    }
+    changed.update(range(min(len(old), len(new)) + 1, max(len(old), len(new)) + 1))
+    return frozenset(changed)
+
+
+def _names(value: Any, previous: tuple[str, ...] = ()) -> tuple[str, ...]:
+    """Return a name table from a reply, sharing the previous one if unchanged."""
+    if not isinstance(value, list):
+        return ()
+    names = tuple(value)
+    if names == previous:
+        return previous
+    if all(map(isinstance, names, repeat(str))):
+        return names
+    return tuple(name if isinstance(name, str) else str(name) for name in names)
+
+
+def _same(old: Any, new: Any) -> bool:
+    """Compare two values, starting with the identity of shared tables."""
+    return old is new or old == new
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class MatrixState:
+    """Immutable state of the matrix as of one poll or pushed change.
+
+    Routes and names are tuples. A state built from a previous one reuses
+    the tables that did not change, so a poll that finds nothing new keeps
+    no new tables and is compared with the previous state mostly by
+    identity.
+    """
+
+    power: int = 0
+    routes: RouteTable = field(default_factory=RouteTable)
+    input_names: tuple[str, ...] = ()
+    output_names: tuple[str, ...] = ()
+    preset_names: tuple[str, ...] = ()
+
+    @classmethod
+    def from_reply(
+        cls,
+        reply: Mapping[str, Any],
+        num_outputs: int,
+        previous: MatrixState | None = None,
+        names: bool = True,
+    ) -> MatrixState:
+        """Validate a decoded ``get video status`` reply.
+
+        The allsource list has one entry per output plus a trailing 0. Fields
+        of the wrong type are treated as missing. Tables equal to those of
+        ``previous`` are taken from it; with ``names`` False the name tables
+        of ``previous`` are kept without reading the reply's.
+        """
+        power = reply.get("power", 0)
+        sources = reply.get("allsource")
+        routes = RouteTable.from_sources(
+            sources if isinstance(sources, list) else (), num_outputs
+        )
+        if previous is None:
+            previous = _EMPTY_STATE
+            names = True
+        if routes == previous.routes:
+            routes = previous.routes
+        power = power if isinstance(power, int) else 0
+        if not names:
+            return cls(
+                power=power,
+                routes=routes,
+                input_names=previous.input_names,
+                output_names=previous.output_names,
+                preset_names=previous.preset_names,
+            )
+        return cls(
+            power=power,
+            routes=routes,
+            input_names=_names(reply.get("allinputname"), previous.input_names),
+            output_names=_names(reply.get("alloutputname"), previous.output_names),
+            preset_names=_names(reply.get("allname"), previous.preset_names),
+        )
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], num_outputs: int) -> MatrixState:
+        """Build the state from its stored form, see ``as_dict``."""
+        return cls(
+            power=data.get("power", 0),
+            routes=RouteTable.from_sources(data["source_mapping"], num_outputs),
+            input_names=_names(data.get("input_names")),
+            output_names=_names(data.get("output_names")),
+            preset_names=_names(data.get("preset_names")),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state as JSON-serializable data."""
+        return {
+            "power": self.power,
+            "source_mapping": list(self.routes),
+            "input_names": list(self.input_names),
+            "output_names": list(self.output_names),
+            "preset_names": list(self.preset_names),
+        }
+
+    def with_routes(self, routes: Mapping[int, int]) -> MatrixState:
+        """Return the state with some outputs switched."""
+        table = self.routes.with_routes(routes)
+        return self if table is self.routes else replace(self, routes=table)
+
+    def with_power(self, power: int) -> MatrixState:
+        """Return the state with another power state."""
+        return self if power == self.power else replace(self, power=power)
+
+    def diff(self, new: MatrixState) -> MatrixDiff:
+        """Return what changed from this state to a newer one."""
+        if new is self:
+            return MatrixDiff()
+        return MatrixDiff(
+            routes=_changed_indexes(self.routes, new.routes),
+            output_names=_changed_indexes(self.output_names, new.output_names),
+            input_names=not _same(self.input_names, new.input_names),
+            preset_names=not _same(self.preset_names, new.preset_names),
+            power=self.power != new.power,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Compare field by field, short-circuiting on shared tables."""
+        if not isinstance(other, MatrixState):
+            return NotImplemented
+        return self is other or (
+            self.power == other.power
+            and _same(self.routes, other.routes)
+            and _same(self.input_names, other.input_names)
+            and _same(self.output_names, other.output_names)
+            and _same(self.preset_names, other.preset_names)
+        )
+
+    def __hash__(self) -> int:
+        """Return the hash of the fields."""
+        return hash(
+            (
+                self.power,
+                self.routes,
+                self.input_names,
+                self.output_names,
+                self.preset_names,
+            )
+        )
+
+
+_EMPTY_STATE = MatrixState()
+
+
+def detect_dimensions(state: MatrixState) -> tuple[int, int]:
+    """Return the number of inputs and outputs reported by the matrix.
+
+    The name tables have one entry per port; the routes are padded by the
+    device and only used when output names are missing.
+    """
+    num_inputs = len(state.input_names) or NUM_INPUTS
+    num_outputs = len(state.output_names)
+    if not num_outputs:
+        routes = list(state.routes)
+        while routes and not routes[-1]:
+            routes.pop()
+        num_outputs = len(routes) or NUM_OUTPUTS
+    return num_inputs, num_outputs
+
+
+@dataclass(frozen=True)
+class RoutingIndex:
+    """Lookup tables compiled from the entry's input and output configuration.
+
+    Built once when the entry loads or its configuration changes, so entity
+    properties are plain dictionary lookups. Outputs offering the same inputs
+    share one options list, which keeps large matrices small.
+    """
+
+    num_inputs: int
+    num_outputs: int
+    input_names: dict[int, str]
+    input_numbers: dict[str, int]
+    input_enabled: dict[int, bool]
+    output_names: dict[int, str]
+    output_enabled: dict[int, bool]
+    options: dict[int, list[str]]
+
+    @classmethod
+    def from_entry_data(cls, data: dict[str, Any]) -> RoutingIndex:
+        """Compile the index from config entry data."""
+        num_inputs = data.get(CONF_NUM_INPUTS, NUM_INPUTS)
+        num_outputs = data.get(CONF_NUM_OUTPUTS, NUM_OUTPUTS)
+        inputs = data.get(CONF_INPUTS, {})
+        outputs = data.get(CONF_OUTPUTS, {})
+
+        input_names: dict[int, str] = {}
+        input_numbers: dict[str, int] = {}
+        input_enabled: dict[int, bool] = {}
+        for input_num in range(1, num_inputs + 1):
+            input_config = inputs.get(str(input_num), {})
+            name = input_config.get(CONF_NAME, f"Input {input_num}")
+            input_names[input_num] = name
+            input_numbers.setdefault(name, input_num)
+            input_enabled[input_num] = input_config.get(CONF_INPUT_ENABLED, True)
+
+        output_names: dict[int, str] = {}
+        output_enabled: dict[int, bool] = {}
+        options: dict[int, list[str]] = {}
+        shared_options: dict[tuple[int, ...], list[str]] = {}
+        fallback_options = [f"Input {i}" for i in range(1, num_inputs + 1)]
+        for output_num in range(1, num_outputs + 1):
+            output_config = outputs.get(str(output_num), {})
+            output_names[output_num] = output_config.get(
+                CONF_NAME, f"Output {output_num}"
+            )
+            output_enabled[output_num] = output_config.get(CONF_ENABLED, True)
+            available_inputs = tuple(
+                output_config.get(CONF_AVAILABLE_INPUTS, range(1, num_inputs + 1))
+            )
+            if available_inputs not in shared_options:
+                # Only enabled inputs are offered; fall back to all inputs if none are
+                shared_options[available_inputs] = [
+                    input_names[input_num]
+                    for input_num in available_inputs
+                    if input_enabled.get(input_num, False)
+                ] or fallback_options
+            options[output_num] = shared_options[available_inputs]
+
+        return cls(
+            num_inputs=num_inputs,
+            num_outputs=num_outputs,
+            input_names=input_names,
+            input_numbers=input_numbers,
+            input_enabled=input_enabled,
+            output_names=output_names,
+            output_enabled=output_enabled,
+            options=options,
+        )
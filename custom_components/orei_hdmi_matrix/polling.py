@@ -0,0 +1,70 @@
+"""Adaptive poll interval for OREI HDMI Matrix."""
+from __future__ import annotations
+
+import random
+import time
+
+from .const import (
+    DEFAULT_FAST_POLL_PERIOD,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_UPDATE_INTERVAL_DECAY,
+)
+
+# Fraction of the backoff interval that is randomised while unreachable
+ERROR_BACKOFF_JITTER = 0.2
+
+
+class AdaptivePollInterval:
+    """Work out how long to wait before the next poll.
+
+    Polls run at the minimum interval for a while after activity (a local
+    switch or a change detected on the device), then the interval grows by the
+    decay factor on every stable poll until it reaches the maximum. While the
+    device is unreachable the interval backs off exponentially with jitter.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = DEFAULT_UPDATE_INTERVAL,
+        max_interval: float = DEFAULT_MAX_UPDATE_INTERVAL,
+        decay: float = DEFAULT_UPDATE_INTERVAL_DECAY,
+        fast_period: float = DEFAULT_FAST_POLL_PERIOD,
+    ) -> None:
+        """Initialize the poll interval."""
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.decay = max(1.0, decay)
+        self.fast_period = fast_period
+        self.failures = 0
+        self._interval = min_interval
+        self._fast_until = time.monotonic() + fast_period
+
+    @property
+    def interval(self) -> float:
+        """Return the current poll interval in seconds."""
+        return self._interval
+
+    def mark_activity(self) -> None:
+        """Return to fast polling after a local or external change."""
+        self._fast_until = time.monotonic() + self.fast_period
+        self._interval = self.min_interval
+
+    def poll_succeeded(self, changed: bool) -> float:
+        """Update the interval after a successful poll and return it."""
+        recovered, self.failures = self.failures > 0, 0
+        if changed or recovered:
+            self.mark_activity()
+        elif time.monotonic() < self._fast_until:
+            self._interval = self.min_interval
+        else:
+            self._interval = min(self._interval * self.decay, self.max_interval)
+        return self._interval
+
+    def poll_failed(self) -> float:
+        """Back off after a failed poll and return the new interval."""
+        self.failures += 1
+        backoff = min(self.min_interval * 2**self.failures, self.max_interval)
+        jitter = random.uniform(-ERROR_BACKOFF_JITTER, ERROR_BACKOFF_JITTER)
+        self._interval = backoff * (1 + jitter)
+        return self._interval
@@ -0,0 +1,46 @@
+"""Presets kept by the integration for layouts the matrix cannot store."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import PRESET_STORAGE_KEY, STORAGE_VERSION
+
+
+class OreiHdmiMatrixPresetStore:
+    """Named route layouts of one matrix, saved in Home Assistant's storage.
+
+    Unlike the matrix's own preset slots these are not limited in number and
+    may cover only some outputs.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, dict[str, int]]] = Store(
+            hass, STORAGE_VERSION, PRESET_STORAGE_KEY.format(entry_id=entry_id)
+        )
+        self.presets: dict[str, dict[int, int]] = {}
+
+    async def async_load(self) -> None:
+        """Load the saved presets."""
+        stored = await self._store.async_load() or {}
+        # JSON object keys are strings; outputs are used as numbers
+        self.presets = {
+            name: {int(output): input_ for output, input_ in routes.items()}
+            for name, routes in stored.items()
+        }
+
+    async def async_save_preset(self, name: str, routes: dict[int, int]) -> None:
+        """Save a layout under a name, replacing any preset with that name."""
+        self.presets[name] = dict(routes)
+        await self._store.async_save(
+            {
+                preset: {str(output): input_ for output, input_ in layout.items()}
+                for preset, layout in self.presets.items()
+            }
+        )
+
+    async def async_remove(self) -> None:
+        """Delete all presets."""
+        self.presets = {}
+        await self._store.async_remove()
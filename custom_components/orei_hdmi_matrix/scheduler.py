@@ -0,0 +1,205 @@
+"""Domain-wide poll scheduler for OREI HDMI Matrix coordinators."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE, EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+
+from .api import OreiHdmiMatrixConnectionStats
+from .const import (
+    DATA_SCHEDULER,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_TIMEOUT,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import OreiHdmiMatrixCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Window within each second that scheduled polls are spread over
+STAGGER_START = 0.05
+STAGGER_WINDOW = 0.9
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> OreiHdmiMatrixScheduler:
+    """Return the scheduler shared by every matrix, creating it on first use."""
+    if (scheduler := hass.data.get(DATA_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_SCHEDULER] = OreiHdmiMatrixScheduler(hass)
+    return scheduler
+
+
+class OreiHdmiMatrixScheduler:
+    """Owns the coordinators of every matrix and the connection pool they share.
+
+    Scheduled polls are given evenly spaced offsets so that matrices in the
+    same rack do not all poll in the same instant, and manual refreshes of
+    several matrices run concurrently. Service calls find their matrices
+    through an index from device and entity IDs to coordinators, rebuilt
+    when a coordinator or the device or entity registry changes. The
+    registries are only watched while a coordinator is registered.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._coordinators: dict[str, OreiHdmiMatrixCoordinator] = {}
+        self._session: aiohttp.ClientSession | None = None
+        self._targets: dict[str, OreiHdmiMatrixCoordinator] | None = None
+        self._unsub_listeners: list[CALLBACK_TYPE] = []
+        self.last_refresh_duration: float | None = None
+
+    @property
+    def coordinators(self) -> list[OreiHdmiMatrixCoordinator]:
+        """Return the registered coordinators in registration order."""
+        return list(self._coordinators.values())
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the session every API client sends its requests through.
+
+        Its connector keeps connections alive but opens no more than the
+        embedded web server copes with to any one matrix; Home Assistant's
+        shared connector cannot be capped per host. Requests carry their
+        client's stats as trace context, so connection reuse is still counted
+        per matrix. The session is closed when Home Assistant shuts down.
+        """
+        if self._session is None:
+            session = self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=DEFAULT_MAX_CONNECTIONS,
+                    keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT,
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    total=DEFAULT_TIMEOUT, sock_connect=DEFAULT_CONNECT_TIMEOUT
+                ),
+                trace_configs=[OreiHdmiMatrixConnectionStats.trace_config()],
+            )
+
+            async def _async_close_session(_event: Event) -> None:
+                if self._session is session:
+                    self._session = None
+                await session.close()
+
+            self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_CLOSE, _async_close_session
+            )
+        return self._session
+
+    @callback
+    def async_register(self, coordinator: OreiHdmiMatrixCoordinator) -> CALLBACK_TYPE:
+        """Add a coordinator and return a callback that removes it again."""
+        entry_id = coordinator.entry.entry_id
+        self._coordinators[entry_id] = coordinator
+        self._targets = None
+        self._async_stagger()
+        if not self._unsub_listeners:
+            self._async_listen()
+
+        @callback
+        def _async_unregister() -> None:
+            if self._coordinators.get(entry_id) is coordinator:
+                del self._coordinators[entry_id]
+                self._targets = None
+                self._async_stagger()
+                if not self._coordinators:
+                    self._async_unlisten()
+
+        return _async_unregister
+
+    @callback
+    def _async_listen(self) -> None:
+        """Watch the registries for changes to the target index."""
+        bus = self.hass.bus
+        self._unsub_listeners = [
+            bus.async_listen(event_type, self._async_invalidate_targets)
+            for event_type in (
+                dr.EVENT_DEVICE_REGISTRY_UPDATED,
+                er.EVENT_ENTITY_REGISTRY_UPDATED,
+            )
+        ]
+        self._unsub_listeners.append(
+            bus.async_listen(EVENT_HOMEASSISTANT_STOP, self._async_unlisten)
+        )
+
+    @callback
+    def _async_unlisten(self, _event: Event | None = None) -> None:
+        """Stop watching the registries."""
+        unsub_listeners, self._unsub_listeners = self._unsub_listeners, []
+        for unsub in unsub_listeners:
+            unsub()
+        self._targets = None
+
+    @callback
+    def _async_invalidate_targets(self, _event: Event | None = None) -> None:
+        """Forget the target index; it is rebuilt on the next lookup."""
+        self._targets = None
+
+    @callback
+    def async_coordinators_for(
+        self, target_ids: Iterable[str]
+    ) -> list[OreiHdmiMatrixCoordinator]:
+        """Return the coordinators of the given device and entity IDs.
+
+        Each coordinator is listed once, in the order it was first targeted;
+        IDs that belong to no matrix are ignored.
+        """
+        if (targets := self._targets) is None:
+            targets = self._targets = self._async_build_targets()
+        found: dict[str, OreiHdmiMatrixCoordinator] = {}
+        for target_id in target_ids:
+            if (coordinator := targets.get(target_id)) is not None:
+                found.setdefault(coordinator.entry.entry_id, coordinator)
+        return list(found.values())
+
+    @callback
+    def _async_build_targets(self) -> dict[str, OreiHdmiMatrixCoordinator]:
+        """Map the devices and entities of every matrix to its coordinator."""
+        device_registry = dr.async_get(self.hass)
+        entity_registry = er.async_get(self.hass)
+        targets: dict[str, OreiHdmiMatrixCoordinator] = {}
+        for entry_id, coordinator in self._coordinators.items():
+            for device in dr.async_entries_for_config_entry(device_registry, entry_id):
+                targets[device.id] = coordinator
+            for entity in er.async_entries_for_config_entry(entity_registry, entry_id):
+                targets[entity.entity_id] = coordinator
+        return targets
+
+    @callback
+    def _async_stagger(self) -> None:
+        """Give every coordinator its own slot for scheduled polls."""
+        count = len(self._coordinators)
+        for slot, coordinator in enumerate(self._coordinators.values()):
+            coordinator.async_set_poll_offset(
+                STAGGER_START + STAGGER_WINDOW * slot / count
+            )
+
+    async def async_refresh(
+        self, coordinators: Iterable[OreiHdmiMatrixCoordinator] | None = None
+    ) -> None:
+        """Refresh the given coordinators, or all of them, concurrently."""
+        targets = self.coordinators if coordinators is None else list(coordinators)
+        if not targets:
+            return
+
+        started = time.monotonic()
+        await asyncio.gather(
+            *(coordinator.async_refresh_now() for coordinator in targets)
+        )
+        self.last_refresh_duration = time.monotonic() - started
+        _LOGGER.debug(
+            "Refreshed %d matrices in %.3f seconds",
+            len(targets),
+            self.last_refresh_duration,
+        )
@@ -10,18 +10,9 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import (
-    CONF_INPUTS,
-    CONF_OUTPUTS,
-    CONF_NAME,
-    CONF_ENABLED,
-    CONF_AVAILABLE_INPUTS,
-    CONF_INPUT_ENABLED,
-    DOMAIN,
-    NUM_INPUTS,
-    NUM_OUTPUTS,
-)
+from .const import DOMAIN
 from .coordinator import OreiHdmiMatrixCoordinator
+from .entity import matrix_device_info, matrix_model
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,27 +25,19 @@ async def async_setup_entry(
     """Set up OREI HDMI Matrix select entities."""
     coordinator: OreiHdmiMatrixCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    _LOGGER.info("Setting up select entities for OREI HDMI Matrix")
-    _LOGGER.info("Entry data: %s", entry.data)
-
     entities = []
-    outputs = entry.data.get(CONF_OUTPUTS, {})
-    
-    _LOGGER.info("Outputs configuration: %s", outputs)
+    routing_index = coordinator.routing_index
     
     # Create a select entity for each enabled output
-    for output_num in range(1, NUM_OUTPUTS + 1):
-        output_config = outputs.get(str(output_num), {})
-        _LOGGER.info("Output %d config: %s", output_num, output_config)
-        if output_config.get(CONF_ENABLED, True):
-            _LOGGER.info("Creating entity for enabled output %d", output_num)
+    for output_num in range(1, routing_index.num_outputs + 1):
+        if routing_index.output_enabled[output_num]:
             entities.append(
                 OreiHdmiMatrixOutputSelect(coordinator, entry, output_num)
             )
-        else:
-            _LOGGER.info("Skipping disabled output %d", output_num)
 
-    _LOGGER.info("Created %d select entities", len(entities))
+    entities.append(OreiHdmiMatrixPresetSelect(coordinator, entry))
+
+    _LOGGER.debug("Created %d select entities", len(entities))
     async_add_entities(entities)
 
 
@@ -65,19 +48,11 @@ class OreiHdmiMatrixOutputSelect(
 
     def __init__(self, coordinator: OreiHdmiMatrixCoordinator, entry: ConfigEntry, output_num: int) -> None:
         """Initialize the select entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=output_num)
         self._output_num = output_num
         self._entry = entry
         
-        _LOGGER.info("Initializing select entity for output %d", output_num)
-        
-        # Get output configuration
-        outputs = entry.data.get(CONF_OUTPUTS, {})
-        output_config = outputs.get(str(output_num), {})
-        output_name = output_config.get(CONF_NAME, f"Output {output_num}")
-        
-        _LOGGER.info("Output %d configuration: %s", output_num, output_config)
-        _LOGGER.info("Output %d name: %s", output_num, output_name)
+        output_name = coordinator.routing_index.output_names[output_num]
         
         self._attr_unique_id = f"{entry.entry_id}_output_{output_num}"
         self._attr_name = "Input Selection"
@@ -85,7 +60,7 @@ class OreiHdmiMatrixOutputSelect(
             "identifiers": {(DOMAIN, f"{entry.entry_id}_output_{output_num}")},
             "name": output_name,
             "manufacturer": "OREI",
-            "model": "8x8 HDMI Matrix",
+            "model": matrix_model(entry),
             "via_device": (DOMAIN, entry.entry_id),
         }
         self._attr_entity_category = None  # Make it a primary entity
@@ -103,83 +78,62 @@ class OreiHdmiMatrixOutputSelect(
         self._attr_should_poll = False
         
         # No custom more-info dialog - use manual configuration instead
-               
-        _LOGGER.info("Created select entity: %s (unique_id: %s)", self._attr_name, self._attr_unique_id)
 
     @property
     def options(self) -> list[str]:
         """Return the available options."""
-        # Get configured inputs
-        inputs = self._entry.data.get(CONF_INPUTS, {})
-        outputs = self._entry.data.get(CONF_OUTPUTS, {})
-        output_config = outputs.get(str(self._output_num), {})
-        available_inputs = output_config.get(CONF_AVAILABLE_INPUTS, list(range(1, NUM_INPUTS + 1)))
-        
-        _LOGGER.info("Output %d - inputs config: %s", self._output_num, inputs)
-        _LOGGER.info("Output %d - available_inputs: %s", self._output_num, available_inputs)
-        
-        # Build list of available input names (only enabled inputs)
-        options = []
-        for input_num in available_inputs:
-            input_config = inputs.get(str(input_num), {})
-            _LOGGER.info("Input %d config: %s", input_num, input_config)
-            # Only include enabled inputs
-            if input_config.get(CONF_INPUT_ENABLED, True):
-                input_name = input_config.get(CONF_NAME, f"Input {input_num}")
-                options.append(input_name)
-                _LOGGER.info("Added input %d: %s", input_num, input_name)
-        
-        # Fallback: if no options found, provide default inputs
-        if not options:
-            _LOGGER.warning("No options found for output %d, using fallback", self._output_num)
-            for i in range(1, NUM_INPUTS + 1):
-                options.append(f"Input {i}")
-        
-        _LOGGER.info("Final options for output %d: %s", self._output_num, options)
-        return options
+        return self.coordinator.routing_index.options[self._output_num]
 
     @property
     def current_option(self) -> str | None:
         """Return the currently selected option."""
-        source_mapping = self.coordinator.data.get("source_mapping", [])
-        _LOGGER.info("Output %d - source_mapping: %s", self._output_num, source_mapping)
-        _LOGGER.info("Output %d - coordinator data: %s", self._output_num, self.coordinator.data)
-        
-        if len(source_mapping) >= self._output_num:
-            current_input = source_mapping[self._output_num - 1]
-            _LOGGER.info("Output %d - current_input: %d", self._output_num, current_input)
-            if 1 <= current_input <= NUM_INPUTS:
-                # Get configured input name
-                inputs = self._entry.data.get(CONF_INPUTS, {})
-                input_config = inputs.get(str(current_input), {})
-                input_name = input_config.get(CONF_NAME, f"Input {current_input}")
-                _LOGGER.info("Output %d - current_option: %s", self._output_num, input_name)
-                return input_name
-        _LOGGER.info("Output %d - no current option", self._output_num)
-        return None
+        current_input = self.coordinator.data.routes.input_for(
+            self._output_num
+        )
+        return self.coordinator.routing_index.input_names.get(current_input)
 
     async def async_select_option(self, option: str) -> None:
         """Change the selected option."""
-        # Find the input number for the selected option by matching configured names
-        inputs = self._entry.data.get(CONF_INPUTS, {})
-        input_num = None
-        
-        for i in range(1, NUM_INPUTS + 1):
-            input_config = inputs.get(str(i), {})
-            input_name = input_config.get(CONF_NAME, f"Input {i}")
-            if input_name == option:
-                input_num = i
-                break
-        
+        input_num = self.coordinator.routing_index.input_numbers.get(option)
         if input_num is None:
             _LOGGER.error("Could not find input number for option: %s", option)
             return
 
-        if not (1 <= input_num <= NUM_INPUTS):
-            _LOGGER.error("Invalid input number: %d", input_num)
-            return
-
-        success = await self.coordinator.async_set_output_input(self._output_num, input_num)
+        success = await self.coordinator.async_queue_output_input(self._output_num, input_num)
         if not success:
             _LOGGER.error("Failed to set output %d to input %d", self._output_num, input_num)
             # The coordinator will handle updating the data on success
+
+
+class OreiHdmiMatrixPresetSelect(
+    CoordinatorEntity[OreiHdmiMatrixCoordinator], SelectEntity
+):
+    """Select entity recalling the matrix's presets and the local ones."""
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:view-dashboard"
+    _attr_name = "Preset"
+
+    def __init__(self, coordinator: OreiHdmiMatrixCoordinator, entry: ConfigEntry) -> None:
+        """Initialize the select entity."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{entry.entry_id}_preset"
+        self._attr_device_info = matrix_device_info(entry)
+
+    @property
+    def options(self) -> list[str]:
+        """Return the available presets."""
+        return self.coordinator.preset_options
+
+    @property
+    def current_option(self) -> str | None:
+        """Return the local preset matching the current routes.
+
+        The matrix does not report which of its own presets is active.
+        """
+        return self.coordinator.active_local_preset
+
+    async def async_select_option(self, option: str) -> None:
+        """Recall the selected preset."""
+        if not await self.coordinator.async_select_preset(option):
+            _LOGGER.error("Failed to recall preset %s", option)
@@ -0,0 +1,186 @@
+"""Diagnostic sensors for OREI HDMI Matrix."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .breaker import CircuitState
+from .const import CONTEXT_CIRCUIT_BREAKER, CONTEXT_METRICS, DOMAIN
+from .coordinator import OreiHdmiMatrixCoordinator
+from .entity import matrix_device_info
+from .metrics import LatencyHistogram, OreiHdmiMatrixMetrics
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up OREI HDMI Matrix diagnostic sensors."""
+    coordinator: OreiHdmiMatrixCoordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        [
+            OreiHdmiMatrixCircuitBreakerSensor(coordinator, entry),
+            OreiHdmiMatrixLatencySensor(
+                coordinator,
+                entry,
+                "request_latency",
+                "Request latency",
+                OreiHdmiMatrixMetrics.request_latency,
+            ),
+            OreiHdmiMatrixLatencySensor(
+                coordinator,
+                entry,
+                "poll_duration",
+                "Poll duration",
+                lambda metrics: metrics.polls,
+            ),
+            OreiHdmiMatrixRequestErrorsSensor(coordinator, entry),
+        ]
+    )
+
+
+class OreiHdmiMatrixCircuitBreakerSensor(
+    CoordinatorEntity[OreiHdmiMatrixCoordinator], SensorEntity
+):
+    """Sensor showing whether requests to the matrix are failing fast."""
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:electric-switch"
+    _attr_name = "Connection circuit"
+    _attr_options = [state.value for state in CircuitState]
+
+    def __init__(self, coordinator: OreiHdmiMatrixCoordinator, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, context=CONTEXT_CIRCUIT_BREAKER)
+        self._attr_unique_id = f"{entry.entry_id}_circuit_breaker"
+        self._attr_device_info = matrix_device_info(entry)
+
+    @property
+    def available(self) -> bool:
+        """Return True; the breaker state matters most when the matrix is down."""
+        return True
+
+    @property
+    def native_value(self) -> str:
+        """Return the breaker state."""
+        return self.coordinator.breaker_stats.get("state", CircuitState.CLOSED.value)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return failure and transition details."""
+        stats = self.coordinator.breaker_stats
+        return {
+            "consecutive_failures": stats.get("consecutive_failures", 0),
+            "transition_count": stats.get("transition_count", 0),
+        }
+
+
+class OreiHdmiMatrixMetricSensor(
+    CoordinatorEntity[OreiHdmiMatrixCoordinator], SensorEntity
+):
+    """Base for sensors showing the collected metrics.
+
+    They are disabled by default and unavailable unless metric collection is
+    turned on in the options.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_has_entity_name = True
+
+    def __init__(
+        self, coordinator: OreiHdmiMatrixCoordinator, entry: ConfigEntry, key: str
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, context=CONTEXT_METRICS)
+        self._attr_unique_id = f"{entry.entry_id}_{key}"
+        self._attr_device_info = matrix_device_info(entry)
+
+    @property
+    def available(self) -> bool:
+        """Return True while metrics are collected."""
+        return self.coordinator.metrics is not None
+
+
+class OreiHdmiMatrixLatencySensor(OreiHdmiMatrixMetricSensor):
+    """Sensor showing the 95th percentile of a latency histogram."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_icon = "mdi:timer-outline"
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 1
+
+    def __init__(
+        self,
+        coordinator: OreiHdmiMatrixCoordinator,
+        entry: ConfigEntry,
+        key: str,
+        name: str,
+        histogram: Callable[[OreiHdmiMatrixMetrics], LatencyHistogram],
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry, key)
+        self._attr_name = name
+        self._histogram = histogram
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the 95th percentile in milliseconds."""
+        if (metrics := self.coordinator.metrics) is None:
+            return None
+        if (p95 := self._histogram(metrics).percentile(0.95)) is None:
+            return None
+        return p95 * 1000
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the count and the other percentiles in milliseconds."""
+        if (metrics := self.coordinator.metrics) is None:
+            return {}
+        histogram = self._histogram(metrics)
+        attributes: dict[str, Any] = {"count": histogram.count}
+        for key, fraction in (("p50", 0.5), ("p99", 0.99)):
+            value = histogram.percentile(fraction)
+            attributes[key] = None if value is None else value * 1000
+        return attributes
+
+
+class OreiHdmiMatrixRequestErrorsSensor(OreiHdmiMatrixMetricSensor):
+    """Sensor counting commands that failed or timed out."""
+
+    _attr_icon = "mdi:alert-circle-outline"
+    _attr_name = "Request errors"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, coordinator: OreiHdmiMatrixCoordinator, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry, "request_errors")
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the number of failed commands."""
+        if (metrics := self.coordinator.metrics) is None:
+            return None
+        return metrics.total_errors
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the number of commands sent."""
+        if (metrics := self.coordinator.metrics) is None:
+            return {}
+        return {"requests": metrics.total_requests}
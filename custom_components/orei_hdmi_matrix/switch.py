@@ -0,0 +1,60 @@
+"""Switch entities for OREI HDMI Matrix."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.components.switch import SwitchEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import CONTEXT_POWER, DOMAIN
+from .coordinator import OreiHdmiMatrixCoordinator
+from .entity import matrix_device_info
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up OREI HDMI Matrix switch entities."""
+    coordinator: OreiHdmiMatrixCoordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities([OreiHdmiMatrixPowerSwitch(coordinator, entry)])
+
+
+class OreiHdmiMatrixPowerSwitch(
+    CoordinatorEntity[OreiHdmiMatrixCoordinator], SwitchEntity
+):
+    """Switch turning the matrix on or putting it in standby."""
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:power"
+    _attr_name = "Power"
+
+    def __init__(self, coordinator: OreiHdmiMatrixCoordinator, entry: ConfigEntry) -> None:
+        """Initialize the switch."""
+        super().__init__(coordinator, context=CONTEXT_POWER)
+        self._attr_unique_id = f"{entry.entry_id}_power"
+        self._attr_device_info = matrix_device_info(entry)
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True unless the matrix reports standby."""
+        if self.coordinator.data is None:
+            return None
+        return bool(self.coordinator.data.power)
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        """Turn the matrix on."""
+        if not await self.coordinator.async_set_power(True):
+            _LOGGER.error("Failed to turn on %s", self.coordinator.entry.title)
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        """Put the matrix in standby."""
+        if not await self.coordinator.async_set_power(False):
+            _LOGGER.error("Failed to turn off %s", self.coordinator.entry.title)
@@ -0,0 +1,487 @@
+"""Transports carrying commands between the API client and the matrix.
+
+Commands are the JSON objects of the web interface (``{"comhead": ...}``).
+The HTTP transport posts them as they are; the TCP transport translates them
+to the line-based ASCII protocol of the matrix's control port, which also
+serves RS-232 through a serial-to-network adapter.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+from aiohttp import ClientTimeout
+
+from .const import (
+    API_ENDPOINT,
+    CMD_GET_STATUS,
+    CMD_LOGIN,
+    CMD_PRESET_RECALL,
+    CMD_PRESET_SAVE,
+    CMD_SET_POWER,
+    CMD_VIDEO_SWITCH,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_PIPELINE_DEPTH,
+    DEFAULT_TCP_PORT,
+    DEFAULT_TIMEOUT,
+    NUM_OUTPUTS,
+    TCP_CMD_GET_POWER,
+    TCP_CMD_GET_ROUTES,
+    TCP_CMD_PRESET_RECALL,
+    TCP_CMD_PRESET_SAVE,
+    TCP_CMD_SET_POWER,
+    TCP_CMD_SWITCH,
+    TRANSPORT_HTTP,
+    TRANSPORT_TCP,
+)
+from .exceptions import OreiHdmiMatrixApiError, OreiHdmiMatrixAuthError
+from .log import RateLimitedLogger
+
+if TYPE_CHECKING:
+    from .api import OreiHdmiMatrixConnectionStats
+    from .metrics import OreiHdmiMatrixMetrics
+
+try:
+    # Parses bytes directly and several times faster than the standard library
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as json_loads
+
+_LOGGER = logging.getLogger(__name__)
+
+# Replies of the control port
+ROUTE_LINE = re.compile(r"input\s*(\d+)\s*->\s*output\s*(\d+)", re.IGNORECASE)
+POWER_LINE = re.compile(r"power\s+(on|off)", re.IGNORECASE)
+PRESET_LINE = re.compile(r"(save|recall)\s+preset\s*(\d+)", re.IGNORECASE)
+ERROR_LINE = re.compile(r"\berror\b", re.IGNORECASE)
+
+
+class Reply(dict):
+    """Decoded reply of a command with the event loop time spent decoding it."""
+
+    __slots__ = ("decode_time",)
+
+    def __init__(self, data: dict[str, Any], decode_time: float = 0.0) -> None:
+        """Initialize the reply."""
+        super().__init__(data)
+        self.decode_time = decode_time
+
+
+class OreiHdmiMatrixTransport(ABC):
+    """Base class for transports.
+
+    ``max_in_flight`` is how many commands the API client may have
+    outstanding on the transport at once. While ``metrics`` is set replies
+    are returned as ``Reply`` with their decode time, which the API client
+    records together with building the status from them.
+    """
+
+    name: str
+    max_in_flight = 1
+    metrics: OreiHdmiMatrixMetrics | None = None
+
+    @abstractmethod
+    async def send(
+        self, data: dict[str, Any], timeout: float | None = None
+    ) -> dict[str, Any]:
+        """Send a command and return the decoded reply.
+
+        ``timeout`` shortens the transport's own timeout for this command.
+        """
+
+    async def close(self) -> None:
+        """Release the transport's connections."""
+
+
+class HttpTransport(OreiHdmiMatrixTransport):
+    """JSON commands posted to the web interface's CGI endpoint.
+
+    The CGI handler serves one request at a time, so only one command is
+    sent at once.
+    """
+
+    name = TRANSPORT_HTTP
+
+    def __init__(
+        self,
+        host: str,
+        session: aiohttp.ClientSession,
+        timeout: ClientTimeout,
+        stats: OreiHdmiMatrixConnectionStats | None = None,
+    ) -> None:
+        """Initialize the transport on a session owned by the caller."""
+        self.session = session
+        self.timeout = timeout
+        self._url = f"http://{host}{API_ENDPOINT}"
+        self._stats = stats
+        self._traffic_log = RateLimitedLogger()
+
+    async def send(
+        self, data: dict[str, Any], timeout: float | None = None
+    ) -> dict[str, Any]:
+        """Post a command to the device and decode the JSON reply."""
+        client_timeout = self.timeout
+        if timeout is not None:
+            client_timeout = ClientTimeout(
+                total=min(timeout, client_timeout.total or timeout),
+                sock_connect=client_timeout.sock_connect,
+            )
+        async with self.session.post(
+            self._url,
+            json=data,
+            timeout=client_timeout,
+            trace_request_ctx=self._stats,
+        ) as response:
+            if response.status in (401, 403):
+                raise OreiHdmiMatrixAuthError(
+                    f"HTTP error {response.status}: {response.reason}"
+                )
+
+            # The body is read once and decoded straight from bytes; it is
+            # only turned into text for logging
+            body = await response.read()
+            if response.status != 200:
+                _LOGGER.error("HTTP error %s: %s, response: %r", response.status, response.reason, body)
+                raise OreiHdmiMatrixApiError(
+                    f"HTTP error {response.status}: {response.reason}"
+                )
+
+            if self._traffic_log.enabled:
+                self._traffic_log.debug(
+                    f"response {data.get('comhead')}",
+                    "Response %s from %s: %s",
+                    response.status,
+                    self._url,
+                    body.decode("utf-8", "replace"),
+                )
+
+            started = time.perf_counter()
+            try:
+                result = json_loads(body)
+            except ValueError as json_err:
+                _LOGGER.error("Failed to parse JSON response: %s, response: %r", json_err, body)
+                raise OreiHdmiMatrixApiError(f"Invalid JSON response: {body!r}")
+            if not isinstance(result, dict):
+                raise OreiHdmiMatrixApiError(f"Unexpected JSON response: {body!r}")
+            if self.metrics is not None:
+                return Reply(result, time.perf_counter() - started)
+            return result
+
+
+class _Reply(ABC):
+    """Reply lines expected for one command sent over the control port."""
+
+    def __init__(self) -> None:
+        """Initialize the reply."""
+        self.future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        # Time spent decoding the lines of this reply, while metrics are on
+        self.decode_time = 0.0
+
+    @abstractmethod
+    def feed(self, line: str) -> bool:
+        """Consume a line if it belongs to this reply and return True if it did."""
+
+    def fail(self, err: Exception) -> None:
+        """Fail the command."""
+        if not self.future.done():
+            self.future.set_exception(err)
+
+
+class _SwitchReply(_Reply):
+    """Confirmation of a route change: ``input 3 -> output 2``."""
+
+    def __init__(self, output: int) -> None:
+        """Initialize the reply for a switch of one output."""
+        super().__init__()
+        self.output = output
+
+    def feed(self, line: str) -> bool:
+        """Take the route line of the switched output."""
+        if (match := ROUTE_LINE.search(line)) and int(match[2]) == self.output:
+            self.future.set_result(int(match[1]))
+            return True
+        return False
+
+
+class _RoutesReply(_Reply):
+    """One route line per output."""
+
+    def __init__(self, num_outputs: int) -> None:
+        """Initialize the reply for a matrix with the given number of outputs."""
+        super().__init__()
+        self.routes = [0] * num_outputs
+        self._missing = set(range(1, num_outputs + 1))
+
+    def feed(self, line: str) -> bool:
+        """Take route lines until every output was reported."""
+        if not (match := ROUTE_LINE.search(line)):
+            return False
+        output = int(match[2])
+        if 0 < output <= len(self.routes):
+            self.routes[output - 1] = int(match[1])
+            self._missing.discard(output)
+        if not self._missing:
+            self.future.set_result(self.routes)
+        return True
+
+
+class _PowerReply(_Reply):
+    """Power state: ``power on`` or ``power off``."""
+
+    def feed(self, line: str) -> bool:
+        """Take the power line."""
+        if match := POWER_LINE.search(line):
+            self.future.set_result(int(match[1].lower() == "on"))
+            return True
+        return False
+
+
+class _PresetReply(_Reply):
+    """Confirmation of a preset command: ``save preset 2`` or ``recall preset 2``."""
+
+    def __init__(self, action: str, preset: int) -> None:
+        """Initialize the reply for saving or recalling a preset."""
+        super().__init__()
+        self.action = action
+        self.preset = preset
+
+    def feed(self, line: str) -> bool:
+        """Take the confirmation line of the preset."""
+        if (
+            (match := PRESET_LINE.search(line))
+            and match[1].lower() == self.action
+            and int(match[2]) == self.preset
+        ):
+            self.future.set_result(True)
+            return True
+        return False
+
+
+class TcpTransport(OreiHdmiMatrixTransport):
+    """ASCII commands over a persistent connection to the control port.
+
+    Commands are pipelined: each is written as soon as it is sent and its
+    reply lines are matched in order by a single reader task that parses the
+    stream as it arrives. The connection is opened on first use and again
+    after it drops or a reply times out.
+
+    Lines that answer no command are state changes made at the matrix itself
+    (front panel, IR remote). They are passed to ``on_feedback`` as the
+    changed routes (output -> input) and the new power state, once per chunk
+    read from the connection. A line reporting an error fails the oldest
+    command still waiting; any other line, such as a banner or an echo, is
+    ignored.
+    """
+
+    name = TRANSPORT_TCP
+
+    def __init__(
+        self,
+        host: str,
+        port: int = DEFAULT_TCP_PORT,
+        num_outputs: int = NUM_OUTPUTS,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_in_flight: int = DEFAULT_PIPELINE_DEPTH,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    ) -> None:
+        """Initialize the transport."""
+        self.host = host
+        self.port = port
+        self.num_outputs = num_outputs
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_in_flight = max_in_flight
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._read_task: asyncio.Task[None] | None = None
+        self._replies: deque[_Reply] = deque()
+        self._connect_lock = asyncio.Lock()
+        self._traffic_log = RateLimitedLogger()
+        self.on_feedback: Callable[[dict[int, int], int | None], None] | None = None
+        self._feedback_routes: dict[int, int] = {}
+        self._feedback_power: int | None = None
+
+    @property
+    def connected(self) -> bool:
+        """Return True if the control connection is open."""
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def send(
+        self, data: dict[str, Any], timeout: float | None = None
+    ) -> dict[str, Any]:
+        """Translate a web interface command and run it over the control port."""
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        command = data.get("comhead")
+        if command == CMD_LOGIN:
+            # The control port has no login
+            return {"comhead": CMD_LOGIN, "result": 1}
+
+        if command == CMD_GET_STATUS:
+            power_reply = _PowerReply()
+            routes_reply = _RoutesReply(self.num_outputs)
+            power, routes = await asyncio.gather(
+                self._query(TCP_CMD_GET_POWER, power_reply, timeout),
+                self._query(TCP_CMD_GET_ROUTES, routes_reply, timeout),
+            )
+            return Reply(
+                {"comhead": CMD_GET_STATUS, "power": power, "allsource": routes},
+                power_reply.decode_time + routes_reply.decode_time,
+            )
+
+        if command == CMD_VIDEO_SWITCH:
+            output, input_ = data["source"]
+            routed = await self._query(
+                TCP_CMD_SWITCH.format(input=input_, output=output),
+                _SwitchReply(output),
+                timeout,
+            )
+            return {"comhead": CMD_VIDEO_SWITCH, "result": int(routed == input_)}
+
+        if command == CMD_SET_POWER:
+            power = await self._query(
+                TCP_CMD_SET_POWER.format(power=data["power"]), _PowerReply(), timeout
+            )
+            return {"comhead": CMD_SET_POWER, "result": int(power == data["power"])}
+
+        if command in (CMD_PRESET_SAVE, CMD_PRESET_RECALL):
+            preset = data["index"]
+            if command == CMD_PRESET_SAVE:
+                line, action = TCP_CMD_PRESET_SAVE.format(preset=preset), "save"
+            else:
+                # The new routes follow as feedback lines
+                line, action = TCP_CMD_PRESET_RECALL.format(preset=preset), "recall"
+            await self._query(line, _PresetReply(action, preset), timeout)
+            return {"comhead": command, "result": 1}
+
+        raise OreiHdmiMatrixApiError(f"Command {command!r} is not supported over TCP")
+
+    async def _query(self, line: str, reply: _Reply, timeout: float) -> Any:
+        """Write a command line and wait up to ``timeout`` for its reply."""
+        started = time.monotonic()
+        await self.connect(timeout)
+        assert self._writer is not None
+        # Queue the reply and write without yielding so both stay in order
+        self._replies.append(reply)
+        self._writer.write(f"{line}\r\n".encode("ascii"))
+        self._traffic_log.debug("tcp request", "Sent to %s: %s", self.host, line)
+        await self._writer.drain()
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(reply.future), timeout - (time.monotonic() - started)
+            )
+        except asyncio.TimeoutError:
+            # Later replies can no longer be matched reliably
+            reply.future.cancel()
+            await self.close()
+            raise
+
+    async def connect(self, timeout: float | None = None) -> None:
+        """Open the control connection unless it is open.
+
+        Opening it takes at most the connect timeout, or ``timeout`` if that
+        is shorter.
+        """
+        if self.connected:
+            return
+        async with self._connect_lock:
+            if self.connected:
+                return
+            _LOGGER.debug("Connecting to %s:%s", self.host, self.port)
+            if timeout is None or timeout > self.connect_timeout:
+                timeout = self.connect_timeout
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), timeout
+            )
+            self._read_task = asyncio.create_task(self._read_loop(self._reader))
+
+    async def wait_closed(self) -> None:
+        """Wait until the current control connection is closed."""
+        if self._read_task is not None:
+            await asyncio.wait({self._read_task})
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        """Split the incoming stream into lines and hand them to the replies."""
+        buffer = bytearray()
+        error: Exception = ConnectionError(f"Connection to {self.host} closed")
+        try:
+            while chunk := await reader.read(4096):
+                buffer += chunk
+                timed = self.metrics is not None
+                while (end := buffer.find(b"\n")) != -1:
+                    started = time.perf_counter() if timed else 0.0
+                    line = buffer[:end].decode("ascii", "replace").strip()
+                    del buffer[: end + 1]
+                    if line and (reply := self._handle_line(line)) and timed:
+                        reply.decode_time += time.perf_counter() - started
+                self._flush_feedback()
+        except OSError as err:
+            error = ConnectionError(f"Connection to {self.host} lost: {err}")
+        finally:
+            # close() may already have replaced this connection
+            if self._reader is reader:
+                self._drop_connection(error)
+
+    def _handle_line(self, line: str) -> _Reply | None:
+        """Match a line against the oldest outstanding reply.
+
+        Returns the reply that took the line, if any.
+        """
+        self._traffic_log.debug("tcp response", "Received from %s: %s", self.host, line)
+        while self._replies and self._replies[0].future.done():
+            self._replies.popleft()
+        if self._replies and (reply := self._replies[0]).feed(line):
+            if reply.future.done():
+                self._replies.popleft()
+            return reply
+        if match := ROUTE_LINE.search(line):
+            self._feedback_routes[int(match[2])] = int(match[1])
+        elif match := POWER_LINE.search(line):
+            self._feedback_power = int(match[1].lower() == "on")
+        elif PRESET_LINE.search(line):
+            # A preset recalled at the matrix; its routes follow as feedback
+            _LOGGER.debug("Matrix reported %s", line)
+        elif self._replies and ERROR_LINE.search(line):
+            # The matrix refused the oldest command
+            self._replies.popleft().fail(
+                OreiHdmiMatrixApiError(f"Matrix answered {line!r}")
+            )
+        else:
+            # Banners, echoes and notices; a command still waiting for its
+            # reply ends with the reply or its timeout
+            _LOGGER.debug("Ignoring line from %s: %s", self.host, line)
+        return None
+
+    def _flush_feedback(self) -> None:
+        """Pass the state changes collected from unsolicited lines on."""
+        if not self._feedback_routes and self._feedback_power is None:
+            return
+        routes, self._feedback_routes = self._feedback_routes, {}
+        power, self._feedback_power = self._feedback_power, None
+        if self.on_feedback is not None:
+            self.on_feedback(routes, power)
+
+    def _drop_connection(self, error: Exception) -> None:
+        """Forget the connection and fail the commands waiting on it."""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        while self._replies:
+            self._replies.popleft().fail(error)
+
+    async def close(self) -> None:
+        """Close the control connection."""
+        read_task, self._read_task = self._read_task, None
+        self._drop_connection(ConnectionError(f"Connection to {self.host} closed"))
+        if read_task is not None and read_task is not asyncio.current_task():
+            read_task.cancel()
+            try:
+                await read_task
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,293 @@
+"""Local stand-in for an OREI HDMI matrix's /cgi-bin/instr endpoint.
+
+The simulator speaks the same JSON-over-POST protocol as the device and can be
+made slow, jittery, flaky or forgetful (session expiry) to exercise the client:
+
+    async with FakeOreiMatrix(latency=0.05, jitter=0.01) as matrix:
+        async with OreiHdmiMatrixApi(matrix.host, "Admin", "admin") as api:
+            await api.get_status()
+
+When the login session has expired the simulator answers any command the way
+the device's web UI does, by sending the client back to the login command:
+``{"comhead": "login", "result": 0}``.
+
+The same state is also served over the line-based ASCII protocol of the
+control port, on ``control_port``:
+
+    transport = TcpTransport("127.0.0.1", matrix.control_port)
+    async with OreiHdmiMatrixApi("127.0.0.1", "", "", transport=transport) as api:
+        await api.get_status()
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Any
+
+from aiohttp import web
+
+from custom_components.orei_hdmi_matrix.const import (
+    API_ENDPOINT,
+    CMD_GET_STATUS,
+    CMD_LOGIN,
+    CMD_PRESET_RECALL,
+    CMD_PRESET_SAVE,
+    CMD_SET_POWER,
+    CMD_VIDEO_SWITCH,
+)
+
+
+class FakeOreiMatrix:
+    """Asyncio HTTP server simulating an OREI HDMI matrix."""
+
+    def __init__(
+        self,
+        num_inputs: int = 8,
+        num_outputs: int = 8,
+        username: str = "Admin",
+        password: str = "admin",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        session_ttl: float | None = None,
+        max_concurrency: int = 1,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the simulator.
+
+        latency and jitter are in seconds, error_rate is the fraction of
+        requests answered with HTTP 500, session_ttl is how long a login stays
+        valid (None for forever) and max_concurrency is how many requests the
+        device processes at once; the rest wait, like the device's single CGI
+        handler.
+        """
+        self.num_inputs = num_inputs
+        self.num_outputs = num_outputs
+        self.username = username
+        self.password = password
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.session_ttl = session_ttl
+        self.power = 1
+        self.routes = [1] * num_outputs
+        self.input_names = [f"Input{i}" for i in range(1, num_inputs + 1)]
+        self.output_names = [f"Output{i}" for i in range(1, num_outputs + 1)]
+        self.preset_names = [f"Preset{i}" for i in range(1, 9)]
+        self.presets: dict[int, list[int]] = {}
+        self.requests: list[dict[str, Any]] = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._logged_in_at: float | None = None
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._random = random.Random(seed)
+        self._runner: web.AppRunner | None = None
+        self.port: int | None = None
+        self.control_commands: list[str] = []
+        self.control_connections = 0
+        self.control_port: int | None = None
+        self._control_server: asyncio.AbstractServer | None = None
+        self._control_writers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def host(self) -> str:
+        """Return the host:port to pass to the API client."""
+        return f"127.0.0.1:{self.port}"
+
+    def expire_session(self) -> None:
+        """Forget the current login, as after a device reboot."""
+        self._logged_in_at = None
+
+    def front_panel_switch(self, output: int, input_: int) -> None:
+        """Switch an output at the device, reporting it on the control port."""
+        self.routes[output - 1] = input_
+        self._broadcast(f"input {input_} -> output {output}")
+
+    def front_panel_power(self, power: int) -> None:
+        """Turn the device on or off, reporting it on the control port."""
+        self.power = power
+        self._broadcast(f"power {'on' if power else 'off'}")
+
+    def send_notice(self, line: str) -> None:
+        """Send a line the device prints unprompted, such as a banner."""
+        self._broadcast(line)
+
+    def _broadcast(self, line: str) -> None:
+        """Send an unsolicited line to every control port connection."""
+        for writer in self._control_writers:
+            writer.write(f"{line}\r\n".encode("ascii"))
+
+    def drop_control_connections(self) -> None:
+        """Close every control port connection, as after a device reboot."""
+        for writer in list(self._control_writers):
+            writer.close()
+
+    def count(self, command: str) -> int:
+        """Return how many requests with the given command were received."""
+        return sum(1 for request in self.requests if request.get("comhead") == command)
+
+    async def start(self) -> None:
+        """Start listening on a free local port."""
+        app = web.Application()
+        app.router.add_post(API_ENDPOINT, self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", 0).start()
+        self.port = self._runner.addresses[0][1]
+        self._control_server = await asyncio.start_server(
+            self._handle_control, "127.0.0.1", 0
+        )
+        self.control_port = self._control_server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+        if self._control_server:
+            self._control_server.close()
+            self.drop_control_connections()
+            await self._control_server.wait_closed()
+            self._control_server = None
+
+    async def __aenter__(self) -> FakeOreiMatrix:
+        """Start the server."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Stop the server."""
+        await self.stop()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Handle a command posted to the instr endpoint."""
+        async with self._slots:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            try:
+                delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if self._random.random() < self.error_rate:
+                    return web.Response(status=500, text="Internal Server Error")
+                data = json.loads(await request.read())
+                self.requests.append(data)
+                return web.json_response(self._execute(data))
+            finally:
+                self._in_flight -= 1
+
+    def _session_valid(self) -> bool:
+        """Return True if a login is active."""
+        if self._logged_in_at is None:
+            return False
+        if self.session_ttl is None:
+            return True
+        return time.monotonic() - self._logged_in_at < self.session_ttl
+
+    def _execute(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Run a command against the simulated matrix state."""
+        command = data.get("comhead")
+        if command == CMD_LOGIN:
+            if data.get("user") == self.username and data.get("password") == self.password:
+                self._logged_in_at = time.monotonic()
+                return {"comhead": CMD_LOGIN, "result": 1}
+            return {"comhead": CMD_LOGIN, "result": 0}
+
+        if not self._session_valid():
+            return {"comhead": CMD_LOGIN, "result": 0}
+
+        if command == CMD_GET_STATUS:
+            return {
+                "comhead": CMD_GET_STATUS,
+                "power": self.power,
+                # The device pads the route list with a trailing 0
+                "allsource": [*self.routes, 0],
+                "allinputname": self.input_names,
+                "alloutputname": self.output_names,
+                "allname": self.preset_names,
+            }
+
+        if command == CMD_VIDEO_SWITCH:
+            output, input_ = data.get("source", [0, 0])
+            if 1 <= output <= self.num_outputs and 1 <= input_ <= self.num_inputs:
+                self.routes[output - 1] = input_
+                return {"comhead": CMD_VIDEO_SWITCH, "result": 1}
+            return {"comhead": CMD_VIDEO_SWITCH, "result": 0}
+
+        if command == CMD_SET_POWER:
+            if data.get("power") not in (0, 1):
+                return {"comhead": CMD_SET_POWER, "result": 0}
+            self.power = data["power"]
+            return {"comhead": CMD_SET_POWER, "result": 1}
+
+        if command in (CMD_PRESET_SAVE, CMD_PRESET_RECALL):
+            preset = data.get("index", 0)
+            if not 1 <= preset <= len(self.preset_names):
+                return {"comhead": command, "result": 0}
+            if command == CMD_PRESET_SAVE:
+                self.presets[preset] = list(self.routes)
+            elif preset in self.presets:
+                self.routes = list(self.presets[preset])
+            return {"comhead": command, "result": 1}
+
+        return {"comhead": command, "result": 0}
+
+    async def _handle_control(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve one control port connection, a command at a time like the device."""
+        self.control_connections += 1
+        self._control_writers.add(writer)
+        try:
+            while True:
+                try:
+                    raw = await reader.readuntil(b"!")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                command = raw.decode("ascii").strip()
+                self.control_commands.append(command)
+                delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                writer.write(
+                    "".join(f"{line}\r\n" for line in self._execute_control(command))
+                    .encode("ascii")
+                )
+                await writer.drain()
+        finally:
+            self._control_writers.discard(writer)
+            writer.close()
+
+    def _execute_control(self, command: str) -> list[str]:
+        """Run an ASCII command and return the reply lines."""
+        if match := re.fullmatch(r"s in (\d+) av out (\d+)!", command):
+            input_, output = int(match[1]), int(match[2])
+            if 1 <= output <= self.num_outputs and 1 <= input_ <= self.num_inputs:
+                self.routes[output - 1] = input_
+                return [f"input {input_} -> output {output}"]
+        elif command == "r av out 0!":
+            return [
+                f"input {input_} -> output {output}"
+                for output, input_ in enumerate(self.routes, start=1)
+            ]
+        elif command == "r power!":
+            return [f"power {'on' if self.power else 'off'}"]
+        elif match := re.fullmatch(r"s power ([01])!", command):
+            self.power = int(match[1])
+            return [f"power {'on' if self.power else 'off'}"]
+        elif match := re.fullmatch(r"s (save|recall) preset (\d+)!", command):
+            action, preset = match[1], int(match[2])
+            if 1 <= preset <= len(self.preset_names):
+                if action == "save":
+                    self.presets[preset] = list(self.routes)
+                    return [f"save preset {preset}"]
+                self.routes = list(self.presets.get(preset, self.routes))
+                # The new routes follow the confirmation
+                return [f"recall preset {preset}"] + [
+                    f"input {input_} -> output {output}"
+                    for output, input_ in enumerate(self.routes, start=1)
+                ]
+        return ["command error"]
@@ -1,8 +1,24 @@
 """Tests for the OREI HDMI Matrix API client."""
+import asyncio
+import json
+import time
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from custom_components.orei_hdmi_matrix.api import OreiHdmiMatrixApi, OreiHdmiMatrixApiError
+from custom_components.orei_hdmi_matrix.api import (
+    CommandPriority,
+    OreiHdmiMatrixApi,
+    OreiHdmiMatrixApiError,
+    OreiHdmiMatrixAuthError,
+    OreiHdmiMatrixCommandSkippedError,
+    OreiHdmiMatrixConnectionStats,
+    OreiHdmiMatrixTimeoutError,
+    OreiHdmiMatrixUnavailableError,
+)
+from custom_components.orei_hdmi_matrix.breaker import CircuitState
+
+from .fake_matrix import FakeOreiMatrix
 
 
 @pytest.fixture
@@ -16,7 +32,7 @@ async def test_authenticate_success(api):
     """Test successful authentication."""
     mock_response = MagicMock()
     mock_response.status = 200
-    mock_response.json = AsyncMock(return_value={"comhead": "login", "result": 1})
+    mock_response.read = AsyncMock(return_value=b'{"comhead": "login", "result": 1}')
     
     with patch("aiohttp.ClientSession.post") as mock_post:
         mock_post.return_value.__aenter__.return_value = mock_response
@@ -33,7 +49,7 @@ async def test_authenticate_failure(api):
     """Test failed authentication."""
     mock_response = MagicMock()
     mock_response.status = 200
-    mock_response.json = AsyncMock(return_value={"comhead": "login", "result": 0})
+    mock_response.read = AsyncMock(return_value=b'{"comhead": "login", "result": 0}')
     
     with patch("aiohttp.ClientSession.post") as mock_post:
         mock_post.return_value.__aenter__.return_value = mock_response
@@ -50,14 +66,14 @@ async def test_get_status(api):
     """Test getting device status."""
     mock_response = MagicMock()
     mock_response.status = 200
-    mock_response.json = AsyncMock(return_value={
+    mock_response.read = AsyncMock(return_value=json.dumps({
         "comhead": "get video status",
         "power": 1,
         "allsource": [7, 6, 2, 4, 2, 2, 2, 2, 0],
         "allinputname": ["Input1", "Input2", "Input3", "Input4", "Input5", "Input6", "Input7", "Input8"],
         "alloutputname": ["Output1", "Output2", "Output3", "Output4", "Output5", "Output6", "Output7", "Output8"],
         "allname": ["Preset1", "Preset2", "Preset3", "Preset4", "Preset5", "Preset6", "Preset7", "Preset8"]
-    })
+    }).encode())
     
     with patch("aiohttp.ClientSession.post") as mock_post:
         mock_post.return_value.__aenter__.return_value = mock_response
@@ -66,10 +82,10 @@ async def test_get_status(api):
             api._authenticated = True  # Skip authentication
             result = await api.get_status()
             
-        assert result["power"] == 1
-        assert result["source_mapping"] == [7, 6, 2, 4, 2, 2, 2, 2]
-        assert len(result["input_names"]) == 8
-        assert len(result["output_names"]) == 8
+        assert result.power == 1
+        assert result.routes == [7, 6, 2, 4, 2, 2, 2, 2]
+        assert len(result.input_names) == 8
+        assert len(result.output_names) == 8
 
 
 @pytest.mark.asyncio
@@ -77,7 +93,7 @@ async def test_set_output_input(api):
     """Test setting output to input."""
     mock_response = MagicMock()
     mock_response.status = 200
-    mock_response.json = AsyncMock(return_value={"comhead": "video switch", "result": 1})
+    mock_response.read = AsyncMock(return_value=b'{"comhead": "video switch", "result": 1}')
     
     with patch("aiohttp.ClientSession.post") as mock_post:
         mock_post.return_value.__aenter__.return_value = mock_response
@@ -109,3 +125,289 @@ async def test_set_output_input_invalid_input(api):
             
         with pytest.raises(ValueError, match="Input must be between 1 and 8"):
             await api.set_output_input(1, 9)
+
+
+@pytest.mark.asyncio
+async def test_shared_session_is_not_closed():
+    """Test that a session passed in by the caller is left open on exit."""
+    session = MagicMock()
+    session.close = AsyncMock()
+
+    async with OreiHdmiMatrixApi("192.168.1.100", "Admin", "admin", session=session):
+        pass
+
+    session.close.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_owned_session_uses_pooled_connector(api):
+    """Test that the client's own session is capped and keeps connections alive."""
+    async with api:
+        connector = api._session.connector
+        assert connector.limit == 2
+        assert connector.limit_per_host == 2
+        assert not connector.force_close
+
+    assert api._session is None
+
+
+def test_connection_stats():
+    """Test connection reuse and latency bookkeeping."""
+    stats = OreiHdmiMatrixConnectionStats()
+    assert stats.reuse_rate is None
+    assert stats.average_latency is None
+
+    stats.connections_created = 1
+    stats.connections_reused = 3
+    stats.record_latency(0.2)
+    stats.record_latency(0.4)
+
+    assert stats.reuse_rate == 0.75
+    assert stats.average_latency == pytest.approx(0.3)
+    assert stats.as_dict()["last_latency"] == 0.4
+
+
+@pytest.mark.asyncio
+async def test_set_routes(api):
+    """Test that bulk routing switches every output and reports each result."""
+    api._authenticated = True
+    with patch.object(
+        api, "set_output_input", AsyncMock(side_effect=[True, OreiHdmiMatrixApiError("boom")])
+    ) as mock_switch:
+        result = await api.set_routes({1: 3, 2: 4})
+
+    assert result == {1: True, 2: False}
+    assert mock_switch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_set_routes_validates_before_switching(api):
+    """Test that one invalid route rejects the whole batch."""
+    with patch.object(api, "set_output_input", AsyncMock()) as mock_switch:
+        with pytest.raises(ValueError, match="Input must be between 1 and 8"):
+            await api.set_routes({1: 3, 2: 9})
+
+    mock_switch.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_status_and_switch_against_fake_matrix():
+    """Test a full login, switch and poll cycle against the simulator."""
+    async with FakeOreiMatrix() as matrix:
+        async with OreiHdmiMatrixApi(matrix.host, "Admin", "admin") as api:
+            assert await api.set_output_input(2, 5) is True
+            status = await api.get_status()
+
+    assert status.routes == [1, 5, 1, 1, 1, 1, 1, 1]
+    assert status.power == 1
+    assert matrix.count("login") == 1
+    assert api.stats.requests == 3
+    assert api.stats.connections_reused == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [4, 16])
+async def test_matrix_sizes_against_fake_matrix(size):
+    """Test routing and validation on matrices other than 8x8."""
+    async with FakeOreiMatrix(num_inputs=size, num_outputs=size) as matrix:
+        async with OreiHdmiMatrixApi(
+            matrix.host, "Admin", "admin", num_inputs=size, num_outputs=size
+        ) as api:
+            assert await api.set_output_input(size, size) is True
+            status = await api.get_status()
+            with pytest.raises(ValueError, match=f"Output must be between 1 and {size}"):
+                await api.set_output_input(size + 1, 1)
+
+    assert len(status.routes) == size
+    assert status.routes.input_for(size) == size
+    assert len(status.input_names) == size
+
+
+@pytest.mark.asyncio
+async def test_save_and_recall_preset_against_fake_matrix():
+    """Test that recalling a preset takes one command for all outputs."""
+    async with FakeOreiMatrix() as matrix:
+        async with OreiHdmiMatrixApi(matrix.host, "Admin", "admin") as api:
+            await api.set_routes({output: output for output in range(1, 9)})
+            assert await api.save_preset(2) is True
+            await api.set_routes({output: 1 for output in range(1, 9)})
+            switches = matrix.count("video switch")
+
+            assert await api.recall_preset(2) is True
+            with pytest.raises(ValueError, match="Preset must be between 1 and 8"):
+                await api.recall_preset(9)
+
+    assert matrix.routes == list(range(1, 9))
+    assert matrix.count("video switch") == switches
+    assert matrix.count("preset call") == 1
+
+
+@pytest.mark.asyncio
+async def test_set_routes_bounded_concurrency():
+    """Test that bulk routing sends one command at a time over HTTP."""
+    async with FakeOreiMatrix(latency=0.01, max_concurrency=8) as matrix:
+        async with OreiHdmiMatrixApi(matrix.host, "Admin", "admin") as api:
+            result = await api.set_routes({output: 3 for output in range(1, 9)})
+
+    assert all(result.values())
+    assert matrix.routes == [3] * 8
+    assert matrix.max_in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_reauthenticates_when_session_expires():
+    """Test that an expired session is renewed inline and the command replayed."""
+    async with FakeOreiMatrix() as matrix:
+        async with OreiHdmiMatrixApi(matrix.host, "Admin", "admin") as api:
+            await api.get_status()
+            matrix.expire_session()
+            status = await api.get_status()
+
+    assert status.routes == [1] * 8
+    assert matrix.count("login") == 2
+    assert api.stats.reauths == 1
+    assert api.stats.last_reauth_latency is not None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_login():
+    """Test that callers hitting an expired session do not stampede the login."""
+    async with FakeOreiMatrix(max_concurrency=8) as matrix:
+        async with OreiHdmiMatrixApi(matrix.host, "Admin", "admin") as api:
+            await api.get_status()
+            matrix.expire_session()
+            await asyncio.gather(*(api.get_status() for _ in range(4)))
+
+    assert matrix.count("login") == 2
+    assert api.stats.reauths == 1
+
+
+@pytest.mark.asyncio
+async def test_bad_credentials_send_no_command():
+    """Test that a refused login fails the command without sending it."""
+    async with FakeOreiMatrix(password="changed") as matrix:
+        async with OreiHdmiMatrixApi(matrix.host, "Admin", "admin") as api:
+            with pytest.raises(OreiHdmiMatrixAuthError, match="Login"):
+                await api.get_status()
+
+    assert [request["comhead"] for request in matrix.requests] == ["login"]
+
+
+@pytest.mark.asyncio
+async def test_expired_session_with_bad_credentials():
+    """Test that a failed re-login surfaces as an authentication error."""
+    async with FakeOreiMatrix() as matrix:
+        async with OreiHdmiMatrixApi(matrix.host, "Admin", "admin") as api:
+            await api.get_status()
+            matrix.password = "changed"
+            matrix.expire_session()
+            with pytest.raises(OreiHdmiMatrixAuthError, match="expired"):
+                await api.get_status()
+
+    assert [request["comhead"] for request in matrix.requests] == [
+        "login",
+        "get video status",
+        "get video status",
+        "login",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fails_fast_while_matrix_is_unreachable():
+    """Test that the circuit breaker stops requests to a dead matrix."""
+    matrix = FakeOreiMatrix()
+    await matrix.start()
+    host = matrix.host
+    await matrix.stop()
+
+    async with OreiHdmiMatrixApi(host, "Admin", "admin") as api:
+        api._authenticated = True
+        for _ in range(3):
+            with pytest.raises(OreiHdmiMatrixApiError, match="Request failed"):
+                await api.get_status()
+
+        with patch("aiohttp.ClientSession.post") as mock_post:
+            with pytest.raises(OreiHdmiMatrixUnavailableError):
+                await api.get_status()
+
+    mock_post.assert_not_called()
+    assert api.breaker.state is CircuitState.OPEN
+
+
+@pytest.mark.asyncio
+async def test_switch_skips_queued_background_poll():
+    """Test that a switch goes ahead of a scheduled poll waiting for the device."""
+    async with FakeOreiMatrix(latency=0.05) as matrix:
+        async with OreiHdmiMatrixApi(matrix.host, "Admin", "admin") as api:
+            await api.authenticate()
+            running = asyncio.create_task(
+                api.get_status(priority=CommandPriority.BACKGROUND)
+            )
+            await asyncio.sleep(0.01)
+            queued = asyncio.create_task(
+                api.get_status(priority=CommandPriority.BACKGROUND)
+            )
+            await asyncio.sleep(0)
+
+            assert await api.set_output_input(1, 4) is True
+            assert (await running).routes[0] == 1
+            with pytest.raises(OreiHdmiMatrixCommandSkippedError):
+                await queued
+
+    assert matrix.count("get video status") == 1
+    assert api.commands.skipped == 1
+    assert api.breaker.state is CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_hung_switch_times_out_on_its_own_budget():
+    """Test that a switch to a hung matrix fails after the switch timeout."""
+    async with FakeOreiMatrix() as matrix:
+        async with OreiHdmiMatrixApi(
+            matrix.host, "Admin", "admin", switch_timeout=0.1
+        ) as api:
+            await api.authenticate()
+            matrix.latency = 1
+            started = time.monotonic()
+            with pytest.raises(OreiHdmiMatrixTimeoutError):
+                await api.set_output_input(1, 4)
+            elapsed = time.monotonic() - started
+
+    assert elapsed < 0.5
+    assert api.breaker.as_dict()["consecutive_failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_set_routes_stops_at_the_deadline():
+    """Test that switches still queued at the deadline fail without being sent."""
+    async with FakeOreiMatrix(latency=0.1) as matrix:
+        async with OreiHdmiMatrixApi(matrix.host, "Admin", "admin") as api:
+            await api.authenticate()
+            started = time.monotonic()
+            results = await api.set_routes(
+                {output: 2 for output in range(1, 9)}, deadline=started + 0.25
+            )
+            elapsed = time.monotonic() - started
+
+            with pytest.raises(OreiHdmiMatrixTimeoutError, match="No time left"):
+                await api.get_status(deadline=time.monotonic())
+
+    assert elapsed < 0.4
+    assert list(results.values()) == [True, True] + [False] * 6
+    assert matrix.routes[:2] == [2, 2]
+    assert matrix.routes[3:] == [1] * 5
+    # Running out of the caller's time is not the matrix's fault
+    assert api.breaker.as_dict()["consecutive_failures"] == 0
+
+
+@pytest.mark.asyncio
+async def test_set_power_against_fake_matrix():
+    """Test putting the matrix in standby and waking it up."""
+    async with FakeOreiMatrix() as matrix:
+        async with OreiHdmiMatrixApi(matrix.host, "Admin", "admin") as api:
+            assert await api.set_power(False) is True
+            assert (await api.get_status()).power == 0
+            assert await api.set_power(True) is True
+
+    assert matrix.power == 1
+    assert matrix.count("set poweronoff") == 2
@@ -0,0 +1,71 @@
+"""Tests for the OREI HDMI Matrix circuit breaker."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.orei_hdmi_matrix.breaker import CircuitBreaker, CircuitState
+
+
+@pytest.fixture
+def breaker():
+    """Create a breaker that opens after two failures."""
+    return CircuitBreaker(failure_threshold=2, reset_timeout=30, on_transition=MagicMock())
+
+
+def test_opens_after_consecutive_failures(breaker):
+    """Test that the breaker opens and refuses requests."""
+    breaker.record_failure()
+    assert breaker.state is CircuitState.CLOSED
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+
+    assert breaker.state is CircuitState.OPEN
+    assert not breaker.allow_request()
+    breaker.on_transition.assert_called_once_with(CircuitState.CLOSED, CircuitState.OPEN)
+
+
+def test_half_open_allows_a_single_probe(breaker):
+    """Test that only one probe is let through after the reset timeout."""
+    with patch("custom_components.orei_hdmi_matrix.breaker.time.monotonic", return_value=0):
+        breaker.record_failure()
+        breaker.record_failure()
+
+    with patch("custom_components.orei_hdmi_matrix.breaker.time.monotonic", return_value=31):
+        assert breaker.allow_request()
+        assert breaker.state is CircuitState.HALF_OPEN
+        assert not breaker.allow_request()
+
+        breaker.record_success()
+
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.allow_request()
+    assert breaker.transition_count == 3
+
+
+def test_failed_probe_reopens(breaker):
+    """Test that a failed probe opens the breaker for another period."""
+    with patch("custom_components.orei_hdmi_matrix.breaker.time.monotonic", return_value=0):
+        breaker.record_failure()
+        breaker.record_failure()
+
+    with patch("custom_components.orei_hdmi_matrix.breaker.time.monotonic", return_value=31):
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state is CircuitState.OPEN
+        assert breaker.retry_in == 30
+        assert not breaker.allow_request()
+
+
+def test_released_probe_can_be_retried(breaker):
+    """Test that a probe which ended without an outcome does not block others."""
+    with patch("custom_components.orei_hdmi_matrix.breaker.time.monotonic", return_value=0):
+        breaker.record_failure()
+        breaker.record_failure()
+
+    with patch("custom_components.orei_hdmi_matrix.breaker.time.monotonic", return_value=31):
+        assert breaker.allow_request()
+        breaker.release()
+        assert breaker.allow_request()
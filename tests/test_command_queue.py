@@ -0,0 +1,103 @@
+"""Tests for the OREI HDMI Matrix command queue."""
+import asyncio
+
+import pytest
+
+from custom_components.orei_hdmi_matrix.command_queue import (
+    CommandPriority,
+    CommandQueue,
+)
+from custom_components.orei_hdmi_matrix.exceptions import (
+    OreiHdmiMatrixCommandSkippedError,
+)
+
+
+async def run(queue, priority, name, order, hold=0.0):
+    """Run a command through the queue, recording when it was admitted."""
+    async with queue.slot(priority):
+        order.append(name)
+        await asyncio.sleep(hold)
+
+
+async def test_waiting_commands_are_admitted_by_priority():
+    """Test that the most urgent command goes first, then arrival order."""
+    queue = CommandQueue()
+    order = []
+    first = asyncio.create_task(run(queue, CommandPriority.BACKGROUND, "first", order, 0.01))
+    await asyncio.sleep(0)
+    waiting = [
+        asyncio.create_task(run(queue, priority, name, order))
+        for priority, name in (
+            (CommandPriority.REFRESH, "refresh 1"),
+            (CommandPriority.INTERACTIVE, "switch"),
+            (CommandPriority.REFRESH, "refresh 2"),
+        )
+    ]
+    await asyncio.sleep(0)
+
+    assert queue.as_dict() == {
+        "slots": 1,
+        "in_flight": 1,
+        "waiting": 3,
+        "skipped_background": 0,
+    }
+    await asyncio.gather(first, *waiting)
+
+    assert order == ["first", "switch", "refresh 1", "refresh 2"]
+    assert queue.in_flight == 0
+
+
+async def test_interactive_command_skips_waiting_background_commands():
+    """Test that queued background polls fail instead of delaying a switch."""
+    queue = CommandQueue()
+    order = []
+    running = asyncio.create_task(run(queue, CommandPriority.BACKGROUND, "running", order, 0.01))
+    await asyncio.sleep(0)
+    background = asyncio.create_task(run(queue, CommandPriority.BACKGROUND, "poll", order))
+    refresh = asyncio.create_task(run(queue, CommandPriority.REFRESH, "refresh", order))
+    await asyncio.sleep(0)
+
+    await run(queue, CommandPriority.INTERACTIVE, "switch", order)
+
+    with pytest.raises(OreiHdmiMatrixCommandSkippedError):
+        await background
+    await asyncio.gather(running, refresh)
+    # The command already in flight is not interrupted
+    assert order == ["running", "switch", "refresh"]
+    assert queue.skipped == 1
+
+
+async def test_cancelled_waiter_gives_up_its_place():
+    """Test that a cancelled command neither runs nor leaks a slot."""
+    queue = CommandQueue()
+    order = []
+    running = asyncio.create_task(run(queue, CommandPriority.REFRESH, "running", order, 0.01))
+    await asyncio.sleep(0)
+    cancelled = asyncio.create_task(run(queue, CommandPriority.INTERACTIVE, "cancelled", order))
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    await run(queue, CommandPriority.REFRESH, "next", order)
+    await running
+
+    assert cancelled.cancelled()
+    assert order == ["running", "next"]
+    assert queue.in_flight == 0
+    assert queue.depth == 0
+
+
+async def test_wait_for_a_slot_times_out():
+    """Test that a command gives up its place once its timeout passes."""
+    queue = CommandQueue()
+    order = []
+    running = asyncio.create_task(run(queue, CommandPriority.REFRESH, "running", order, 0.05))
+    await asyncio.sleep(0)
+
+    with pytest.raises(TimeoutError):
+        async with queue.slot(CommandPriority.INTERACTIVE, timeout=0.01):
+            order.append("late")
+    await running
+
+    assert order == ["running"]
+    assert queue.depth == 0
+    assert queue.in_flight == 0
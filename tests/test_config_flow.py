@@ -1,97 +1,112 @@
 """Tests for the OREI HDMI Matrix config flow."""
-import pytest
 from unittest.mock import AsyncMock, patch
 
-from homeassistant import config_entries
-from homeassistant.components.orei_hdmi_matrix.config_flow import CannotConnect, InvalidAuth
+import pytest
+from homeassistant import config_entries, loader
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResultType
 
 from custom_components.orei_hdmi_matrix.const import DOMAIN
 
+from .fake_matrix import FakeOreiMatrix
+
 
 @pytest.fixture
-def mock_api():
-    """Mock the API client."""
-    with patch("custom_components.orei_hdmi_matrix.config_flow.OreiHdmiMatrixApi") as mock:
-        api_instance = AsyncMock()
-        mock.return_value.__aenter__.return_value = api_instance
-        yield api_instance
-
-
-async def test_form(hass: HomeAssistant, mock_api) -> None:
-    """Test we get the form."""
-    mock_api.authenticate.return_value = True
-    mock_api.get_status.return_value = {
-        "power": 1,
-        "source_mapping": [1, 2, 3, 4, 5, 6, 7, 8],
-        "input_names": ["Input1", "Input2", "Input3", "Input4", "Input5", "Input6", "Input7", "Input8"],
-        "output_names": ["Output1", "Output2", "Output3", "Output4", "Output5", "Output6", "Output7", "Output8"],
-        "preset_names": ["Preset1", "Preset2", "Preset3", "Preset4", "Preset5", "Preset6", "Preset7", "Preset8"]
-    }
+async def hass(tmp_path):
+    """Run a Home Assistant instance that loads the integration from custom_components."""
+    hass = HomeAssistant(str(tmp_path))
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    # Only the flow is under test; creating the entry does not set it up
+    with patch(
+        "custom_components.orei_hdmi_matrix.async_setup_entry",
+        AsyncMock(return_value=True),
+    ):
+        yield hass
+    await hass.async_stop(force=True)
+
+
+@pytest.fixture
+async def matrix():
+    """Run a fake 4x2 matrix."""
+    async with FakeOreiMatrix(num_inputs=4, num_outputs=2) as matrix:
+        yield matrix
+
 
+async def configure(hass: HomeAssistant, user_input: dict) -> dict:
+    """Start the user flow and submit the form."""
     result = await hass.config_entries.flow.async_init(
         DOMAIN, context={"source": config_entries.SOURCE_USER}
     )
     assert result["type"] == FlowResultType.FORM
-    assert result["errors"] == {}
-
-    result2 = await hass.config_entries.flow.async_configure(
-        result["flow_id"],
-        {
-            "host": "192.168.1.100",
-            "username": "Admin",
-            "password": "admin",
-        },
+    assert result["errors"] is None
+    return await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"username": "Admin", "password": "admin", **user_input}
     )
-    await hass.async_block_till_done()
 
-    assert result2["type"] == FlowResultType.CREATE_ENTRY
-    assert result2["title"] == "OREI HDMI Matrix (192.168.1.100)"
-    assert result2["data"] == {
-        "host": "192.168.1.100",
-        "username": "Admin",
-        "password": "admin",
-    }
 
+async def test_http_detects_size(hass: HomeAssistant, matrix) -> None:
+    """Test that the size is detected from the web interface."""
+    result = await configure(hass, {"host": f"http://{matrix.host}/"})
 
-async def test_form_cannot_connect(hass: HomeAssistant, mock_api) -> None:
-    """Test we handle cannot connect error."""
-    mock_api.authenticate.return_value = False
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["title"] == f"OREI HDMI Matrix ({matrix.host})"
+    data = result["data"]
+    assert data["host"] == matrix.host
+    assert (data["num_inputs"], data["num_outputs"]) == (4, 2)
+    assert list(data["inputs"]) == ["1", "2", "3", "4"]
+    assert list(data["outputs"]) == ["1", "2"]
+    assert data["outputs"]["1"]["available_inputs"] == [1, 2, 3, 4]
 
-    result = await hass.config_entries.flow.async_init(
-        DOMAIN, context={"source": config_entries.SOURCE_USER}
-    )
 
-    result2 = await hass.config_entries.flow.async_configure(
-        result["flow_id"],
+async def test_configured_size_wins_over_detection(hass: HomeAssistant, matrix) -> None:
+    """Test that a size entered in the form is kept over the detected one."""
+    result = await configure(hass, {"host": matrix.host, "num_inputs": 2})
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert (result["data"]["num_inputs"], result["data"]["num_outputs"]) == (2, 2)
+
+
+async def test_tcp_requires_size(hass: HomeAssistant, matrix) -> None:
+    """Test that the control port cannot be set up without a size."""
+    result = await configure(
+        hass,
         {
-            "host": "192.168.1.100",
-            "username": "Admin",
-            "password": "admin",
+            "host": "127.0.0.1",
+            "transport": "tcp",
+            "port": matrix.control_port,
+            "num_inputs": 4,
         },
     )
 
-    assert result2["type"] == FlowResultType.FORM
-    assert result2["errors"] == {"base": "cannot_connect"}
-
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {"base": "size_required"}
 
-async def test_form_invalid_auth(hass: HomeAssistant, mock_api) -> None:
-    """Test we handle invalid auth error."""
-    mock_api.authenticate.side_effect = InvalidAuth
 
-    result = await hass.config_entries.flow.async_init(
-        DOMAIN, context={"source": config_entries.SOURCE_USER}
-    )
-
-    result2 = await hass.config_entries.flow.async_configure(
-        result["flow_id"],
+async def test_tcp_with_size(hass: HomeAssistant, matrix) -> None:
+    """Test setting up over the control port with a configured size."""
+    result = await configure(
+        hass,
         {
-            "host": "192.168.1.100",
-            "username": "Admin",
-            "password": "wrong_password",
+            "host": "127.0.0.1",
+            "transport": "tcp",
+            "port": matrix.control_port,
+            "num_inputs": 4,
+            "num_outputs": 2,
         },
     )
 
-    assert result2["type"] == FlowResultType.FORM
-    assert result2["errors"] == {"base": "invalid_auth"}
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    data = result["data"]
+    assert (data["transport"], data["port"]) == ("tcp", matrix.control_port)
+    assert (data["num_inputs"], data["num_outputs"]) == (4, 2)
+
+
+async def test_form_cannot_connect(hass: HomeAssistant, matrix) -> None:
+    """Test that a failed login is reported on the form."""
+    result = await configure(hass, {"host": matrix.host, "password": "wrong"})
+
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {"base": "cannot_connect"}
+    assert matrix.count("get video status") == 0
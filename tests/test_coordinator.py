@@ -0,0 +1,512 @@
+"""Tests for the OREI HDMI Matrix coordinator."""
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.orei_hdmi_matrix import async_unload_entry
+from custom_components.orei_hdmi_matrix.api import (
+    CommandPriority,
+    OreiHdmiMatrixCommandSkippedError,
+)
+from custom_components.orei_hdmi_matrix.config_flow import create_default_config
+from custom_components.orei_hdmi_matrix.const import (
+    CMD_VIDEO_SWITCH,
+    CONF_SWITCH_DEBOUNCE,
+    CONTEXT_POWER,
+    DEFAULT_NAMES_TTL,
+    DEFAULT_PUSH_POLL_INTERVAL,
+    DEFAULT_STANDBY_POLL_INTERVAL,
+    DEFAULT_UPDATE_INTERVAL,
+    DOMAIN,
+    EVENT_ROUTE_ROLLBACK,
+)
+from custom_components.orei_hdmi_matrix.coordinator import OreiHdmiMatrixCoordinator
+
+from .fake_matrix import FakeOreiMatrix
+
+
+@pytest.fixture
+async def matrix():
+    """Run a fake matrix."""
+    async with FakeOreiMatrix() as matrix:
+        yield matrix
+
+
+async def start_coordinator(tmp_path, data, refresh=True):
+    """Create and refresh a coordinator with one recording listener per output."""
+    hass = HomeAssistant(str(tmp_path))
+    entry = MagicMock()
+    entry.entry_id = "test_entry"
+    entry.data = {
+        "username": "Admin",
+        "password": "admin",
+        **create_default_config(),
+        **data,
+    }
+    coordinator = OreiHdmiMatrixCoordinator(hass, entry)
+    coordinator.updated_outputs = []
+    for output in range(1, 9):
+        coordinator.async_add_listener(
+            lambda output=output: coordinator.updated_outputs.append(output), output
+        )
+    if refresh:
+        await coordinator.async_refresh()
+    coordinator.updated_outputs.clear()
+    return coordinator
+
+
+async def stop_coordinator(coordinator):
+    """Shut a coordinator and its Home Assistant instance down."""
+    await coordinator.async_shutdown()
+    await coordinator.hass.async_stop(force=True)
+
+
+@pytest.fixture
+async def coordinator(tmp_path, matrix):
+    """Create a coordinator polling the fake matrix, with one listener per output."""
+    coordinator = await start_coordinator(tmp_path, {"host": matrix.host})
+    yield coordinator
+    await stop_coordinator(coordinator)
+
+
+@pytest.fixture
+async def tcp_coordinator(tmp_path, matrix):
+    """Create a coordinator using the fake matrix's control port."""
+    coordinator = await start_coordinator(
+        tmp_path,
+        {"host": "127.0.0.1", "transport": "tcp", "port": matrix.control_port},
+    )
+    yield coordinator
+    await stop_coordinator(coordinator)
+
+
+async def wait_for(condition, timeout=1.0):
+    """Wait until a condition holds."""
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+def capture_events(hass, event_type):
+    """Collect the data of fired events."""
+    events = []
+    hass.bus.async_listen(event_type, lambda event: events.append(event.data))
+    return events
+
+
+async def test_switch_is_shown_before_refresh(coordinator, matrix):
+    """Test that an accepted switch updates the data before the next poll."""
+    matrix.latency = 0.05
+    coordinator.async_request_refresh = AsyncMock()
+
+    assert await coordinator.async_set_routes({2: 5}) is True
+
+    assert coordinator.data.routes[1] == 5
+    assert coordinator.updated_outputs == [2]
+
+
+async def test_optimistic_route_confirmed_by_poll(coordinator, matrix):
+    """Test that a poll matching the optimistic route fires no rollback."""
+    events = capture_events(coordinator.hass, EVENT_ROUTE_ROLLBACK)
+
+    await coordinator.async_set_routes({2: 5})
+    await coordinator.async_refresh()
+    await coordinator.hass.async_block_till_done()
+
+    assert coordinator.data.routes[1] == 5
+    assert events == []
+
+
+async def test_optimistic_route_rolled_back_on_mismatch(coordinator, matrix):
+    """Test that a poll contradicting the optimistic route wins and fires an event."""
+    events = capture_events(coordinator.hass, EVENT_ROUTE_ROLLBACK)
+    coordinator.async_request_refresh = AsyncMock()
+
+    await coordinator.async_set_routes({2: 5})
+    # Someone switches the output back on the front panel
+    matrix.routes[1] = 3
+    await coordinator.async_refresh()
+    await coordinator.hass.async_block_till_done()
+
+    assert coordinator.data.routes[1] == 3
+    assert events == [
+        {
+            "entry_id": "test_entry",
+            "output": 2,
+            "requested_input": 5,
+            "actual_input": 3,
+            "reason": "mismatch",
+        }
+    ]
+
+
+async def test_acknowledged_route_kept_on_failed_poll(coordinator, matrix):
+    """Test that a failed poll leaves acknowledged switches to the next poll."""
+    events = capture_events(coordinator.hass, EVENT_ROUTE_ROLLBACK)
+    coordinator.async_request_refresh = AsyncMock()
+
+    await coordinator.async_set_routes({2: 5})
+    matrix.error_rate = 1.0
+    await coordinator.async_refresh()
+    await coordinator.hass.async_block_till_done()
+
+    assert not coordinator.last_update_success
+    assert coordinator.data.routes[1] == 5
+
+    # The next successful poll still rolls back a switch that did not stick
+    matrix.error_rate = 0.0
+    matrix.routes[1] = 3
+    await coordinator.async_refresh()
+    await coordinator.hass.async_block_till_done()
+
+    assert coordinator.data.routes[1] == 3
+    assert [event["reason"] for event in events] == ["mismatch"]
+
+
+def switches(matrix):
+    """Return the (output, input) of every switch the matrix received."""
+    return [
+        tuple(request["source"])
+        for request in matrix.requests
+        if request.get("comhead") == CMD_VIDEO_SWITCH
+    ]
+
+
+async def test_rapid_changes_send_only_the_last_input(coordinator, matrix):
+    """Test that changes to one output within the debounce window coalesce."""
+    coordinator.entry.data[CONF_SWITCH_DEBOUNCE] = 0.02
+
+    results = await asyncio.gather(
+        *(coordinator.async_queue_output_input(3, input_) for input_ in (2, 5, 7))
+    )
+
+    assert results == [True, True, True]
+    assert switches(matrix) == [(3, 7)]
+    assert matrix.routes[2] == 7
+
+
+async def test_changes_to_different_outputs_share_a_flush(coordinator, matrix):
+    """Test that queued changes to several outputs are sent as one batch."""
+    coordinator.entry.data[CONF_SWITCH_DEBOUNCE] = 0.02
+    coordinator.async_set_routes = AsyncMock(return_value=True)
+
+    assert await asyncio.gather(
+        coordinator.async_queue_output_input(1, 4),
+        coordinator.async_queue_output_input(2, 6),
+    ) == [True, True]
+
+    coordinator.async_set_routes.assert_awaited_once_with({1: 4, 2: 6})
+
+
+async def test_queued_changes_end_on_shutdown(coordinator, matrix):
+    """Test that callers still waiting for a flush are released on shutdown."""
+    waiting = asyncio.create_task(coordinator.async_queue_output_input(1, 4))
+    await asyncio.sleep(0)
+
+    await coordinator.async_shutdown()
+
+    assert await waiting is False
+    assert switches(matrix) == []
+    assert coordinator.write_queue_stats["queue_depth"] == 0
+
+
+async def test_write_queue_stats(coordinator, matrix):
+    """Test the write queue's depth, coalescing and apply latency counters."""
+    debounce = coordinator.entry.data[CONF_SWITCH_DEBOUNCE] = 0.02
+    assert coordinator.write_queue_stats == {
+        "queue_depth": 0,
+        "coalesced_commands": 0,
+        "applied_commands": 0,
+        "average_apply_latency": None,
+        "last_apply_latency": None,
+    }
+
+    waiting = [
+        asyncio.create_task(coordinator.async_queue_output_input(output, input_))
+        for output, input_ in ((1, 2), (1, 3), (2, 4), (1, 5))
+    ]
+    await asyncio.sleep(0)
+    assert coordinator.write_queue_stats["queue_depth"] == 2
+    await asyncio.gather(*waiting)
+
+    stats = coordinator.write_queue_stats
+    assert stats["queue_depth"] == 0
+    assert stats["coalesced_commands"] == 2
+    assert stats["applied_commands"] == 2
+    assert stats["last_apply_latency"] >= debounce
+    assert stats["average_apply_latency"] >= debounce
+
+
+async def test_apply_latency_counts_from_the_first_change(coordinator, matrix):
+    """Test that a coalesced change's latency includes the wait of the first one."""
+    debounce = coordinator.entry.data[CONF_SWITCH_DEBOUNCE] = 0.02
+    first = asyncio.create_task(coordinator.async_queue_output_input(1, 2))
+    await asyncio.sleep(debounce / 2)
+    await coordinator.async_queue_output_input(1, 3)
+    await first
+
+    assert coordinator.write_queue_stats["last_apply_latency"] >= debounce * 1.5
+    assert matrix.routes[0] == 3
+
+
+async def test_feedback_updates_without_poll(tcp_coordinator, matrix):
+    """Test that changes reported by the matrix are applied right away."""
+    await wait_for(lambda: tcp_coordinator.polling_stats["push_connected"])
+    polls = matrix.control_commands.count("r av out 0!")
+
+    matrix.front_panel_switch(3, 6)
+    await wait_for(lambda: tcp_coordinator.updated_outputs)
+
+    assert tcp_coordinator.data.routes.input_for(3) == 6
+    assert tcp_coordinator.updated_outputs == [3]
+    assert matrix.control_commands.count("r av out 0!") == polls
+
+    matrix.front_panel_power(0)
+    await wait_for(lambda: tcp_coordinator.data.power == 0)
+
+
+async def test_unload_closes_the_control_connection(tcp_coordinator, matrix):
+    """Test that unloading an entry stops the feedback listener and transport."""
+    hass = tcp_coordinator.hass
+    await wait_for(lambda: tcp_coordinator.polling_stats["push_connected"])
+    push_task = tcp_coordinator._push_task
+    transport = tcp_coordinator.api.transport
+    hass.data[DOMAIN] = {tcp_coordinator.entry.entry_id: tcp_coordinator}
+    hass.config_entries = MagicMock()
+    hass.config_entries.async_unload_platforms = AsyncMock(return_value=True)
+
+    assert await async_unload_entry(hass, tcp_coordinator.entry) is True
+    await asyncio.sleep(0)
+
+    assert push_task.cancelled()
+    assert not transport.connected
+    assert tcp_coordinator.api is None
+    assert hass.data[DOMAIN] == {}
+
+
+async def test_polling_slows_while_feedback_connected(tcp_coordinator, matrix):
+    """Test that polling drops to a consistency check while pushed to."""
+    await wait_for(lambda: tcp_coordinator.polling_stats["push_connected"])
+
+    assert tcp_coordinator.update_interval.total_seconds() == DEFAULT_PUSH_POLL_INTERVAL
+
+    matrix.drop_control_connections()
+    await wait_for(lambda: not tcp_coordinator.polling_stats["push_connected"])
+
+    assert tcp_coordinator.update_interval.total_seconds() < DEFAULT_PUSH_POLL_INTERVAL
+
+
+async def test_restores_saved_snapshot(tmp_path, matrix):
+    """Test that a new run starts from the status saved by the previous one."""
+    coordinator = await start_coordinator(tmp_path, {"host": matrix.host})
+    matrix.routes[2] = 4
+    await coordinator.async_refresh()
+    # Stopping writes the pending snapshot
+    await stop_coordinator(coordinator)
+    polls = matrix.count("get video status")
+
+    coordinator = await start_coordinator(
+        tmp_path, {"host": matrix.host}, refresh=False
+    )
+    try:
+        assert await coordinator.async_restore_snapshot() is True
+        assert coordinator.data.routes == [1, 1, 4, 1, 1, 1, 1, 1]
+        assert coordinator.data.input_names == tuple(matrix.input_names)
+        assert matrix.count("get video status") == polls
+
+        # The first live poll only updates what changed since
+        matrix.routes[0] = 2
+        await coordinator.async_refresh()
+        assert coordinator.updated_outputs == [1]
+    finally:
+        await stop_coordinator(coordinator)
+
+
+async def test_no_snapshot_on_first_run(tmp_path, matrix):
+    """Test that nothing is restored before a status was ever saved."""
+    coordinator = await start_coordinator(
+        tmp_path, {"host": matrix.host}, refresh=False
+    )
+    try:
+        assert await coordinator.async_restore_snapshot() is False
+        assert coordinator.data is None
+    finally:
+        await stop_coordinator(coordinator)
+
+
+async def test_local_preset_recall_switches_only_differences(coordinator, matrix):
+    """Test that a local preset is applied as one diffed batch."""
+    await coordinator.async_set_routes({1: 2, 2: 3})
+    await coordinator.async_refresh()
+    assert await coordinator.async_save_local_preset("Movie night") is True
+    assert coordinator.preset_options[-1] == "Movie night"
+    assert coordinator.active_local_preset == "Movie night"
+
+    matrix.routes[0] = 5
+    await coordinator.async_refresh()
+    assert coordinator.active_local_preset is None
+    switches = matrix.count("video switch")
+
+    assert await coordinator.async_select_preset("Movie night") is True
+
+    assert matrix.count("video switch") == switches + 1
+    assert matrix.routes[:2] == [2, 3]
+    assert coordinator.active_local_preset == "Movie night"
+
+
+async def test_select_device_preset(coordinator, matrix):
+    """Test that a device preset option recalls its slot."""
+    matrix.presets[3] = [4] * 8
+
+    assert await coordinator.async_select_preset("Preset3") is True
+
+    assert matrix.count("preset call") == 1
+    assert matrix.routes == [4] * 8
+
+
+async def test_metrics_disabled_by_default(coordinator):
+    """Test that nothing is recorded unless metrics are enabled."""
+    assert coordinator.metrics is None
+    assert coordinator.api.metrics is None
+    assert coordinator.api.transport.metrics is None
+
+
+async def test_metrics_record_commands_and_polls(tmp_path, matrix):
+    """Test that enabled metrics count commands, polls and parsing."""
+    coordinator = await start_coordinator(
+        tmp_path, {"host": matrix.host, "collect_metrics": True}
+    )
+    updates = []
+    coordinator.async_add_listener(lambda: updates.append(True), "metrics")
+
+    await coordinator.async_set_output_input(1, 4)
+    await coordinator.async_refresh()
+
+    # The first poll, the one requested by the switch and the manual one
+    stats = coordinator.metrics.as_dict()
+    assert stats["commands"]["get video status"]["requests"] == 3
+    assert stats["commands"]["video switch"]["requests"] == 1
+    assert stats["polls"]["count"] == 3
+    assert stats["refresh_queue"]["requests"] == 1
+    # One sample per status reply, covering decoding and building the status
+    assert stats["parse_time"]["count"] == 3
+    assert stats["parse_time"]["max"] > 0
+    assert updates
+
+    # Turning metrics off stops recording
+    coordinator.entry.data = {**coordinator.entry.data, "collect_metrics": False}
+    coordinator.async_update_config()
+    assert coordinator.api.metrics is None
+    await stop_coordinator(coordinator)
+
+
+async def test_names_are_read_on_the_slow_tier(coordinator, matrix):
+    """Test that fast polls keep the cached names until they expire."""
+    matrix.input_names[0] = "Apple TV"
+    matrix.routes[0] = 6
+
+    await coordinator.async_refresh()
+    assert coordinator.data.routes.input_for(1) == 6
+    assert coordinator.data.input_names[0] == "Input1"
+
+    # Names expire after a long time, or are read on a manual refresh
+    coordinator._names_refreshed -= DEFAULT_NAMES_TTL
+    await coordinator.async_refresh()
+    assert coordinator.data.input_names[0] == "Apple TV"
+
+    matrix.preset_names[0] = "Movie"
+    await coordinator.async_refresh_now()
+    await coordinator.hass.async_block_till_done()
+    assert coordinator.data.preset_names[0] == "Movie"
+    assert coordinator.polling_stats["names_age"] < 1
+
+
+async def test_skipped_scheduled_poll_keeps_data(coordinator):
+    """Test that a scheduled poll skipped for a switch is not a failure."""
+    data = coordinator.data
+    coordinator.api.get_status = AsyncMock(
+        side_effect=OreiHdmiMatrixCommandSkippedError("Skipped")
+    )
+
+    await coordinator._handle_refresh_interval()
+
+    assert coordinator.data is data
+    assert coordinator.last_update_success
+    assert coordinator.api.get_status.call_args.kwargs["priority"] is (
+        CommandPriority.BACKGROUND
+    )
+
+
+async def test_scheduled_poll_waits_for_its_slot(coordinator):
+    """Test that a scheduled poll starts at the offset the scheduler gave it."""
+    loop = coordinator.hass.loop
+    offset = (loop.time() + 0.2) % 1
+    coordinator.async_set_poll_offset(offset)
+    started = []
+    poll = coordinator._async_poll
+
+    async def record_start(priority):
+        started.append(loop.time())
+        return await poll(priority)
+
+    coordinator._async_poll = record_start
+    await coordinator._handle_refresh_interval()
+
+    assert abs((started[0] - offset + 0.5) % 1 - 0.5) < 0.05
+
+
+async def test_refresh_during_scheduled_poll_keeps_its_priority(coordinator, matrix):
+    """Test that a requested refresh overlapping a scheduled poll is not background."""
+    matrix.latency = 0.05
+    get_status = coordinator.api.get_status
+    priorities = []
+
+    async def record_priority(*args, priority, **kwargs):
+        priorities.append(priority)
+        return await get_status(*args, priority=priority, **kwargs)
+
+    coordinator.api.get_status = record_priority
+    scheduled = asyncio.create_task(coordinator._handle_refresh_interval())
+    await asyncio.sleep(0)
+    await coordinator.async_refresh()
+    await scheduled
+
+    assert priorities == [CommandPriority.BACKGROUND, CommandPriority.REFRESH]
+
+
+async def test_switch_timeout_covers_the_follow_up_refresh(coordinator, matrix):
+    """Test that a switch with a timeout returns by then, refresh or not."""
+    matrix.latency = 0.2
+    started = time.monotonic()
+
+    assert await coordinator.async_set_output_input(1, 3, timeout=0.3) is True
+
+    assert time.monotonic() - started < 0.38
+    # The refresh carries on in the background and confirms the route
+    await wait_for(lambda: matrix.count("get video status") == 2)
+    assert coordinator.data.routes.input_for(1) == 3
+
+
+async def test_standby_polls_as_a_heartbeat(coordinator, matrix):
+    """Test that polling slows down in standby and resumes on power-on."""
+    power = []
+    coordinator.async_add_listener(
+        lambda: power.append(coordinator.data.power), CONTEXT_POWER
+    )
+    matrix.power = 0
+    await coordinator.async_refresh()
+
+    assert power == [0]
+    assert coordinator.polling_stats["standby"] is True
+    assert coordinator.update_interval.total_seconds() == DEFAULT_STANDBY_POLL_INTERVAL
+    assert coordinator.updated_outputs == []
+
+    assert await coordinator.async_set_power(True) is True
+
+    assert matrix.power == 1
+    assert power[:2] == [0, 1]
+    assert coordinator.polling_stats["standby"] is False
+    assert coordinator.update_interval.total_seconds() == DEFAULT_UPDATE_INTERVAL
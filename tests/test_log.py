@@ -0,0 +1,47 @@
+"""Tests for the OREI HDMI Matrix diagnostic logging helpers."""
+import logging
+from unittest.mock import patch
+
+from custom_components.orei_hdmi_matrix.log import RateLimitedLogger, redact
+
+
+def test_redact_credentials():
+    """Test that login credentials are masked."""
+    data = {"comhead": "login", "user": "Admin", "password": "admin"}
+
+    assert redact(data) == {
+        "comhead": "login",
+        "user": "**REDACTED**",
+        "password": "**REDACTED**",
+    }
+    assert data["password"] == "admin"
+
+
+def test_rate_limited_logger(caplog):
+    """Test that repeated messages are sampled once per interval."""
+    logger = RateLimitedLogger(logging.getLogger("test.traffic"), interval=60)
+
+    with caplog.at_level(logging.DEBUG, logger="test.traffic"):
+        with patch("custom_components.orei_hdmi_matrix.log.time.monotonic", return_value=0):
+            logger.debug("poll", "Polled %s", 1)
+            logger.debug("poll", "Polled %s", 2)
+            logger.debug("other", "Other %s", 3)
+        with patch("custom_components.orei_hdmi_matrix.log.time.monotonic", return_value=61):
+            logger.debug("poll", "Polled %s", 4)
+
+    assert [record.getMessage() for record in caplog.records] == [
+        "Polled 1",
+        "Other 3",
+        "Polled 4 (1 similar messages suppressed)",
+    ]
+
+
+def test_rate_limited_logger_disabled(caplog):
+    """Test that nothing is tracked when debug logging is off."""
+    logger = RateLimitedLogger(logging.getLogger("test.quiet"))
+
+    with caplog.at_level(logging.INFO, logger="test.quiet"):
+        logger.debug("poll", "Polled")
+
+    assert not logger.enabled
+    assert not caplog.records
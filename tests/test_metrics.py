@@ -0,0 +1,71 @@
+"""Tests for the OREI HDMI Matrix metrics collector."""
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.orei_hdmi_matrix.metrics import (
+    LatencyHistogram,
+    OreiHdmiMatrixMetrics,
+)
+
+
+def test_histogram_percentiles():
+    """Test that percentiles are accurate to one bucket."""
+    histogram = LatencyHistogram()
+    for millisecond in range(1, 101):
+        histogram.record(millisecond / 1000)
+
+    assert histogram.count == 100
+    assert histogram.max == 0.1
+    assert histogram.percentile(0.5) == pytest.approx(0.05, rel=0.2)
+    assert histogram.percentile(0.95) == pytest.approx(0.095, rel=0.2)
+    assert histogram.percentile(0.99) <= histogram.max
+
+
+def test_histogram_beyond_last_bucket():
+    """Test that very long durations report the maximum."""
+    histogram = LatencyHistogram()
+    histogram.record(120)
+
+    assert histogram.percentile(0.5) == 120
+    assert LatencyHistogram().percentile(0.5) is None
+
+
+def test_command_counters():
+    """Test that commands are counted per type and outcome."""
+    metrics = OreiHdmiMatrixMetrics()
+    metrics.record_command("get video status", 0.01)
+    metrics.record_command("get video status", 0.02, error=True)
+    metrics.record_command("video switch", 10, error=True, timeout=True)
+
+    stats = metrics.as_dict()
+    assert stats["commands"]["get video status"]["requests"] == 2
+    assert stats["commands"]["get video status"]["errors"] == 1
+    assert stats["commands"]["video switch"]["timeouts"] == 1
+    assert stats["commands"]["video switch"]["errors"] == 0
+    assert metrics.total_requests == 3
+    assert metrics.total_errors == 2
+    assert stats["request_latency"]["count"] == 3
+    assert stats["request_latency"]["max"] == 10
+
+
+def test_refresh_requests_are_coalesced():
+    """Test that requests served by one poll are counted as coalesced."""
+    metrics = OreiHdmiMatrixMetrics()
+    with patch(
+        "custom_components.orei_hdmi_matrix.metrics.time.monotonic",
+        side_effect=[100.0, 100.5],
+    ):
+        metrics.record_refresh_request()
+        metrics.record_refresh_request()
+        metrics.record_refresh_request()
+        metrics.record_poll_start()
+    # A scheduled poll serves no request
+    metrics.record_poll_start()
+
+    queue = metrics.as_dict()["refresh_queue"]
+    assert queue["requests"] == 3
+    assert queue["coalesced"] == 2
+    assert queue["pending"] == 0
+    assert queue["wait"]["count"] == 1
+    assert queue["wait"]["max"] == 0.5
@@ -0,0 +1,210 @@
+"""Tests for the OREI HDMI Matrix data models."""
+from dataclasses import FrozenInstanceError, replace
+
+import pytest
+
+from custom_components.orei_hdmi_matrix.config_flow import create_default_config
+from custom_components.orei_hdmi_matrix.models import (
+    MatrixState,
+    RouteTable,
+    RoutingIndex,
+    detect_dimensions,
+)
+
+STATE = MatrixState(
+    power=1,
+    routes=RouteTable([7, 6, 2, 4, 2, 2, 2, 2]),
+    input_names=("Input1", "Input2", "Input3", "Input4", "Input5", "Input6", "Input7", "Input8"),
+    output_names=("Output1", "Output2", "Output3", "Output4", "Output5", "Output6", "Output7", "Output8"),
+    preset_names=("Preset1", "Preset2", "Preset3", "Preset4", "Preset5", "Preset6", "Preset7", "Preset8"),
+)
+
+
+def test_diff_identical_state():
+    """Test that identical states produce an empty diff."""
+    diff = STATE.diff(MatrixState.from_dict(STATE.as_dict(), 8))
+
+    assert not diff
+    assert diff.outputs == frozenset()
+
+
+def test_diff_routes_and_names():
+    """Test that route and output name changes are reported per output."""
+    new = replace(
+        STATE.with_routes({3: 3, 8: 1}),
+        output_names=("Output1", "TV", *STATE.output_names[2:]),
+    )
+
+    diff = STATE.diff(new)
+
+    assert diff
+    assert diff.routes == {3, 8}
+    assert diff.output_names == {2}
+    assert diff.outputs == {2, 3, 8}
+    assert not diff.power
+    assert not diff.input_names
+
+
+def test_diff_power_and_length_change():
+    """Test power changes and outputs appearing in a longer route table."""
+    new = replace(STATE.with_power(0), routes=RouteTable([*STATE.routes, 1]))
+
+    diff = STATE.diff(new)
+
+    assert diff.power
+    assert diff.routes == {9}
+
+
+def test_routing_index_defaults():
+    """Test the index compiled from the default configuration."""
+    index = RoutingIndex.from_entry_data(create_default_config())
+
+    assert index.options[1] == [f"Input {i}" for i in range(1, 9)]
+    assert index.input_names[3] == "Input 3"
+    assert index.input_numbers["Input 3"] == 3
+    assert index.output_names[8] == "Output 8"
+    assert all(index.output_enabled.values())
+
+
+def test_routing_index_respects_config():
+    """Test names, disabled inputs and per-output available inputs."""
+    data = create_default_config()
+    data["inputs"]["2"] = {"name": "Apple TV", "input_enabled": True}
+    data["inputs"]["3"] = {"name": "Cable", "input_enabled": False}
+    data["outputs"]["1"]["available_inputs"] = [1, 2, 3]
+    data["outputs"]["2"]["available_inputs"] = [3]
+    data["outputs"]["4"]["enabled"] = False
+
+    index = RoutingIndex.from_entry_data(data)
+
+    assert index.options[1] == ["Input 1", "Apple TV"]
+    # No enabled inputs left, so every input is offered
+    assert index.options[2] == [f"Input {i}" for i in range(1, 9)]
+    assert index.input_numbers["Apple TV"] == 2
+    assert index.input_names[3] == "Cable"
+    assert not index.input_enabled[3]
+    assert not index.output_enabled[4]
+
+
+def test_routing_index_sizes():
+    """Test that the index follows the entry's matrix size."""
+    index = RoutingIndex.from_entry_data(create_default_config(16, 4))
+
+    assert (index.num_inputs, index.num_outputs) == (16, 4)
+    assert sorted(index.output_names) == [1, 2, 3, 4]
+    assert index.options[4] == [f"Input {i}" for i in range(1, 17)]
+    # Outputs offering the same inputs share one options list
+    assert index.options[1] is index.options[4]
+
+
+def test_route_table():
+    """Test lookups and copies of the array-backed route table."""
+    table = RouteTable.from_sources([7, 6, 2, 4, 0], 4)
+
+    assert len(table) == 4
+    assert table == [7, 6, 2, 4]
+    assert table.input_for(1) == 7
+    assert table.input_for(5) is None
+
+    switched = table.with_routes({2: 3, 9: 1})
+    assert switched == [7, 3, 2, 4]
+    assert table == [7, 6, 2, 4]
+    assert table.with_routes({1: 7}) is table
+    assert hash(table) == hash(RouteTable([7, 6, 2, 4]))
+
+
+def test_route_table_pads_short_status():
+    """Test that missing and invalid routes are stored as unknown."""
+    table = RouteTable.from_sources([3, None, -1], 4)
+
+    assert table == [3, 0, 0, 0]
+    assert table.input_for(2) is None
+
+
+def test_detect_dimensions():
+    """Test matrix sizes detected from the reported state."""
+    assert detect_dimensions(
+        MatrixState(
+            input_names=tuple(f"Input{i}" for i in range(1, 17)),
+            output_names=tuple(f"Output{i}" for i in range(1, 17)),
+        )
+    ) == (16, 16)
+    # Without output names the padded route table is used
+    assert detect_dimensions(
+        MatrixState(input_names=("a", "b", "c", "d"), routes=RouteTable([1, 2, 3, 4, 0]))
+    ) == (4, 4)
+    assert detect_dimensions(MatrixState()) == (8, 8)
+
+
+def test_state_from_reply():
+    """Test that a reply is validated into name and route tables."""
+    state = MatrixState.from_reply(
+        {
+            "comhead": "get video status",
+            "power": 1,
+            "allsource": [2, 1, 4, 3, 0],
+            "allinputname": [f"Input{i}" for i in range(1, 5)],
+            "alloutputname": ["TV", 2, "Projector", "Office"],
+            "allname": None,
+        },
+        4,
+    )
+
+    assert state.power == 1
+    assert state.routes == [2, 1, 4, 3]
+    assert state.input_names == ("Input1", "Input2", "Input3", "Input4")
+    assert state.output_names == ("TV", "2", "Projector", "Office")
+    assert state.preset_names == ()
+    assert detect_dimensions(state) == (4, 4)
+    with pytest.raises(FrozenInstanceError):
+        state.power = 0
+
+
+def test_state_shares_unchanged_tables():
+    """Test that a new state reuses the tables of the previous one."""
+    reply = {
+        "power": 1,
+        "allsource": [1, 2, 0],
+        "allinputname": ["A", "B"],
+        "alloutputname": ["TV", "Office"],
+        "allname": ["Movie"],
+    }
+    previous = MatrixState.from_reply(reply, 2)
+
+    state = MatrixState.from_reply(
+        {**reply, "allsource": [1, 3, 0], "allname": ["Games"]}, 2, previous
+    )
+
+    assert state.input_names is previous.input_names
+    assert state.output_names is previous.output_names
+    assert state.preset_names == ("Games",)
+    assert previous.diff(state).routes == {2}
+    assert previous.diff(state).preset_names
+    assert MatrixState.from_reply(reply, 2, previous) == previous
+    assert previous.with_routes({1: 1}) is previous
+
+
+def test_state_round_trips():
+    """Test the stored form of a state."""
+    state = MatrixState.from_reply({"power": 1, "allsource": [1, 3, 0]}, 2)
+
+    assert MatrixState.from_dict(state.as_dict(), 2) == state
+    assert hash(MatrixState.from_dict(state.as_dict(), 2)) == hash(state)
+
+
+def test_state_keeps_names_between_name_polls():
+    """Test that a routes-only parse keeps the previous names."""
+    previous = MatrixState.from_reply(
+        {"power": 1, "allsource": [1, 2, 0], "allinputname": ["A", "B"]}, 2
+    )
+
+    state = MatrixState.from_reply(
+        {"power": 0, "allsource": [2, 2, 0], "allinputname": ["C", "D"]},
+        2,
+        previous,
+        names=False,
+    )
+
+    assert state.power == 0
+    assert state.routes == [2, 2]
+    assert state.input_names is previous.input_names
@@ -0,0 +1,52 @@
+"""Tests for the OREI HDMI Matrix adaptive poll interval."""
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.orei_hdmi_matrix.polling import AdaptivePollInterval
+
+
+@pytest.fixture
+def poll_interval():
+    """Create a poll interval without a fast period."""
+    return AdaptivePollInterval(min_interval=5, max_interval=60, decay=2, fast_period=0)
+
+
+def test_backs_off_when_stable(poll_interval):
+    """Test that stable polls grow the interval up to the maximum."""
+    assert poll_interval.interval == 5
+    assert poll_interval.poll_succeeded(changed=False) == 10
+    assert poll_interval.poll_succeeded(changed=False) == 20
+    assert poll_interval.poll_succeeded(changed=False) == 40
+    assert poll_interval.poll_succeeded(changed=False) == 60
+    assert poll_interval.poll_succeeded(changed=False) == 60
+
+
+def test_change_returns_to_fast_polling(poll_interval):
+    """Test that a detected change resets the interval."""
+    poll_interval.poll_succeeded(changed=False)
+    poll_interval.poll_succeeded(changed=False)
+    assert poll_interval.poll_succeeded(changed=True) == 5
+
+
+def test_fast_period_holds_minimum_interval():
+    """Test that polling stays fast for a while after activity."""
+    poll_interval = AdaptivePollInterval(min_interval=5, max_interval=60, fast_period=30)
+    poll_interval.mark_activity()
+    assert poll_interval.poll_succeeded(changed=False) == 5
+
+
+def test_failures_back_off_exponentially_with_jitter(poll_interval):
+    """Test exponential backoff while unreachable and fast polling on recovery."""
+    with patch("custom_components.orei_hdmi_matrix.polling.random.uniform", return_value=0):
+        assert poll_interval.poll_failed() == 10
+        assert poll_interval.poll_failed() == 20
+        assert poll_interval.poll_failed() == 40
+        assert poll_interval.poll_failed() == 60
+
+    with patch("custom_components.orei_hdmi_matrix.polling.random.uniform", return_value=0.2):
+        assert poll_interval.poll_failed() == pytest.approx(72)
+
+    assert poll_interval.failures == 5
+    assert poll_interval.poll_succeeded(changed=False) == 5
+    assert poll_interval.failures == 0
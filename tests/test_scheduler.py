@@ -0,0 +1,241 @@
+"""Tests for the OREI HDMI Matrix poll scheduler."""
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.orei_hdmi_matrix import async_setup
+from custom_components.orei_hdmi_matrix.config_flow import create_default_config
+from custom_components.orei_hdmi_matrix.const import DOMAIN, SERVICE_ROUTE_MANY
+from custom_components.orei_hdmi_matrix.coordinator import OreiHdmiMatrixCoordinator
+from custom_components.orei_hdmi_matrix.scheduler import async_get_scheduler
+
+from .fake_matrix import FakeOreiMatrix
+
+LATENCY = 0.1
+
+
+@pytest.fixture
+async def matrices():
+    """Run three slow fake matrices."""
+    async with AsyncExitStack() as stack:
+        yield [
+            await stack.enter_async_context(FakeOreiMatrix(latency=LATENCY))
+            for _ in range(3)
+        ]
+
+
+@pytest.fixture
+async def hass(tmp_path):
+    """Create a Home Assistant instance."""
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
+
+
+def create_coordinator(hass, matrix, entry_id):
+    """Create a coordinator for a fake matrix."""
+    entry = MagicMock()
+    entry.entry_id = entry_id
+    entry.data = {
+        "host": matrix.host,
+        "username": "Admin",
+        "password": "admin",
+        **create_default_config(),
+    }
+    return OreiHdmiMatrixCoordinator(hass, entry)
+
+
+async def test_refresh_is_concurrent(hass, matrices):
+    """Test that refreshing N matrices takes about one round trip."""
+    scheduler = async_get_scheduler(hass)
+    coordinators = [
+        create_coordinator(hass, matrix, f"entry_{index}")
+        for index, matrix in enumerate(matrices)
+    ]
+    for coordinator in coordinators:
+        scheduler.async_register(coordinator)
+    # Log in and create the API clients
+    for coordinator in coordinators:
+        await coordinator.async_refresh()
+
+    await scheduler.async_refresh()
+
+    assert all(matrix.count("get video status") == 2 for matrix in matrices)
+    assert scheduler.last_refresh_duration < 2 * LATENCY
+    # One shared session, connection reuse still counted per matrix
+    assert len({coordinator.api._session for coordinator in coordinators}) == 1
+    # Capped per matrix like a client's own session
+    assert scheduler.session.connector.limit_per_host == 2
+    assert all(
+        coordinator.api.stats.connections_reused >= 1 for coordinator in coordinators
+    )
+    for coordinator in coordinators:
+        await coordinator.async_shutdown()
+
+
+async def test_refresh_selected_coordinators(hass, matrices):
+    """Test that only the requested matrices are refreshed."""
+    scheduler = async_get_scheduler(hass)
+    first, second = (
+        create_coordinator(hass, matrix, f"entry_{index}")
+        for index, matrix in enumerate(matrices[:2])
+    )
+    scheduler.async_register(first)
+    scheduler.async_register(second)
+
+    await scheduler.async_refresh([second])
+
+    assert matrices[0].count("get video status") == 0
+    assert matrices[1].count("get video status") == 1
+    for coordinator in (first, second):
+        await coordinator.async_shutdown()
+
+
+async def test_polls_are_staggered(hass, matrices):
+    """Test that registered coordinators get distinct poll offsets."""
+    scheduler = async_get_scheduler(hass)
+    coordinators = [
+        create_coordinator(hass, matrix, f"entry_{index}")
+        for index, matrix in enumerate(matrices)
+    ]
+    unregister = [
+        scheduler.async_register(coordinator) for coordinator in coordinators
+    ]
+
+    offsets = [coordinator._poll_offset for coordinator in coordinators]
+    assert offsets == sorted(set(offsets))
+    assert all(0 < offset < 1 for offset in offsets)
+
+    unregister[0]()
+
+    assert scheduler.coordinators == coordinators[1:]
+    assert coordinators[1]._poll_offset == offsets[0]
+    assert async_get_scheduler(hass) is scheduler
+
+
+ENTRIES = "test_config_entries"
+
+
+async def add_matrix_device(hass, coordinator):
+    """Register a device and an entity for a coordinator's matrix."""
+    hass.data[ENTRIES][coordinator.entry.entry_id] = coordinator.entry
+    device = dr.async_get(hass).async_get_or_create(
+        config_entry_id=coordinator.entry.entry_id,
+        identifiers={(DOMAIN, coordinator.entry.entry_id)},
+    )
+    entity = er.async_get(hass).async_get_or_create(
+        "switch",
+        DOMAIN,
+        f"{coordinator.entry.entry_id}_power",
+        config_entry=coordinator.entry,
+        device_id=device.id,
+    )
+    return device.id, entity.entity_id
+
+
+@pytest.fixture
+async def registries(hass):
+    """Load the device and entity registries."""
+    hass.data[ENTRIES] = {}
+    hass.config_entries = MagicMock()
+    hass.config_entries.async_get_entry = hass.data[ENTRIES].get
+    await dr.async_load(hass)
+    await er.async_load(hass)
+
+
+async def test_targets_are_found_by_device_and_entity(hass, matrices, registries):
+    """Test that the index maps devices and entities to their coordinator."""
+    scheduler = async_get_scheduler(hass)
+    first, second = (
+        create_coordinator(hass, matrix, f"entry_{index}")
+        for index, matrix in enumerate(matrices[:2])
+    )
+    for coordinator in (first, second):
+        scheduler.async_register(coordinator)
+    first_device, first_entity = await add_matrix_device(hass, first)
+    second_device, second_entity = await add_matrix_device(hass, second)
+
+    assert scheduler.async_coordinators_for([second_entity]) == [second]
+    assert scheduler.async_coordinators_for(
+        [first_device, "unknown", first_entity, second_device]
+    ) == [first, second]
+
+    # The index is rebuilt once the registry reports a change
+    dr.async_get(hass).async_remove_device(first_device)
+    await hass.async_block_till_done()
+    assert scheduler.async_coordinators_for([first_device, first_entity]) == []
+
+
+async def test_registry_listeners_follow_coordinators(hass, matrices):
+    """Test that the registries are only watched while matrices are set up."""
+    scheduler = async_get_scheduler(hass)
+    event = dr.EVENT_DEVICE_REGISTRY_UPDATED
+    coordinators = [
+        create_coordinator(hass, matrix, f"entry_{index}")
+        for index, matrix in enumerate(matrices[:2])
+    ]
+    unregister = [scheduler.async_register(coordinator) for coordinator in coordinators]
+    assert hass.bus.async_listeners().get(event) == 1
+
+    unregister[0]()
+    assert hass.bus.async_listeners().get(event) == 1
+    unregister[1]()
+    assert event not in hass.bus.async_listeners()
+
+    # Home Assistant stopping removes them as well
+    scheduler.async_register(coordinators[0])
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+    assert event not in hass.bus.async_listeners()
+
+
+async def test_duplicate_refreshes_are_coalesced(hass, matrices):
+    """Test that refreshes requested during a forced refresh share it."""
+    coordinator = create_coordinator(hass, matrices[0], "entry_0")
+    await coordinator.async_refresh()
+
+    await asyncio.gather(*(coordinator.async_refresh_now() for _ in range(3)))
+
+    assert matrices[0].count("get video status") == 2
+    assert coordinator.polling_stats["coalesced_forced_refreshes"] == 2
+
+    # A forced refresh right after another one still polls
+    await coordinator.async_refresh_now()
+    assert matrices[0].count("get video status") == 3
+    await coordinator.async_shutdown()
+
+
+async def test_services_reach_targets_concurrently(hass, matrices, registries):
+    """Test that services are registered once and fan out to their targets."""
+    assert await async_setup(hass, {})
+    scheduler = async_get_scheduler(hass)
+    coordinators = [
+        create_coordinator(hass, matrix, f"entry_{index}")
+        for index, matrix in enumerate(matrices)
+    ]
+    for coordinator in coordinators:
+        scheduler.async_register(coordinator)
+        await coordinator.async_refresh()
+    _, entity_id = await add_matrix_device(hass, coordinators[2])
+
+    await hass.services.async_call(
+        DOMAIN, "refresh", {"entity_id": entity_id}, blocking=True
+    )
+    assert [matrix.count("get video status") for matrix in matrices] == [1, 1, 2]
+
+    started = time.monotonic()
+    await hass.services.async_call(
+        DOMAIN, SERVICE_ROUTE_MANY, {"routes": {1: 4}}, blocking=True
+    )
+    # One switch and one refresh per matrix, all matrices at once
+    assert time.monotonic() - started < 4 * LATENCY
+    assert all(matrix.routes[0] == 4 for matrix in matrices)
+    for coordinator in coordinators:
+        await coordinator.async_shutdown()
@@ -0,0 +1,20 @@
+"""Tests for the OREI HDMI Matrix strings and translations."""
+import json
+from pathlib import Path
+
+import pytest
+
+from custom_components.orei_hdmi_matrix.const import MAX_PORTS
+
+COMPONENT = Path(__file__).parent.parent / "custom_components" / "orei_hdmi_matrix"
+
+
+@pytest.mark.parametrize("path", ["strings.json", "translations/en.json"])
+def test_options_label_every_input(path):
+    """Test that the options step has labels for the largest supported matrix."""
+    strings = json.loads((COMPONENT / path).read_text())
+    labels = strings["options"]["step"]["init"]["data"]
+
+    for input_ in range(1, MAX_PORTS + 1):
+        assert labels[f"input_{input_}_name"] == f"Input {input_} Name"
+        assert labels[f"input_{input_}_enabled"] == f"Enable Input {input_}"
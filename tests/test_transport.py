@@ -0,0 +1,166 @@
+"""Tests for the OREI HDMI Matrix transports."""
+import asyncio
+import time
+
+import pytest
+
+from custom_components.orei_hdmi_matrix.api import (
+    OreiHdmiMatrixApi,
+    OreiHdmiMatrixApiError,
+    OreiHdmiMatrixTimeoutError,
+)
+from custom_components.orei_hdmi_matrix.metrics import OreiHdmiMatrixMetrics
+from custom_components.orei_hdmi_matrix.transport import TcpTransport
+
+from .fake_matrix import FakeOreiMatrix
+
+
+def tcp_api(matrix, **kwargs):
+    """Create an API client talking to the fake matrix's control port."""
+    transport = TcpTransport("127.0.0.1", matrix.control_port, **kwargs)
+    return OreiHdmiMatrixApi("127.0.0.1", "Admin", "admin", transport=transport)
+
+
+async def test_status_and_switch_over_tcp():
+    """Test a switch and poll cycle over the control port."""
+    async with FakeOreiMatrix() as matrix:
+        async with tcp_api(matrix) as api:
+            assert await api.set_output_input(2, 5) is True
+            started = time.monotonic()
+            status = await api.get_status()
+            elapsed = time.monotonic() - started
+
+    assert status.routes == [1, 5, 1, 1, 1, 1, 1, 1]
+    assert status.power == 1
+    assert elapsed < 0.1
+    # No login and a single persistent connection
+    assert matrix.count("login") == 0
+    assert matrix.control_connections == 1
+    assert matrix.control_commands == ["s in 5 av out 2!", "r power!", "r av out 0!"]
+
+
+async def test_pipelined_switches_over_tcp():
+    """Test that bulk routing shares one connection with commands in flight."""
+    async with FakeOreiMatrix() as matrix:
+        async with tcp_api(matrix) as api:
+            result = await api.set_routes({output: 3 for output in range(1, 9)})
+
+    assert all(result.values())
+    assert matrix.routes == [3] * 8
+    assert matrix.control_connections == 1
+
+
+async def test_refused_command_over_tcp():
+    """Test that an error line fails the command it answers."""
+    async with FakeOreiMatrix() as matrix:
+        transport = TcpTransport("127.0.0.1", matrix.control_port)
+        with pytest.raises(OreiHdmiMatrixApiError, match="command error"):
+            await transport.send({"comhead": "video switch", "source": [9, 1]})
+        # The connection stays usable
+        result = await transport.send({"comhead": "video switch", "source": [1, 2]})
+        await transport.close()
+
+    assert result["result"] == 1
+
+
+async def test_unknown_lines_over_tcp_are_ignored():
+    """Test that a banner arriving before a reply does not fail the command."""
+    async with FakeOreiMatrix(latency=0.05) as matrix:
+        async with tcp_api(matrix) as api:
+            await api.transport.connect()
+            status = asyncio.create_task(api.get_status())
+            await asyncio.sleep(0.01)
+            matrix.send_notice("Welcome to the HDMI matrix")
+            assert (await status).routes == [1] * 8
+
+
+async def test_status_parse_time_over_tcp():
+    """Test that each status reply is one parse sample, decoding included."""
+    metrics = OreiHdmiMatrixMetrics()
+    async with FakeOreiMatrix() as matrix:
+        async with tcp_api(matrix) as api:
+            api.metrics = metrics
+            await api.set_output_input(2, 5)
+            reply = await api.transport.send({"comhead": "get video status"})
+            await api.get_status()
+
+    assert reply.decode_time > 0
+    assert metrics.parse_time.count == 1
+
+
+async def test_reconnects_after_connection_drop():
+    """Test that the transport reconnects after the matrix closes the connection."""
+    async with FakeOreiMatrix() as matrix:
+        async with tcp_api(matrix) as api:
+            await api.get_status()
+            matrix.drop_control_connections()
+            await asyncio.sleep(0.01)
+            status = await api.get_status()
+
+    assert status.routes == [1] * 8
+    assert matrix.control_connections == 2
+
+
+async def test_unreachable_control_port():
+    """Test that a refused connection counts as an unreachable matrix."""
+    matrix = FakeOreiMatrix()
+    await matrix.start()
+    port = matrix.control_port
+    await matrix.stop()
+
+    async with OreiHdmiMatrixApi(
+        "127.0.0.1", "Admin", "admin", transport=TcpTransport("127.0.0.1", port)
+    ) as api:
+        api._authenticated = True
+        with pytest.raises(OreiHdmiMatrixApiError, match="Request failed"):
+            await api.get_status()
+
+    assert api.breaker.as_dict()["consecutive_failures"] == 1
+
+
+async def test_preset_recall_over_tcp_reports_routes():
+    """Test that the routes following a preset recall arrive as feedback."""
+    feedback = []
+    async with FakeOreiMatrix() as matrix:
+        transport = TcpTransport("127.0.0.1", matrix.control_port)
+        transport.on_feedback = lambda routes, power: feedback.append(routes)
+        async with OreiHdmiMatrixApi(
+            "127.0.0.1", "Admin", "admin", transport=transport
+        ) as api:
+            await api.set_output_input(3, 7)
+            assert await api.save_preset(1) is True
+            await api.set_output_input(3, 1)
+            assert await api.recall_preset(1) is True
+            await asyncio.sleep(0.05)
+
+    assert matrix.routes[2] == 7
+    assert feedback[-1][3] == 7
+
+
+async def test_command_timeout_over_tcp_reconnects():
+    """Test that a switch past its timeout drops the connection and is not matched later."""
+    async with FakeOreiMatrix() as matrix:
+        transport = TcpTransport("127.0.0.1", matrix.control_port)
+        async with OreiHdmiMatrixApi(
+            "127.0.0.1", "Admin", "admin", transport=transport, switch_timeout=0.05
+        ) as api:
+            await api.get_status()
+            matrix.latency = 0.2
+            with pytest.raises(OreiHdmiMatrixTimeoutError):
+                await api.set_output_input(1, 4)
+            matrix.latency = 0
+            status = await api.get_status()
+
+    assert status.routes[0] in (1, 4)
+    assert matrix.control_connections == 2
+
+
+async def test_power_over_tcp():
+    """Test that power commands are confirmed by the power line."""
+    async with FakeOreiMatrix() as matrix:
+        async with tcp_api(matrix) as api:
+            assert await api.set_power(False) is True
+            status = await api.get_status()
+
+    assert status.power == 0
+    assert matrix.control_commands[0] == "s power 0!"